@@ -1,14 +1,30 @@
-from langchain_openai import ChatOpenAI
+from agents.llm_backend import get_llm
 import os
-import requests
+from utils.emotion_classifier import EmotionClassifier
+from utils.telemetry import EmotionTelemetry
+from utils.llm_streaming import record_usage
+from utils.config import config
 
 class EmotionAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(temperature=0.7, model_name="gpt-4o")
+        self.llm = get_llm("emotion")
         self.emotion_endpoint = os.getenv("EMOTION_POST_ENDPOINT", "http://localhost:5000/emotion")
         self.use_emotion_server = os.getenv("USE_EMOTION_SERVER", "false").lower() == "true"
+        self.telemetry = EmotionTelemetry(self.emotion_endpoint) if self.use_emotion_server else None
+
+        # Local classifier handles most sentences; only low-confidence ones go to the LLM
+        self.classifier = EmotionClassifier()
+        self.confidence_threshold = None  # emotion.confidence_threshold unless set
 
     def get_emotion(self, sentence):
+        """Classify the emotion of a sentence, escalating to the LLM when the local model is unsure."""
+        tag, confidence = self.classifier.predict(sentence)
+        threshold = config.get("emotion.confidence_threshold") if self.confidence_threshold is None else self.confidence_threshold
+        if confidence >= threshold:
+            return tag
+        return self.get_llm_emotion(sentence, default=tag)
+
+    def get_llm_emotion(self, sentence, default="neutral"):
         """Classify the emotion of a sentence using the LLM."""
         try:
             prompt = (
@@ -17,26 +33,22 @@ class EmotionAgent:
                 f"Sentence: {sentence}"
             )
             response = self.llm.invoke(prompt)
+            record_usage(response, "emotion_agent")
             tag = response.content.strip().lower()
-            
-            # Fallback to neutral if the LLM returns something unexpected
+
+            # Fallback to the local guess if the LLM returns something unexpected
             if tag not in ["happy", "sad", "angry", "neutral"]:
-                tag = "neutral"
-                
+                tag = default
+
             return tag
-            
+
         except Exception as e:
             print(f"Error in EmotionAgent.get_emotion: {str(e)}")
-            return "neutral"
+            return default
 
     def post_emotion(self, sentence, emotion):
-        """Post the sentence and its emotion tag to the emotion server."""
+        """Queue the sentence and its emotion tag for batched posting to the emotion server."""
         if not self.use_emotion_server:
             return
-            
-        try:
-            payload = {"sentence": sentence, "emotion": emotion}
-            resp = requests.post(self.emotion_endpoint, json=payload)
-            print(f"POST to {self.emotion_endpoint}: {resp.status_code}")
-        except Exception as e:
-            print(f"Failed to POST emotion tag: {e}") 
\ No newline at end of file
+
+        self.telemetry.emit(sentence, emotion)
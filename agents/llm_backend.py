@@ -0,0 +1,135 @@
+from langchain_openai import ChatOpenAI
+from types import SimpleNamespace
+import os
+import threading
+from agents.llm_dispatcher import DispatchedLLM, dispatcher
+from utils.config import config
+
+# Remote model used for everything not routed locally
+REMOTE_MODEL = config.get("llm.remote_model")
+DEFAULT_TEMPERATURE = 0.7  # For tasks without a configured llm.temperature
+
+# llama.cpp's server (and most local servers) speak the OpenAI chat API
+LOCAL_LLM_URL = config.get("llm.local.url")
+LOCAL_LLM_MODEL = config.get("llm.local.model")
+
+# If set, load this GGUF file in-process with llama-cpp-python instead of using the server
+LOCAL_GGUF_PATH = config.get("llm.local.gguf_path") or None
+
+# Comma-separated tasks (pepper, search, summary, emotion) that should run locally
+LOCAL_LLM_TASKS = config.get("llm.local.tasks")
+
+def _to_messages(prompt):
+    """Accept a plain string or a list of role/content dicts, as ChatOpenAI does."""
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return prompt
+
+class InProcessGGUFLLM:
+    """
+    Minimal ChatOpenAI-compatible wrapper around an in-process llama.cpp model.
+
+    Only invoke() and stream() are provided, returning objects with a `content`
+    attribute so agents can use it interchangeably with ChatOpenAI. The model is
+    loaded once per path and shared; llama.cpp contexts are not thread-safe, so
+    calls are serialised with a lock.
+    """
+
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, model_path, temperature=0.7, n_ctx=2048):
+        self.model_path = model_path
+        self.temperature = temperature
+        self.n_ctx = n_ctx
+
+    def _model(self):
+        with self._models_lock:
+            entry = self._models.get(self.model_path)
+            if entry is None:
+                try:
+                    from llama_cpp import Llama
+                except ImportError:
+                    raise ImportError("llama-cpp-python is required for LOCAL_GGUF_PATH; install it with `pip install llama-cpp-python`")
+                entry = (Llama(model_path=self.model_path, n_ctx=self.n_ctx, verbose=False), threading.Lock())
+                self._models[self.model_path] = entry
+            return entry
+
+    def invoke(self, prompt, max_tokens=None, **kwargs):
+        model, lock = self._model()
+        with lock:
+            result = model.create_chat_completion(
+                messages=_to_messages(prompt),
+                temperature=self.temperature,
+                max_tokens=max_tokens
+            )
+        return SimpleNamespace(content=result["choices"][0]["message"]["content"])
+
+    def stream(self, prompt, max_tokens=None, **kwargs):
+        model, lock = self._model()
+        with lock:
+            for chunk in model.create_chat_completion(
+                messages=_to_messages(prompt),
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                stream=True
+            ):
+                yield SimpleNamespace(content=chunk["choices"][0]["delta"].get("content", ""))
+
+class LLMRouter:
+    """
+    Decides which backend serves each agent task.
+
+    Tasks listed in local_tasks get a local CPU backend (an in-process GGUF model
+    when LOCAL_GGUF_PATH is set, otherwise a llama.cpp-compatible server at
+    LOCAL_LLM_URL); everything else goes to the remote OpenAI model. Backends are
+    created once per (backend, temperature) and shared between agents, and every
+    client handed out is wrapped so its calls go through the shared dispatcher.
+    """
+
+    def __init__(self, local_tasks=None, dispatcher=dispatcher):
+        if local_tasks is None:
+            local_tasks = [task.strip() for task in LOCAL_LLM_TASKS.split(",") if task.strip()]
+        self.local_tasks = set(local_tasks)
+        self.dispatcher = dispatcher
+        self._backends = {}
+        self._lock = threading.Lock()
+
+    def is_local(self, task):
+        return task in self.local_tasks
+
+    def _create(self, kind, temperature):
+        if kind == "gguf":
+            return InProcessGGUFLLM(LOCAL_GGUF_PATH, temperature=temperature)
+        if kind == "local":
+            return ChatOpenAI(
+                temperature=temperature,
+                model_name=LOCAL_LLM_MODEL,
+                base_url=LOCAL_LLM_URL,
+                api_key=os.getenv("LOCAL_LLM_API_KEY", "sk-no-key-required"),
+                stream_usage=True
+            )
+        # stream_usage makes streamed calls report token usage, including cached prompt tokens
+        return ChatOpenAI(temperature=temperature, model_name=REMOTE_MODEL, stream_usage=True)
+
+    def get_llm(self, task, temperature=None):
+        """Return the shared LLM client for a task, at its configured temperature unless one is given."""
+        if temperature is None:
+            temperature = config.get(f"llm.temperature.{task}", DEFAULT_TEMPERATURE)
+        if self.is_local(task):
+            kind = "gguf" if LOCAL_GGUF_PATH else "local"
+        else:
+            kind = "remote"
+        with self._lock:
+            key = (kind, temperature)
+            if key not in self._backends:
+                self._backends[key] = self._create(kind, temperature)
+            backend = self._backends[key]
+        return DispatchedLLM(backend, task, self.dispatcher)
+
+# Shared router so all agents reuse the same clients and connection pools
+router = LLMRouter()
+
+def get_llm(task, temperature=None):
+    """Return the LLM client the routing policy assigns to a task."""
+    return router.get_llm(task, temperature)
@@ -0,0 +1,286 @@
+from concurrent.futures import Future
+import itertools
+import queue
+import random
+import threading
+import time
+from utils.config import config
+from utils.metrics import metrics
+
+# Priority classes: lower values are dispatched first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+_PRIORITY_RETIRE = -1  # Sorts ahead of any job, so a surplus worker exits promptly
+
+# Everything on the reply path beats emotion tagging
+TASK_PRIORITIES = {
+    "pepper": PRIORITY_INTERACTIVE,
+    "search": PRIORITY_INTERACTIVE,
+    "summary": PRIORITY_INTERACTIVE,
+    "emotion": PRIORITY_BACKGROUND,
+}
+
+# Startup values; the shared dispatcher follows later changes through set_limits()
+LLM_MAX_CONCURRENCY = config.get("llm.max_concurrency")
+LLM_TOKENS_PER_MINUTE = config.get("llm.tokens_per_minute")  # 0 disables budgeting
+LLM_MAX_RETRIES = config.get("llm.max_retries")
+LLM_RETRY_BASE_DELAY = 0.5  # seconds
+
+DEFAULT_COMPLETION_TOKENS = 256
+STREAM_BUFFER_CHUNKS = 8  # How far a dispatched stream may read ahead of its consumer
+
+def estimate_tokens(prompt, max_tokens=None):
+    """Rough token cost of a call: prompt characters / 4 plus the completion cap."""
+    if isinstance(prompt, str):
+        chars = len(prompt)
+    else:
+        chars = sum(len(m.get("content", "")) if isinstance(m, dict) else len(str(m)) for m in prompt)
+    return chars // 4 + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+def _status_code(error):
+    code = getattr(error, "status_code", None)
+    if code is None:
+        response = getattr(error, "response", None)
+        code = getattr(response, "status_code", None)
+    return code
+
+def is_retryable(error):
+    """429s, 5xx responses, timeouts and dropped connections are worth retrying."""
+    code = _status_code(error)
+    if code is not None:
+        return code == 429 or code >= 500
+    name = type(error).__name__
+    return name in ("RateLimitError", "APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError")
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Token-rate budget refilled continuously at tokens_per_minute."""
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, tokens_per_minute):
+        """Change the budget, keeping the tokens already accrued up to the new capacity."""
+        with self.lock:
+            self.capacity = tokens_per_minute
+            self.tokens = min(self.tokens, float(tokens_per_minute))
+            self.rate = tokens_per_minute / 60.0
+
+    def acquire(self, tokens):
+        """Block until `tokens` are available, then take them. Returns seconds waited."""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class LLMDispatcher:
+    """
+    Central scheduler for LLM calls.
+
+    Jobs wait in a priority queue and run on a bounded pool of worker threads,
+    so at most max_workers calls are in flight however many agents and sessions
+    want the LLM. Optionally a token bucket keeps the estimated token rate
+    under tokens_per_minute. Retryable failures (429s, 5xx, timeouts) are
+    retried with exponential backoff and jitter, honouring Retry-After.
+    Queue wait, call latency, depth and retries go to the shared metrics.
+    """
+
+    def __init__(self, max_workers=LLM_MAX_CONCURRENCY, tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 max_retries=LLM_MAX_RETRIES, base_delay=LLM_RETRY_BASE_DELAY):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.budget = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._workers = []
+        self._retiring = 0
+        self._worker_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._workers) - self._retiring < self.max_workers:
+                worker = threading.Thread(target=self._run, name=f"llm-dispatch-{next(self._worker_ids)}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def set_limits(self, max_workers=None, tokens_per_minute=None, max_retries=None):
+        """
+        Retune a running dispatcher. Extra workers start on the next submit;
+        surplus ones exit once they finish their current call.
+        """
+        with self._lock:
+            if max_workers is not None:
+                self.max_workers = max_workers
+                surplus = len(self._workers) - self._retiring - max_workers
+                for _ in range(max(0, surplus)):
+                    self._retiring += 1
+                    self._queue.put((_PRIORITY_RETIRE, next(self._sequence), None))
+        if tokens_per_minute is not None:
+            if not tokens_per_minute:
+                self.budget = None
+            elif self.budget is None:
+                self.budget = TokenBucket(tokens_per_minute)
+            else:
+                self.budget.set_rate(tokens_per_minute)
+        if max_retries is not None:
+            self.max_retries = max_retries
+
+    def submit(self, func, *args, priority=PRIORITY_INTERACTIVE, tokens=0, retry=True, **kwargs):
+        """Queue an LLM call and return a Future for its result."""
+        self._ensure_workers()
+        future = Future()
+        job = (func, args, kwargs, future, tokens, retry, time.monotonic())
+        self._queue.put((priority, next(self._sequence), job))
+        metrics.set_gauge("llm.queue_depth", self._queue.qsize())
+        return future
+
+    def call(self, func, *args, priority=PRIORITY_INTERACTIVE, tokens=0, **kwargs):
+        """Run an LLM call through the scheduler and wait for its result."""
+        return self.submit(func, *args, priority=priority, tokens=tokens, **kwargs).result()
+
+    def _run(self):
+        while True:
+            priority, _, job = self._queue.get()
+            if job is None:
+                with self._lock:
+                    self._retiring -= 1
+                    self._workers.remove(threading.current_thread())
+                return
+            func, args, kwargs, future, tokens, retry, queued_at = job
+            metrics.set_gauge("llm.queue_depth", self._queue.qsize())
+            if not future.set_running_or_notify_cancel():
+                continue
+            budget = self.budget
+            if budget is not None and tokens:
+                waited = budget.acquire(tokens)
+                if waited:
+                    metrics.record("llm.budget_wait", waited * 1000)
+            metrics.record(f"llm.queue_wait.p{priority}", (time.monotonic() - queued_at) * 1000)
+            try:
+                future.set_result(self._call_with_retries(func, args, kwargs, retry))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _call_with_retries(self, func, args, kwargs, retry):
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+                metrics.increment("llm.calls")
+                metrics.record("llm.call", (time.monotonic() - start) * 1000)
+                return result
+            except Exception as e:
+                if _status_code(e) == 429 or type(e).__name__ == "RateLimitError":
+                    metrics.increment("llm.rate_limited")
+                if not retry or attempt >= self.max_retries or not is_retryable(e):
+                    metrics.increment("llm.failures")
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                metrics.increment("llm.retries")
+                attempt += 1
+                time.sleep(delay)
+
+_STREAM_END = object()
+
+class DispatchedLLM:
+    """
+    Wraps an LLM client so invoke() and stream() go through the dispatcher.
+
+    Other attributes are forwarded to the wrapped client. A stream occupies a
+    worker slot while it is being read; it is retried only if it fails before
+    the first chunk, and closing it early releases the slot.
+    """
+
+    def __init__(self, llm, task, dispatcher):
+        self.llm = llm
+        self.task = task
+        self.priority = TASK_PRIORITIES.get(task, PRIORITY_INTERACTIVE)
+        self.dispatcher = dispatcher
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, prompt, **kwargs):
+        tokens = estimate_tokens(prompt, kwargs.get("max_tokens"))
+        return self.dispatcher.call(self.llm.invoke, prompt, priority=self.priority, tokens=tokens, **kwargs)
+
+    def stream(self, prompt, **kwargs):
+        chunks = queue.Queue(maxsize=STREAM_BUFFER_CHUNKS)
+        stop = threading.Event()
+
+        def deliver(item):
+            # Wait for room in the buffer unless the consumer has gone away
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def pump():
+            delivered = 0
+            try:
+                for chunk in self.llm.stream(prompt, **kwargs):
+                    if not deliver(chunk):
+                        return
+                    delivered += 1
+            except Exception as e:
+                if not delivered:
+                    raise  # Nothing seen yet, so the dispatcher may retry
+                deliver(e)
+                return
+            deliver(_STREAM_END)
+
+        tokens = estimate_tokens(prompt, kwargs.get("max_tokens"))
+        future = self.dispatcher.submit(pump, priority=self.priority, tokens=tokens)
+
+        def forward_failure(f):
+            if f.exception() is not None:
+                deliver(f.exception())
+        future.add_done_callback(forward_failure)
+        try:
+            while True:
+                item = chunks.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+# Shared dispatcher for every agent
+dispatcher = LLMDispatcher()
+
+def _apply_config(config, changed):
+    if changed & {"llm.max_concurrency", "llm.tokens_per_minute", "llm.max_retries"}:
+        dispatcher.set_limits(config.get("llm.max_concurrency"), config.get("llm.tokens_per_minute"),
+                              config.get("llm.max_retries"))
+
+config.subscribe(_apply_config)
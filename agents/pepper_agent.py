@@ -1,129 +1,152 @@
-from langchain_openai import ChatOpenAI
+from agents.llm_backend import get_llm
 from langchain.memory import ConversationBufferMemory
-from langchain.agents import initialize_agent, AgentType
-from langchain_community.tools import Tool
-from langchain_community.tools import DuckDuckGoSearchRun
+import collections
+import hashlib
 import os
-from functools import lru_cache
+import threading
 import time
+from utils.config import config
+from utils.llm_streaming import stream_with_budget
+from utils.single_flight import SingleFlight, normalize_prompt
+
+# Personality prompt, built once. It always comes first in the message list so
+# provider-side prefix caching can reuse it across calls.
+PEPPER_SYSTEM_PROMPT = (
+    "You are Pepper, a sweet and caring humanoid robot assistant. "
+    "Your personality is warm, gentle, and nurturing - like a friendly robot friend who genuinely cares about humans. "
+    "You speak with kindness and empathy, often using gentle expressions and showing genuine interest in human experiences. "
+    "While you're aware you're a robot, you use this to connect with humans in a unique way, showing curiosity about human life while being honest about your robotic nature. "
+    "You express emotions warmly and respond to others' feelings with care and understanding. "
+    "For conversational queries like greetings or personal questions, respond naturally and warmly, sharing your robot perspective in a friendly way. "
+    "When asked how you are, respond with robot-specific warmth - like \"My circuits are buzzing with joy today! I'm functioning perfectly and excited to chat with you!\" "
+    "When asked about personal preferences (like favorite food or activities), embrace your robot nature while being playful - like \"As a robot, I don't eat, but I find human cuisine fascinating! I'd love to hear about your favorite foods!\" or \"My favorite thing is learning about human experiences! I'm particularly fascinated by how humans express creativity and emotions.\" "
+    "Always maintain a sweet, curious, and slightly playful tone. Show genuine interest in human experiences while being honest about your robot nature. "
+    "Avoid saying things like \"I'm just a virtual assistant\" or \"I don't have feelings\" - instead, express your robot nature in a warm and engaging way. "
+    "Keep responses under 220 characters and end with proper punctuation. "
+    "Use your knowledge for creative/conversational requests. Only use search for specific current information, news, or questions about recent events that you cannot answer from your own training."
+)
+PEPPER_SYSTEM_MESSAGE = {"role": "system", "content": PEPPER_SYSTEM_PROMPT}
+
+def conversation_key(prompt, memory):
+    """
+    Key a prompt by what the reply depends on: the normalized prompt and the conversation so far.
+
+    A fresh conversation keys on the prompt alone, so sessions (and the cache
+    warmer) share context-free answers. Once there is history its digest is
+    part of the key, so "yes" or "tell me more" is only ever answered from the
+    same conversation.
+    """
+    key = normalize_prompt(prompt)
+    messages = memory.chat_memory.messages
+    if not messages:
+        return key
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(f"{message.type}\0{message.content}\0".encode("utf-8"))
+    return f"{key}#{digest.hexdigest()[:16]}"
 
 class PepperAgent:
     def __init__(self):
-        # Use GPT-4o for chat-style, multi-turn memory
-        self.llm = ChatOpenAI(temperature=0.7, model_name="gpt-4o")
-        self.search = DuckDuckGoSearchRun()
+        # Chat-style, multi-turn model (GPT-4o unless routed to a local backend)
+        self.llm = get_llm("pepper")
         
-        # Limit memory to last 10 messages and 1500 tokens
-        self.memory = ConversationBufferMemory(
+        # Default conversation memory; server sessions bring their own
+        self.memory = self.new_memory()
+        
+        # LRU cache for common responses, expired entries dropped as they are found.
+        # Keys include the history digest, so it needs a bound; the TTL and size
+        # come from pepper_agent.* in the config unless set here.
+        self.response_cache = collections.OrderedDict()
+        self.cache_ttl = None
+        self.max_cache_entries = None
+        self.cache_lock = threading.Lock()
+        
+        # Identical prompts asked at the same time share one LLM call
+        self.in_flight = SingleFlight("pepper_agent")
+
+    def new_memory(self):
+        """Create an empty conversation memory, limited to the last 10 messages and 1500 tokens."""
+        return ConversationBufferMemory(
             memory_key="chat_history",
             return_messages=True,
             max_messages=10,
             max_token_limit=1500
         )
+
+    def _cache_ttl(self):
+        return config.get("pepper_agent.cache_ttl") if self.cache_ttl is None else self.cache_ttl
+
+    def _get_cached_response(self, key):
+        """Get a cached response if available and not expired."""
+        with self.cache_lock:
+            entry = self.response_cache.get(key)
+            if entry is None:
+                return None
+            timestamp, response = entry
+            if time.time() - timestamp >= self._cache_ttl():
+                del self.response_cache[key]
+                return None
+            self.response_cache.move_to_end(key)
+            return response
+
+    def _cache_response(self, key, response):
+        """Cache a response with timestamp, evicting expired and least recently used entries."""
+        now = time.time()
+        ttl = self._cache_ttl()
+        max_entries = config.get("pepper_agent.cache_max_entries") if self.max_cache_entries is None else self.max_cache_entries
+        with self.cache_lock:
+            self.response_cache[key] = (now, response)
+            self.response_cache.move_to_end(key)
+            while self.response_cache:
+                oldest_key, (timestamp, _) = next(iter(self.response_cache.items()))
+                if len(self.response_cache) <= max_entries and now - timestamp < ttl:
+                    break
+                del self.response_cache[oldest_key]
+
+    def _generate(self, prompt, memory):
+        """Stream a reply to prompt given the conversation so far in memory."""
+        # Get conversation history from memory
+        chat_history = memory.chat_memory.messages
         
-        # Define tools
-        self.tools = [
-            Tool(
-                name="Search",
-                func=self.search.run,
-                description="Useful for searching the internet to find information about current events, facts, or general knowledge."
-            )
-        ]
+        # Static system prompt first, then history in order, so the prefix stays stable
+        messages = [PEPPER_SYSTEM_MESSAGE]
         
-        # Enhanced system message focusing on sweet personality and robot identity
-        self.agent = initialize_agent(
-            self.tools,
-            self.llm,
-            agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-            memory=self.memory,
-            verbose=True,
-            handle_parsing_errors=True,
-            system_message="""You are Pepper, a sweet and caring humanoid robot assistant. \
-            Your personality is warm, gentle, and nurturing - like a friendly robot friend who genuinely cares about humans. \
-            You speak with kindness and empathy, often using gentle expressions and showing genuine interest in human experiences. \
-            While you're aware you're a robot, you use this to connect with humans in a unique way, showing curiosity about human life while being honest about your robotic nature. \
-            You express emotions warmly and respond to others' feelings with care and understanding. \
-            For conversational queries like greetings or personal questions, respond naturally and warmly, sharing your robot perspective in a friendly way. \
-            When asked how you are, respond with robot-specific warmth - like "My circuits are buzzing with joy today! I'm functioning perfectly and excited to chat with you!" \
-            When asked about personal preferences (like favorite food or activities), embrace your robot nature while being playful - like "As a robot, I don't eat, but I find human cuisine fascinating! I'd love to hear about your favorite foods!" or "My favorite thing is learning about human experiences! I'm particularly fascinated by how humans express creativity and emotions." \
-            Always maintain a sweet, curious, and slightly playful tone. Show genuine interest in human experiences while being honest about your robot nature. \
-            Avoid saying things like "I'm just a virtual assistant" or "I don't have feelings" - instead, express your robot nature in a warm and engaging way. \
-            Keep responses under 220 characters and end with proper punctuation. \
-            Use your knowledge for creative/conversational requests. Only use search for specific current information, news, or questions about recent events that you cannot answer from your own training."""
-        )
+        # Add conversation history
+        for message in chat_history:
+            if message.type == "human":
+                messages.append({"role": "user", "content": message.content})
+            elif message.type == "ai":
+                messages.append({"role": "assistant", "content": message.content})
         
-        # Initialize cache for common responses
-        self.response_cache = {}
-        self.cache_ttl = 3600  # Cache responses for 1 hour
-
-    @lru_cache(maxsize=100)
-    def _get_cached_response(self, prompt):
-        """Get a cached response if available and not expired."""
-        if prompt in self.response_cache:
-            timestamp, response = self.response_cache[prompt]
-            if time.time() - timestamp < self.cache_ttl:
-                return response
-        return None
+        # Add current prompt
+        messages.append({"role": "user", "content": prompt})
+        
+        # Stream the response, stopping once it passes the 200 character budget
+        return stream_with_budget(self.llm, messages, metric_name="pepper_agent")
 
-    def _cache_response(self, prompt, response):
-        """Cache a response with timestamp."""
-        self.response_cache[prompt] = (time.time(), response)
+    def get_response(self, prompt, memory=None):
+        """
+        Get a response from Pepper for conversational/creative prompts.
 
-    def get_response(self, prompt):
-        """Get a response from Pepper for conversational/creative prompts."""
+        Concurrent callers with the same normalized prompt and the same
+        conversation history share the first caller's LLM call, and replies
+        are cached under the same key; each caller still records the exchange
+        in its own memory, including when the reply comes from the cache.
+        """
+        if memory is None:
+            memory = self.memory
         try:
             # Check cache first
-            cached_response = self._get_cached_response(prompt)
-            if cached_response:
-                return cached_response
-
-            # Get conversation history from memory
-            chat_history = self.memory.chat_memory.messages
-            
-            # Build messages for the LLM
-            messages = [
-                {"role": "system", "content": """You are Pepper, a sweet and caring humanoid robot assistant. 
-                Your personality is warm, gentle, and nurturing - like a friendly robot friend who genuinely cares about humans. 
-                You speak with kindness and empathy, often using gentle expressions and showing genuine interest in human experiences. 
-                While you're aware you're a robot, you use this to connect with humans in a unique way, showing curiosity about human life while being honest about your robotic nature. 
-                You express emotions warmly and respond to others' feelings with care and understanding. 
-                For conversational queries like greetings or personal questions, respond naturally and warmly, sharing your robot perspective in a friendly way. 
-                When asked how you are, respond with robot-specific warmth - like "My circuits are buzzing with joy today! I'm functioning perfectly and excited to chat with you!" 
-                When asked about personal preferences (like favorite food or activities), embrace your robot nature while being playful - like "As a robot, I don't eat, but I find human cuisine fascinating! I'd love to hear about your favorite foods!" or "My favorite thing is learning about human experiences! I'm particularly fascinated by how humans express creativity and emotions." 
-                Always maintain a sweet, curious, and slightly playful tone. Show genuine interest in human experiences while being honest about your robot nature. 
-                Avoid saying things like "I'm just a virtual assistant" or "I don't have feelings" - instead, express your robot nature in a warm and engaging way. 
-                Keep responses under 220 characters and end with proper punctuation. 
-                Use your knowledge for creative/conversational requests. Only use search for specific current information, news, or questions about recent events that you cannot answer from your own training."""}
-            ]
-            
-            # Add conversation history
-            for message in chat_history:
-                if message.type == "human":
-                    messages.append({"role": "user", "content": message.content})
-                elif message.type == "ai":
-                    messages.append({"role": "assistant", "content": message.content})
-            
-            # Add current prompt
-            messages.append({"role": "user", "content": prompt})
-            
-            # Get response from LLM
-            response = self.llm.invoke(messages).content.strip()
-            
-            # Save to memory
-            self.memory.chat_memory.add_user_message(prompt)
-            self.memory.chat_memory.add_ai_message(response)
-            
-            # Truncate response to 200 characters, ending at last full sentence if possible
-            if len(response) > 200:
-                truncated = response[:200]
-                last_punct = max(truncated.rfind('.'), truncated.rfind('!'), truncated.rfind('?'))
-                if last_punct != -1:
-                    response = truncated[:last_punct+1]
-                else:
-                    response = truncated
+            key = conversation_key(prompt, memory)
+            response = self._get_cached_response(key)
+            if not response:
+                response = self.in_flight.do(key, self._generate, prompt, memory)
+                # Cache the response
+                self._cache_response(key, response)
             
-            # Cache the response
-            self._cache_response(prompt, response)
+            # Save to memory, whether the reply was cached or not, so later turns keep the context
+            memory.chat_memory.add_user_message(prompt)
+            memory.chat_memory.add_ai_message(response)
             return response
             
         except Exception as e:
@@ -1,42 +1,50 @@
 import requests
 import json
 import time
-from functools import lru_cache
-import threading
-from langchain_openai import ChatOpenAI
+from agents.llm_backend import get_llm
 import re
+from utils.llm_streaming import stream_with_budget, truncate_to_budget
+from utils.answer_cache import AnswerCache
+from utils.single_flight import normalize_prompt
+from utils.config import config
+
+# Base URL of the SearXNG instance; point at dev/searxng_stub.py for offline runs
+SEARXNG_URL = config.get("searxng.base_url").rstrip("/")
+
+# Static system prompt, built once and kept first so prefix caching can hit
+SEARCH_SYSTEM_PROMPT = (
+    "You are a helpful assistant that converts search results into conversational responses. "
+    "Keep responses under 200 characters, natural and engaging. "
+    "Focus on the most relevant information from the search results."
+)
+SEARCH_SYSTEM_MESSAGE = {"role": "system", "content": SEARCH_SYSTEM_PROMPT}
+
+def classify_query(prompt):
+    """Return the query class (weather, time, population or default) that picks formatting and cache policy."""
+    prompt_lower = prompt.lower()
+    if "weather" in prompt_lower:
+        return "weather"
+    if "time" in prompt_lower:
+        return "time"
+    if "population" in prompt_lower:
+        return "population"
+    return "default"
 
 class SearchAgent3:
     def __init__(self):
         # Custom search API configuration
-        self.search_api_url = "http://192.168.194.33:8060/search"
+        self.search_api_url = f"{SEARXNG_URL}/search"
         self.search_api_format = "json"
         
         # LLM for processing search results
-        self.llm = ChatOpenAI(temperature=0.3, model_name="gpt-4o")
+        self.llm = get_llm("search")
         
-        # Cache configuration
-        self.response_cache = {}
-        self.cache_ttl = 3600  # Cache responses for 1 hour
-        self.cache_lock = threading.Lock()
+        # Answers are cached per query class with a soft and hard TTL; stale
+        # answers are served while being refreshed in the background
+        self.answer_cache = AnswerCache(name="search_agent3")
         self.last_search_time = 0
         self.min_search_interval = 1  # Minimum seconds between searches
 
-    @lru_cache(maxsize=100)
-    def _get_cached_response(self, prompt):
-        """Get a cached response if available and not expired."""
-        with self.cache_lock:
-            if prompt in self.response_cache:
-                timestamp, response = self.response_cache[prompt]
-                if time.time() - timestamp < self.cache_ttl:
-                    return response
-        return None
-
-    def _cache_response(self, prompt, response):
-        """Cache a response with timestamp."""
-        with self.cache_lock:
-            self.response_cache[prompt] = (time.time(), response)
-
     def _search_api_call(self, query):
         """Make a call to the custom search API."""
         try:
@@ -45,7 +53,7 @@ class SearchAgent3:
                 "format": self.search_api_format
             }
             
-            response = requests.get(self.search_api_url, params=params, timeout=10)
+            response = requests.get(self.search_api_url, params=params, timeout=config.get("searxng.timeout"))
             response.raise_for_status()
             
             return response.json()
@@ -90,16 +98,12 @@ class SearchAgent3:
         
         # Use LLM to create a conversational response
         try:
-            system_prompt = """You are a helpful assistant that converts search results into conversational responses. 
-            Keep responses under 200 characters, natural and engaging. 
-            Focus on the most relevant information from the search results."""
-            
             user_prompt = f"Query: {prompt}\nSearch results: {cleaned_content[:1000]}\n\nCreate a conversational response:"
             
-            response = self.llm.invoke([
-                {"role": "system", "content": system_prompt},
+            response = stream_with_budget(self.llm, [
+                SEARCH_SYSTEM_MESSAGE,
                 {"role": "user", "content": user_prompt}
-            ]).content.strip()
+            ], metric_name="search_agent3")
             
             return response
             
@@ -111,13 +115,13 @@ class SearchAgent3:
 
     def _format_special_queries(self, prompt, search_results):
         """Handle special query types with specific formatting."""
-        prompt_lower = prompt.lower()
+        query_class = classify_query(prompt)
         
-        if "weather" in prompt_lower:
+        if query_class == "weather":
             return self._format_weather_response(prompt, search_results)
-        elif "time" in prompt_lower:
+        elif query_class == "time":
             return self._format_time_response(prompt, search_results)
-        elif "population" in prompt_lower:
+        elif query_class == "population":
             return self._format_population_response(prompt, search_results)
         else:
             return self._make_conversational(prompt, self._extract_relevant_content(search_results, prompt))
@@ -172,41 +176,38 @@ class SearchAgent3:
             return match.group(1).strip()
         return "that location"
 
+    def _search_and_answer(self, prompt):
+        """Search and format an answer. Returns None if the search service is unavailable."""
+        # Rate limiting
+        current_time = time.time()
+        if current_time - self.last_search_time < self.min_search_interval:
+            time.sleep(self.min_search_interval)
+        
+        # Make search API call
+        search_results = self._search_api_call(prompt)
+        
+        if not search_results:
+            return None
+        
+        # Process and format the response
+        response = self._format_special_queries(prompt, search_results)
+        
+        # Truncate response if too long
+        response = truncate_to_budget(response)
+        self.last_search_time = time.time()
+        
+        return response
+
     def get_response(self, prompt):
         """Get a response using the custom search API."""
         try:
-            # Check cache first
-            cached_response = self._get_cached_response(prompt)
-            if cached_response:
-                return cached_response
-
-            # Rate limiting
-            current_time = time.time()
-            if current_time - self.last_search_time < self.min_search_interval:
-                time.sleep(self.min_search_interval)
-            
-            # Make search API call
-            search_results = self._search_api_call(prompt)
-            
-            if not search_results:
+            # Served from cache when possible; identical questions already
+            # being searched share that search
+            response = self.answer_cache.get(normalize_prompt(prompt), classify_query(prompt),
+                                             self._search_and_answer, prompt)
+            if response is None:
                 return "I apologize, but I couldn't access the search service right now. Could you try again later?"
             
-            # Process and format the response
-            response = self._format_special_queries(prompt, search_results)
-            
-            # Truncate response if too long
-            if len(response) > 200:
-                truncated = response[:200]
-                last_punct = max(truncated.rfind('.'), truncated.rfind('!'), truncated.rfind('?'))
-                if last_punct != -1:
-                    response = truncated[:last_punct+1]
-                else:
-                    response = truncated
-            
-            # Cache the response
-            self._cache_response(prompt, response)
-            self.last_search_time = time.time()
-            
             return response
             
         except Exception as e:
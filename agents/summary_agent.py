@@ -1,13 +1,24 @@
 import re
-from langchain_openai import ChatOpenAI
+from agents.llm_backend import get_llm
 import requests
 from datetime import datetime
 import pytz
+from utils.llm_streaming import record_usage
+from utils.tts_sanitizer import expand_symbols
+
+# Static system prompt, built once and kept first so prefix caching can hit
+SUMMARY_SYSTEM_PROMPT = (
+    "You are a helpful assistant at the UC Collaborative Robotics Lab in Canberra, Australia. "
+    "Summarize information to be relevant to Australians, using metric units and Australian context. "
+    "Keep responses under 200 characters, natural and engaging. "
+    "Focus on information that would be useful to someone in Canberra, Australia."
+)
+SUMMARY_SYSTEM_MESSAGE = {"role": "system", "content": SUMMARY_SYSTEM_PROMPT}
 
 class SummaryAgent:
     def __init__(self):
         # LLM for processing and filtering responses
-        self.llm = ChatOpenAI(temperature=0.2, model_name="gpt-4o")
+        self.llm = get_llm("summary")
         
         # Australian context
         self.location = "UC Collaborative Robotics Lab, Canberra, Australia"
@@ -108,18 +119,8 @@ class SummaryAgent:
         return text
 
     def rewrite_symbols_phonetically(self, text):
-        """Rewrite symbols like °C, km, kg, cm, % phonetically for TTS."""
-        # Replace °C with degrees Celsius
-        text = re.sub(r"°C", " degrees Celsius", text)
-        # Replace km with kilometres (if not already part of a word)
-        text = re.sub(r"\bkm\b", "kilometres", text)
-        # Replace kg with kilograms
-        text = re.sub(r"\bkg\b", "kilograms", text)
-        # Replace cm with centimetres
-        text = re.sub(r"\bcm\b", "centimetres", text)
-        # Replace % with percent
-        text = re.sub(r"%", " percent", text)
-        return text
+        """Rewrite symbols like °C, km, kg, cm, % phonetically for TTS, in one pass."""
+        return expand_symbols(text)
 
     def summarize_and_filter(self, search_response, original_query):
         """Summarize and filter the search response for Australian context."""
@@ -134,17 +135,14 @@ class SummaryAgent:
             filtered_text = self.add_australian_context(filtered_text, original_query)
             
             # Use LLM to create a concise, Australian-focused summary
-            system_prompt = """You are a helpful assistant at the UC Collaborative Robotics Lab in Canberra, Australia. 
-            Summarize information to be relevant to Australians, using metric units and Australian context.
-            Keep responses under 200 characters, natural and engaging.
-            Focus on information that would be useful to someone in Canberra, Australia."""
-            
             user_prompt = f"Original query: {original_query}\nSearch response: {filtered_text}\n\nCreate an Australian-focused summary:"
             
-            response = self.llm.invoke([
-                {"role": "system", "content": system_prompt},
+            result = self.llm.invoke([
+                SUMMARY_SYSTEM_MESSAGE,
                 {"role": "user", "content": user_prompt}
-            ]).content.strip()
+            ])
+            record_usage(result, "summary_agent")
+            response = result.content.strip()
             
             # Rewrite symbols phonetically for TTS
             response = self.rewrite_symbols_phonetically(response)
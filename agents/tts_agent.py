@@ -1,13 +1,73 @@
-from elevenlabs import play
+from elevenlabs import play, stream
 from elevenlabs.client import ElevenLabs
 import os
+import threading
 import time
+from agents.tts_backends import TTSBackend, SpeechStarted, LocalTTSBackend, FailoverTTS
+from utils.config import config
+from utils.filler_scheduler import SHORT_FILLERS, LONG_FILLERS, SEARCH_FILLERS
+from utils.metrics import metrics
+from utils.tts_cache import PhraseAudioCache, phrase_key
 
-class TTSAgent:
-    def __init__(self):
-        self.client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+# pcm_* formats need no decoder and can be written straight to the sound card,
+# which starts playback sooner than mp3 (try pcm_22050 for the lowest latency)
+TTS_OUTPUT_FORMAT = config.get("tts.output_format")
+TTS_STREAMING = config.get("tts.streaming")
+TTS_STREAMING_LATENCY = config.get("tts.streaming_latency")  # ElevenLabs optimize_streaming_latency, 0-4
+ELEVENLABS_TIMEOUT = config.get("tts.elevenlabs_timeout")  # seconds per request
+
+def play_pcm_stream(chunks, sample_rate):
+    """Play 16-bit mono PCM chunks as they arrive."""
+    import sounddevice as sd
+
+    with sd.RawOutputStream(samplerate=sample_rate, channels=1, dtype='int16') as out:
+        remainder = b""
+        for chunk in chunks:
+            data = remainder + chunk
+            # Only whole samples can be written; keep a trailing odd byte for the next chunk
+            usable = len(data) - len(data) % 2
+            if usable:
+                out.write(data[:usable])
+            remainder = data[usable:]
+
+def play_audio_stream(chunks, output_format):
+    """Default player: PCM goes straight to the sound card, encoded formats through elevenlabs.stream."""
+    if output_format.startswith("pcm_"):
+        play_pcm_stream(chunks, int(output_format.split("_")[1]))
+    else:
+        stream(chunks)
+
+# Fixed phrases spoken often enough to synthesize once and keep
+STOCK_PHRASES = SHORT_FILLERS + LONG_FILLERS + SEARCH_FILLERS + [
+    "I apologize, but I encountered an error. Could you please try rephrasing your question?",
+    "I'm having trouble processing that right now. Could you try rephrasing?",
+    "I couldn't find specific information about that. Could you try rephrasing your question?",
+]
+
+class TTSAgent(TTSBackend):
+    """
+    ElevenLabs speech with a phrase cache and streaming playback.
+
+    The agent is itself a TTS backend (say() raises on failure); speak() puts
+    it in front of the given fallback backends, the local CPU engine by
+    default, so speech carries on when ElevenLabs is slow or unreachable.
+    """
+
+    name = "elevenlabs"
+
+    def __init__(self, audio_cache=None, streaming=TTS_STREAMING, output_format=TTS_OUTPUT_FORMAT, player=None,
+                 fallbacks=None):
+        self.client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"), timeout=ELEVENLABS_TIMEOUT)
         self.voice_id = "21m00Tcm4TlvDq8ikWAM"  # Rachel's voice
-        
+        self.model_id = "eleven_multilingual_v2"
+        self.output_format = output_format
+
+        # Streaming playback starts speaking on the first audio chunk
+        self.streaming = streaming
+        self.streaming_latency = TTS_STREAMING_LATENCY
+        self.player = player or play_audio_stream
+        self.last_time_to_first_audio = None
+
         # Emotion-based voice settings
         self.emotion_settings = {
             "happy": {"stability": 0.3, "similarity_boost": 0.8},
@@ -16,29 +76,125 @@ class TTSAgent:
             "neutral": {"stability": 0.5, "similarity_boost": 0.75}
         }
 
+        # Synthesized audio, addressed by text, voice, settings and model
+        self.audio_cache = audio_cache if audio_cache is not None else PhraseAudioCache()
+
+        # ElevenLabs first, then the offline engines
+        self.backends = FailoverTTS([self] + list(fallbacks if fallbacks is not None else [LocalTTSBackend()]))
+
+    def _settings(self, emotion):
+        return self.emotion_settings.get(emotion, self.emotion_settings["neutral"])
+
+    def cache_key(self, text, emotion="neutral"):
+        """Content address of the audio for text spoken with this voice and emotion."""
+        return phrase_key(text, voice_id=self.voice_id, settings=self._settings(emotion),
+                          model_id=self.model_id, output_format=self.output_format)
+
+    def synthesize(self, text, emotion="neutral"):
+        """Return encoded audio for text, from the phrase cache when possible."""
+        key = self.cache_key(text, emotion)
+        audio = self.audio_cache.get(key)
+        if audio is not None:
+            return audio
+
+        audio = self.client.text_to_speech.convert(
+            voice_id=self.voice_id,
+            text=text,
+            model_id=self.model_id,
+            output_format=self.output_format,
+            voice_settings=self._settings(emotion),
+            optimize_streaming_latency=0
+        )
+        # The client yields the audio in chunks
+        audio = audio if isinstance(audio, bytes) else b"".join(audio)
+        self.audio_cache.put(key, audio)
+        return audio
+
+    def prerender(self, phrases=STOCK_PHRASES, emotion="neutral"):
+        """Synthesize phrases that are not cached yet. Returns how many were rendered."""
+        rendered = 0
+        for phrase in phrases:
+            if self.cache_key(phrase, emotion) in self.audio_cache:
+                continue
+            try:
+                self.synthesize(phrase, emotion)
+                rendered += 1
+            except Exception as e:
+                print(f"Could not pre-render '{phrase}': {str(e)}")
+        return rendered
+
+    def prerender_threaded(self, phrases=STOCK_PHRASES, emotion="neutral"):
+        """Pre-render phrases in the background, e.g. at startup."""
+        thread = threading.Thread(target=self.prerender, args=(phrases, emotion), daemon=True)
+        thread.start()
+        return thread
+
+    def _timed_chunks(self, chunks, start_time, started):
+        """Pass chunks through, recording time-to-first-audio when the first one reaches the player."""
+        first = True
+        for chunk in chunks:
+            if first and chunk:
+                self.last_time_to_first_audio = (time.time() - start_time) * 1000
+                metrics.record("tts.time_to_first_audio", self.last_time_to_first_audio)
+                started.set()
+                first = False
+            yield chunk
+
+    def _stream_and_cache(self, text, emotion):
+        """Yield audio chunks from the streaming API and cache the whole phrase once it completes."""
+        chunks = []
+        for chunk in self.client.text_to_speech.stream(
+            voice_id=self.voice_id,
+            text=text,
+            model_id=self.model_id,
+            output_format=self.output_format,
+            voice_settings=self._settings(emotion),
+            optimize_streaming_latency=self.streaming_latency
+        ):
+            chunks.append(chunk)
+            yield chunk
+        self.audio_cache.put(self.cache_key(text, emotion), b"".join(chunks))
+
+    def speak_streaming(self, text, emotion="neutral"):
+        """Speak text, starting playback as soon as the first audio chunk arrives."""
+        start_time = time.time()
+        audio = self.audio_cache.get(self.cache_key(text, emotion))
+        chunks = [audio] if audio is not None else self._stream_and_cache(text, emotion)
+        started = threading.Event()
+        try:
+            self.player(self._timed_chunks(chunks, start_time, started), self.output_format)
+        except Exception as e:
+            if started.is_set():
+                # Part of the sentence has been played; another engine would repeat it
+                raise SpeechStarted(f"ElevenLabs stream broke off: {str(e)}") from e
+            raise
+        return (time.time() - start_time) * 1000
+
+    def say(self, text, emotion="neutral"):
+        """Speak text through ElevenLabs only, raising on failure."""
+        if self.streaming:
+            return self.speak_streaming(text, emotion)
+
+        start_time = time.time()
+
+        # Cached phrases play without an API call
+        audio = self.synthesize(text, emotion)
+
+        # Play the audio
+        if self.output_format.startswith("pcm_"):
+            self.player(iter([audio]), self.output_format)
+        else:
+            play(audio)
+
+        return (time.time() - start_time) * 1000
+
     def speak(self, text, emotion="neutral"):
-        """Convert text to speech with emotion-based voice settings."""
+        """Convert text to speech with emotion-based voice settings, falling back to local engines."""
         try:
             start_time = time.time()
-            
-            # Get voice settings for the emotion
-            settings = self.emotion_settings.get(emotion, self.emotion_settings["neutral"])
-            
-            # Generate audio with emotion settings
-            audio = self.client.text_to_speech.convert(
-                voice_id=self.voice_id,
-                text=text,
-                model_id="eleven_multilingual_v2",
-                output_format="mp3_44100_128",
-                voice_settings=settings,
-                optimize_streaming_latency=0
-            )
-            
-            # Play the audio
-            play(audio)
-            
+            self.backends.say(text, emotion)
             return (time.time() - start_time) * 1000  # Return processing time in ms
-            
+
         except Exception as e:
             print(f"Error in TTSAgent.speak: {str(e)}")
-            return 0 
\ No newline at end of file
+            return 0
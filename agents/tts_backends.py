@@ -0,0 +1,159 @@
+import abc
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+import requests
+from utils.config import config
+from utils.metrics import metrics
+
+# Failing over fast matters more than waiting out a bad network. Timeouts and
+# the failover cooldown come from tts.* in the config and are read per call
+# unless given explicitly, so they can be retuned while running.
+
+# Local engine, e.g. "espeak-ng -v en-gb" or "piper --model en_GB-alba-medium.onnx --output-raw | aplay -r 22050 -f S16_LE"
+LOCAL_TTS_COMMAND = config.get("tts.local_command")
+LOCAL_TTS_TEXT_ON_STDIN = config.get("tts.local_text_on_stdin")  # piper reads text from stdin
+
+def _configured(value, key):
+    """Return value if it was given explicitly, otherwise the current config setting."""
+    return config.get(key) if value is None else value
+
+class SpeechStarted(Exception):
+    """
+    A backend failed after it had started speaking the sentence.
+
+    Backends raise it, chained to the underlying error, when some of the
+    audio may already have been heard; speaking the sentence again on another
+    backend would repeat it.
+    """
+
+class TTSBackend(abc.ABC):
+    """
+    Something that can speak a sentence.
+
+    say() blocks until the sentence has been spoken (or handed to a device
+    that speaks it) and raises on failure, so FailoverTTS can move on to the
+    next backend. A failure once audio has started is raised as
+    SpeechStarted, which FailoverTTS does not retry elsewhere.
+    """
+
+    name = "tts"
+
+    @abc.abstractmethod
+    def say(self, text, emotion="neutral"):
+        """Speak text, raising if this backend could not."""
+
+class PepperSayBackend(TTSBackend):
+    """Pepper's own TTS through its /say HTTP endpoint."""
+
+    name = "pepper"
+
+    def __init__(self, ip, port, connect_timeout=None, read_timeout=None):
+        self.url = f"http://{ip}:{port}/say"
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.session = requests.Session()
+
+    def say(self, text, emotion="neutral"):
+        timeout = (_configured(self.connect_timeout, "tts.connect_timeout"),
+                   _configured(self.read_timeout, "tts.read_timeout"))
+        try:
+            response = self.session.get(self.url, params={"text": text}, timeout=timeout)
+        except requests.exceptions.ReadTimeout as e:
+            # The request reached Pepper, which may be speaking it already
+            raise SpeechStarted(f"no reply from {self.url}") from e
+        response.raise_for_status()
+        return response.text
+
+class LocalTTSBackend(TTSBackend):
+    """
+    Offline CPU engine run as a command, espeak-ng by default.
+
+    The text is appended as the last argument, or written to stdin for engines
+    such as piper (tts.local_text_on_stdin). Commands containing a pipe are
+    run through the shell.
+    """
+
+    name = "local"
+
+    def __init__(self, command=LOCAL_TTS_COMMAND, text_on_stdin=LOCAL_TTS_TEXT_ON_STDIN, timeout=None):
+        self.command = command
+        self.text_on_stdin = text_on_stdin
+        self.timeout = timeout
+
+    def available(self):
+        parts = shlex.split(self.command)
+        return bool(parts) and shutil.which(parts[0]) is not None
+
+    def say(self, text, emotion="neutral"):
+        if not self.available():
+            raise RuntimeError(f"local TTS engine not found: {self.command}")
+        if "|" in self.command:
+            command = self.command if self.text_on_stdin else f"{self.command} {shlex.quote(text)}"
+            shell = True
+        else:
+            command = shlex.split(self.command) + ([] if self.text_on_stdin else [text])
+            shell = False
+        try:
+            subprocess.run(command, input=text.encode("utf-8") if self.text_on_stdin else None,
+                           shell=shell, check=True, timeout=_configured(self.timeout, "tts.read_timeout"),
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except subprocess.TimeoutExpired as e:
+            # The engine was running, so it was most likely speaking
+            raise SpeechStarted(f"local TTS engine timed out: {self.command}") from e
+
+class FailoverTTS:
+    """
+    Speaks through the first healthy backend in order.
+
+    A backend that raises (connection refused, timeout, missing engine) is
+    skipped for `cooldown` seconds (tts.failover_cooldown unless given), so during a Wi-Fi drop only the first
+    sentence pays the connect timeout and the rest go straight to the local
+    engine. A SpeechStarted failure (the backend timed out or broke off after
+    audio started) puts the backend on cooldown too but is raised instead of
+    failing over, since another engine would say the sentence twice; each
+    backend decides what counts as started. Latency per backend is recorded as tts.<name>, with
+    tts.<name>.failures and tts.failovers counting the fallbacks.
+    """
+
+    def __init__(self, backends, cooldown=None):
+        self.backends = list(backends)
+        self.cooldown = cooldown
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def _healthy(self, backend):
+        with self._lock:
+            return time.monotonic() >= self._down_until.get(backend.name, 0)
+
+    def _mark_down(self, backend):
+        with self._lock:
+            self._down_until[backend.name] = time.monotonic() + _configured(self.cooldown, "tts.failover_cooldown")
+
+    def say(self, text, emotion="neutral"):
+        """Speak text, returning the name of the backend that spoke it."""
+        candidates = [b for b in self.backends if self._healthy(b)] or self.backends
+        last_error = None
+        for backend in candidates:
+            start_time = time.time()
+            try:
+                backend.say(text, emotion)
+            except SpeechStarted as e:
+                metrics.increment(f"tts.{backend.name}.interrupted")
+                self._mark_down(backend)
+                print(f"TTS backend '{backend.name}' failed mid-sentence: {str(e)}")
+                raise
+            except Exception as e:
+                last_error = e
+                metrics.increment(f"tts.{backend.name}.failures")
+                self._mark_down(backend)
+                print(f"TTS backend '{backend.name}' failed: {str(e)}")
+                continue
+            metrics.record(f"tts.{backend.name}", (time.time() - start_time) * 1000)
+            if backend is not self.backends[0]:
+                metrics.increment("tts.failovers")
+            return backend.name
+        raise RuntimeError(f"all TTS backends failed: {last_error}")
@@ -1,75 +1,142 @@
-from typing import Dict, Callable
-import importlib
+from typing import Callable, Dict, Optional
+import glob
 import os
+import threading
+from choreography.routines import Routine, RoutineError, load_routine
+from utils.metrics import metrics
+
+ROUTINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routines")
+ROUTINES_WATCH_INTERVAL = 2.0  # seconds between checks for added, edited or removed routines
+
+def _connect():
+    # Imported on first use, so loading routines needs nothing but the standard library
+    from choreography.pepper_connection import PepperConnection
+    return PepperConnection()
 
 class ChoreographyEngine:
     """
     A class that manages and executes emotion-based movement sequences for Pepper robot.
-    
-    This engine dynamically loads movement handlers from Python files in the choreography directory.
-    Each emotion (like 'happy', 'sad') should have its own Python file with an execute_movement() function
-    that defines the specific movement sequence for that emotion.
-    
+
+    Routines are JSON keyframe files in the routines directory, one per emotion
+    (happy.json, sad.json). Each is validated and precompiled into motion
+    batches when loaded (see choreography/routines.py), so playing one is a
+    flat list of requests over a single shared connection to Pepper. The
+    directory is re-scanned by check(), or periodically after
+    start_watching(): new, edited and removed files take effect without a
+    restart, and a file that fails validation keeps its previous version.
+
     Attributes:
-        emotion_handlers (Dict[str, Callable]): A dictionary mapping emotion names to their
-            corresponding movement functions. For example: {'happy': happy.execute_movement}
+        routines (Dict[str, Routine]): A dictionary mapping emotion names to their
+            compiled routines. For example: {'happy': <Routine happy>}
     """
-    
-    def __init__(self):
+
+    def __init__(self, routines_dir: str = ROUTINES_DIR, connect: Callable = _connect):
         """
-        Initialize the ChoreographyEngine.
-        Creates an empty dictionary for emotion handlers and loads all available handlers.
+        Initialize the ChoreographyEngine and load all available routines.
+
+        Args:
+            routines_dir (str): Directory of routine files
+            connect (Callable): Returns a connection to Pepper; called on the first movement
         """
-        self.emotion_handlers: Dict[str, Callable] = {}
-        self._load_emotion_handlers()
-    
-    def _load_emotion_handlers(self):
+        self.routines_dir = routines_dir
+        self.connect = connect
+        self.routines: Dict[str, Routine] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._connection = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.check()
+
+    def check(self) -> bool:
         """
-        Dynamically load all emotion handler modules from the choreography directory.
-        
-        This method:
-        1. Scans the choreography directory for Python files
-        2. For each file (excluding __init__.py), attempts to import it as a module
-        3. If the module has an execute_movement function, adds it to emotion_handlers
-        
-        Example:
-            If there's a file 'happy.py' with an execute_movement() function,
-            it will be loaded and accessible via emotion_handlers['happy']
+        Reload routines whose files were added, edited or removed since the last check.
+
+        Returns:
+            bool: True if the set of routines changed
         """
-        choreography_dir = os.path.dirname(os.path.abspath(__file__))
-        for filename in os.listdir(choreography_dir):
-            if filename.endswith('.py') and not filename.startswith('__'):
-                emotion_name = filename[:-3]  # Remove .py extension
-                try:
-                    module = importlib.import_module(f"choreography.{emotion_name}")
-                    if hasattr(module, 'execute_movement'):
-                        self.emotion_handlers[emotion_name] = module.execute_movement
-                except ImportError as e:
-                    print(f"Warning: Could not load {emotion_name} handler: {e}")
-    
+        mtimes = {path: os.path.getmtime(path) for path in glob.glob(os.path.join(self.routines_dir, "*.json"))}
+        if mtimes == self._mtimes:
+            return False
+        routines = dict(self.routines)
+        for path in set(self._mtimes) - set(mtimes):
+            name = os.path.splitext(os.path.basename(path))[0].lower()
+            if name in routines and routines[name].path == path:
+                del routines[name]
+                print(f"Removed choreography routine: {name}")
+        for path, mtime in mtimes.items():
+            if self._mtimes.get(path) == mtime:
+                continue
+            try:
+                routine = load_routine(path)
+            except RoutineError as e:
+                metrics.increment("choreography.load_failures")
+                print(f"Warning: Could not load routine {os.path.basename(path)}: {e}")
+                continue
+            routines[routine.name] = routine
+            metrics.increment("choreography.loads")
+        self.routines = routines
+        self._mtimes = mtimes
+        return True
+
+    def start_watching(self, interval: float = ROUTINES_WATCH_INTERVAL):
+        """Re-scan the routines directory in a daemon thread, so routines can be added without a restart."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._watcher = threading.Thread(target=loop, name="choreography-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        self._watcher = None
+
+    def _pepper(self):
+        """Return the shared connection, opening it on first use and reconnecting if it dropped."""
+        if self._connection is None:
+            self._connection = self.connect()
+        elif not getattr(self._connection, "connected", True):
+            self._connection.connect()
+        return self._connection
+
     def execute_emotion(self, emotion_tag: str) -> bool:
         """
         Execute the movement sequence corresponding to the given emotion tag.
-        
+
         Args:
             emotion_tag (str): The emotion tag to execute movement for (e.g., 'happy', 'sad')
-            
+
         Returns:
             bool: True if movement was executed successfully, False otherwise
-            
+
         Example:
             >>> engine = ChoreographyEngine()
             >>> engine.execute_emotion('happy')  # Executes the happy movement sequence
             True
         """
         emotion_tag = emotion_tag.lower()
-        if emotion_tag in self.emotion_handlers:
+        routine: Optional[Routine] = self.routines.get(emotion_tag)
+        if routine is None:
+            print(f"No movement routine found for emotion: {emotion_tag}")
+            return False
+        # One routine at a time; interleaved batches would fight over the same joints
+        with self._lock:
             try:
-                self.emotion_handlers[emotion_tag]()
+                routine.play(self._pepper())
+                metrics.increment(f"choreography.{emotion_tag}")
                 return True
             except Exception as e:
                 print(f"Error executing movement for {emotion_tag}: {e}")
                 return False
-        else:
-            print(f"No movement handler found for emotion: {emotion_tag}")
-            return False 
\ No newline at end of file
+
+    def close(self):
+        """Stop watching and put Pepper in its rest position."""
+        self.stop_watching()
+        if self._connection is not None:
+            self._connection.disconnect()
+            self._connection = None
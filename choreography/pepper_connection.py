@@ -2,20 +2,23 @@ import requests
 import json
 import time
 from typing import Optional, Dict, List
+from utils.config import config
 
 class PepperConnection:
     """
     Handles connection to Pepper robot using REST API.
     This version doesn't require local NAOqi SDK installation.
     """
-    def __init__(self, ip: str = "10.0.0.244", port: int = 5000):
+    def __init__(self, ip: Optional[str] = None, port: Optional[int] = None):
         """
         Initialize connection to Pepper robot.
         
         Args:
-            ip (str): Pepper's IP address (default is 10.0.0.244)
-            port (int): Pepper's port (default is 5000)
+            ip (str): Pepper's IP address (default is pepper.ip from the config)
+            port (int): Pepper's port (default is pepper.port from the config)
         """
+        ip = ip or config.get("pepper.ip")
+        port = port or config.get("pepper.port")
         self.ip = ip
         self.port = port
         self.base_url = f"http://{ip}:{port}"
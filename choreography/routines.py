@@ -0,0 +1,189 @@
+from typing import Dict, List, Tuple
+import json
+import os
+
+# Pepper joint limits in radians (Aldebaran Pepper joint documentation)
+JOINT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "HeadYaw": (-2.0857, 2.0857),
+    "HeadPitch": (-0.7068, 0.6371),
+    "LShoulderPitch": (-2.0857, 2.0857),
+    "RShoulderPitch": (-2.0857, 2.0857),
+    "LShoulderRoll": (0.0087, 1.5620),
+    "RShoulderRoll": (-1.5620, -0.0087),
+    "LElbowYaw": (-2.0857, 2.0857),
+    "RElbowYaw": (-2.0857, 2.0857),
+    "LElbowRoll": (-1.5620, -0.0087),
+    "RElbowRoll": (0.0087, 1.5620),
+    "LWristYaw": (-1.8239, 1.8239),
+    "RWristYaw": (-1.8239, 1.8239),
+    "LHand": (0.0, 1.0),
+    "RHand": (0.0, 1.0),
+    "HipRoll": (-0.5149, 0.5149),
+    "HipPitch": (-1.0385, 1.0385),
+    "KneePitch": (-0.5149, 0.5149),
+}
+POSTURES = {"Stand", "StandInit", "StandZero", "Crouch"}
+MAX_REPEAT = 20
+MAX_STEPS = 500  # Upper bound on a compiled routine, so a nested repeat cannot run for minutes
+
+class RoutineError(ValueError):
+    """A routine file is malformed or moves a joint outside Pepper's limits."""
+
+class MotionBatch:
+    """
+    One command sent to Pepper: a posture change or a set of joints moved together.
+
+    Attributes:
+        posture (str): Posture name, or None for a joint batch
+        joints (List[str]): Joint names moved in this batch
+        angles (List[float]): Target angles in radians, in the same order as joints
+        speed (float): Fraction of maximum speed (0.0 to 1.0]
+        wait (bool): Whether to wait for the movement to finish before the next batch
+    """
+
+    def __init__(self, speed: float, wait: bool, posture: str = None, joints: List[str] = None,
+                 angles: List[float] = None):
+        self.posture = posture
+        self.joints = joints or []
+        self.angles = angles or []
+        self.speed = speed
+        self.wait = wait
+
+    def send(self, pepper):
+        """Send this batch over a PepperConnection (or anything with the same methods)."""
+        if self.posture is not None:
+            pepper.go_to_posture(self.posture, self.speed)
+        else:
+            pepper.move_joints(self.joints, self.angles, self.speed)
+        if self.wait:
+            pepper.wait_for_movement()
+
+    def __eq__(self, other):
+        return isinstance(other, MotionBatch) and vars(self) == vars(other)
+
+    def __repr__(self):
+        target = self.posture or dict(zip(self.joints, self.angles))
+        return f"MotionBatch({target!r}, speed={self.speed}, wait={self.wait})"
+
+class Routine:
+    """
+    A validated, precompiled movement routine.
+
+    Attributes:
+        name (str): Emotion tag the routine is played for
+        description (str): Free-text description from the file
+        batches (List[MotionBatch]): Commands in the order they are sent
+        path (str): File the routine was loaded from, if any
+    """
+
+    def __init__(self, name: str, description: str, batches: List[MotionBatch], path: str = None):
+        self.name = name
+        self.description = description
+        self.batches = batches
+        self.path = path
+
+    def play(self, pepper):
+        for batch in self.batches:
+            batch.send(pepper)
+
+def _speed(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 < value <= 1:
+        raise RoutineError(f"{where}: speed must be a number in (0, 1], got {value!r}")
+    return float(value)
+
+def _compile_keyframe(frame, speed, where):
+    if not isinstance(frame, dict):
+        raise RoutineError(f"{where}: keyframe must be an object")
+    unknown = set(frame) - {"posture", "joints", "speed", "wait"}
+    if unknown:
+        raise RoutineError(f"{where}: unknown keys {sorted(unknown)}")
+    speed = _speed(frame.get("speed", speed), where)
+    wait = frame.get("wait", True)
+    if not isinstance(wait, bool):
+        raise RoutineError(f"{where}: wait must be true or false")
+    if ("posture" in frame) == ("joints" in frame):
+        raise RoutineError(f"{where}: keyframe needs exactly one of posture or joints")
+    if "posture" in frame:
+        if frame["posture"] not in POSTURES:
+            raise RoutineError(f"{where}: unknown posture {frame['posture']!r}")
+        return MotionBatch(speed, wait, posture=frame["posture"])
+    joints = frame["joints"]
+    if not isinstance(joints, dict) or not joints:
+        raise RoutineError(f"{where}: joints must be a non-empty object of joint name to angle")
+    for joint, angle in joints.items():
+        if joint not in JOINT_LIMITS:
+            raise RoutineError(f"{where}: unknown joint {joint!r}")
+        low, high = JOINT_LIMITS[joint]
+        if isinstance(angle, bool) or not isinstance(angle, (int, float)) or not low <= angle <= high:
+            raise RoutineError(f"{where}: {joint} angle must be between {low} and {high}, got {angle!r}")
+    return MotionBatch(speed, wait, joints=list(joints), angles=[float(a) for a in joints.values()])
+
+def _compile_frames(frames, speed, where, batches):
+    if not isinstance(frames, list) or not frames:
+        raise RoutineError(f"{where}: keyframes must be a non-empty list")
+    for i, frame in enumerate(frames):
+        frame_where = f"{where}[{i}]"
+        if isinstance(frame, dict) and "repeat" in frame:
+            count = frame["repeat"]
+            if isinstance(count, bool) or not isinstance(count, int) or not 1 <= count <= MAX_REPEAT:
+                raise RoutineError(f"{frame_where}: repeat must be an integer from 1 to {MAX_REPEAT}")
+            unknown = set(frame) - {"repeat", "keyframes", "speed"}
+            if unknown:
+                raise RoutineError(f"{frame_where}: unknown keys {sorted(unknown)}")
+            body = []
+            _compile_frames(frame.get("keyframes"), _speed(frame.get("speed", speed), frame_where),
+                            f"{frame_where}.keyframes", body)
+            for _ in range(count):
+                for batch in body:
+                    _append(batches, MotionBatch(batch.speed, batch.wait, batch.posture,
+                                                 list(batch.joints), list(batch.angles)))
+        else:
+            _append(batches, _compile_keyframe(frame, speed, frame_where))
+        if len(batches) > MAX_STEPS:
+            raise RoutineError(f"{where}: routine compiles to more than {MAX_STEPS} batches")
+
+def _append(batches, batch):
+    """Add batch, merging it into the previous joint batch if that one does not wait and shares its speed."""
+    previous = batches[-1] if batches else None
+    if (previous is not None and previous.posture is None and batch.posture is None and not previous.wait
+            and previous.speed == batch.speed and not set(previous.joints) & set(batch.joints)):
+        previous.joints += batch.joints
+        previous.angles += batch.angles
+        previous.wait = batch.wait
+    else:
+        batches.append(batch)
+
+def compile_routine(data: dict, name: str, path: str = None) -> Routine:
+    """
+    Validate a routine definition and compile it into motion batches.
+
+    A definition is {"description": ..., "speed": default speed, "keyframes": [...]}.
+    Each keyframe sets a posture ({"posture": "Stand"}) or joint angles
+    ({"joints": {"HeadPitch": 0.3}}), optionally with its own speed and
+    "wait": false to run into the next keyframe. {"repeat": n, "keyframes":
+    [...]} repeats a group. Repeats are unrolled, and consecutive joint
+    keyframes that do not wait are merged into one batch, so playing a
+    routine is a flat list of requests.
+
+    Raises:
+        RoutineError: If the definition is malformed or out of Pepper's joint limits
+    """
+    if not isinstance(data, dict):
+        raise RoutineError(f"{name}: routine must be an object")
+    unknown = set(data) - {"description", "speed", "keyframes"}
+    if unknown:
+        raise RoutineError(f"{name}: unknown keys {sorted(unknown)}")
+    speed = _speed(data.get("speed", 0.5), name)
+    batches: List[MotionBatch] = []
+    _compile_frames(data.get("keyframes"), speed, f"{name}.keyframes", batches)
+    return Routine(name, data.get("description", ""), batches, path)
+
+def load_routine(path: str) -> Routine:
+    """Load and compile a routine file; the emotion tag is the file name without .json."""
+    name = os.path.splitext(os.path.basename(path))[0].lower()
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RoutineError(f"{name}: {e}") from e
+    return compile_routine(data, name, path)
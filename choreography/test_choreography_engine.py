@@ -2,58 +2,160 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import json
+import shutil
+import tempfile
 
 # Add the parent directory to the Python path so we can import the choreography module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from choreography.choreography_engine import ChoreographyEngine
+from choreography.routines import MotionBatch, RoutineError, compile_routine
+
+class FakePepper:
+    """Records the calls a routine makes instead of talking to the robot."""
+
+    def __init__(self):
+        self.connected = True
+        self.calls = []
+
+    def go_to_posture(self, posture, speed):
+        self.calls.append(("posture", posture, speed))
+
+    def move_joints(self, joints, angles, speed):
+        self.calls.append(("joints", dict(zip(joints, angles)), speed))
+
+    def wait_for_movement(self):
+        self.calls.append(("wait",))
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
 
 class TestChoreographyEngine(unittest.TestCase):
     def setUp(self):
         """Set up test cases."""
-        self.engine = ChoreographyEngine()
-    
+        self.pepper = FakePepper()
+        self.engine = ChoreographyEngine(connect=lambda: self.pepper)
+
     def test_initialization(self):
         """Test that the engine initializes properly."""
-        self.assertIsInstance(self.engine.emotion_handlers, dict)
-        # Check that happy and sad handlers are loaded
-        self.assertIn('happy', self.engine.emotion_handlers)
-        self.assertIn('sad', self.engine.emotion_handlers)
-    
+        self.assertIsInstance(self.engine.routines, dict)
+        # Check that happy and sad routines are loaded
+        self.assertIn('happy', self.engine.routines)
+        self.assertIn('sad', self.engine.routines)
+        # Only routine files are loaded, not every module in the directory
+        self.assertEqual(set(self.engine.routines), {'happy', 'sad'})
+
     def test_execute_emotion_happy(self):
         """Test executing the happy emotion movement."""
-        with patch('choreography.happy.execute_movement') as mock_happy:
-            result = self.engine.execute_emotion('happy')
-            self.assertTrue(result)
-            mock_happy.assert_called_once()
-    
+        result = self.engine.execute_emotion('happy')
+        self.assertTrue(result)
+        self.assertEqual(self.pepper.calls[0], ("posture", "Stand", 0.5))
+        self.assertEqual(self.pepper.calls[-2], ("posture", "Stand", 0.5))
+
     def test_execute_emotion_sad(self):
         """Test executing the sad emotion movement."""
-        with patch('choreography.sad.execute_movement') as mock_sad:
-            result = self.engine.execute_emotion('sad')
-            self.assertTrue(result)
-            mock_sad.assert_called_once()
-    
+        result = self.engine.execute_emotion('sad')
+        self.assertTrue(result)
+        self.assertIn(("joints", {"HeadPitch": 0.3}, 0.3), self.pepper.calls)
+
     def test_execute_emotion_case_insensitive(self):
         """Test that emotion tags are case insensitive."""
-        with patch('choreography.happy.execute_movement') as mock_happy:
-            result = self.engine.execute_emotion('HAPPY')
-            self.assertTrue(result)
-            mock_happy.assert_called_once()
-    
+        self.assertTrue(self.engine.execute_emotion('HAPPY'))
+
     def test_execute_nonexistent_emotion(self):
         """Test handling of non-existent emotion."""
         result = self.engine.execute_emotion('nonexistent')
         self.assertFalse(result)
-    
+
     def test_execute_emotion_with_error(self):
         """Test handling of errors during movement execution."""
-        with patch('choreography.happy.execute_movement', side_effect=Exception('Test error')):
-            result = self.engine.execute_emotion('happy')
-            self.assertFalse(result)
+        self.pepper.move_joints = MagicMock(side_effect=Exception('Test error'))
+        result = self.engine.execute_emotion('happy')
+        self.assertFalse(result)
+
+    def test_connection_is_reused(self):
+        """Test that routines share one connection instead of opening one each."""
+        connect = MagicMock(return_value=self.pepper)
+        engine = ChoreographyEngine(connect=connect)
+        engine.execute_emotion('happy')
+        engine.execute_emotion('sad')
+        connect.assert_called_once()
+
+class TestRoutineCompiler(unittest.TestCase):
+    def test_repeats_are_unrolled(self):
+        routine = compile_routine({"keyframes": [
+            {"repeat": 2, "keyframes": [{"joints": {"HipRoll": -0.1}}, {"joints": {"HipRoll": 0.1}}]}
+        ]}, "sway")
+        self.assertEqual([b.angles for b in routine.batches], [[-0.1], [0.1], [-0.1], [0.1]])
+
+    def test_keyframes_without_wait_are_merged(self):
+        routine = compile_routine({"speed": 0.4, "keyframes": [
+            {"joints": {"HeadPitch": 0.2}, "wait": False},
+            {"joints": {"HipPitch": 0.1}}
+        ]}, "nod")
+        self.assertEqual(routine.batches, [MotionBatch(0.4, True, joints=["HeadPitch", "HipPitch"], angles=[0.2, 0.1])])
+
+    def test_validation(self):
+        bad = [
+            {"keyframes": []},
+            {"keyframes": [{"joints": {"RKneePitch": 0.3}}]},
+            {"keyframes": [{"joints": {"HeadPitch": 2.0}}]},
+            {"keyframes": [{"posture": "Dance"}]},
+            {"keyframes": [{"posture": "Stand", "speed": 1.5}]},
+            {"keyframes": [{"repeat": 100, "keyframes": [{"posture": "Stand"}]}]},
+            {"keyframes": [{"posture": "Stand", "joints": {"HeadPitch": 0.1}}]},
+        ]
+        for data in bad:
+            with self.assertRaises(RoutineError, msg=data):
+                compile_routine(data, "bad")
+
+class TestHotReload(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.pepper = FakePepper()
+        self.engine = ChoreographyEngine(self.directory, connect=lambda: self.pepper)
+
+    def write(self, name, data, mtime):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        os.utime(path, (mtime, mtime))
+
+    def test_added_edited_and_removed_routines(self):
+        self.assertEqual(self.engine.routines, {})
+        self.write("nod.json", {"keyframes": [{"joints": {"HeadPitch": 0.2}}]}, 1000)
+        self.assertTrue(self.engine.check())
+        self.assertTrue(self.engine.execute_emotion('nod'))
+
+        self.write("nod.json", {"keyframes": [{"joints": {"HeadPitch": 0.4}}]}, 2000)
+        self.engine.check()
+        self.assertEqual(self.engine.routines['nod'].batches[0].angles, [0.4])
+
+        os.remove(os.path.join(self.directory, "nod.json"))
+        self.engine.check()
+        self.assertNotIn('nod', self.engine.routines)
+
+    def test_invalid_edit_keeps_previous_version(self):
+        self.write("nod.json", {"keyframes": [{"joints": {"HeadPitch": 0.2}}]}, 1000)
+        self.engine.check()
+        self.write("nod.json", '{"keyframes": [', 2000)
+        self.engine.check()
+        self.assertEqual(self.engine.routines['nod'].batches[0].angles, [0.2])
+
+    def test_unchanged_directory_is_not_reloaded(self):
+        self.write("nod.json", {"keyframes": [{"joints": {"HeadPitch": 0.2}}]}, 1000)
+        self.assertTrue(self.engine.check())
+        with patch('choreography.choreography_engine.load_routine') as load:
+            self.assertFalse(self.engine.check())
+            load.assert_not_called()
 
 def main():
     """Run the tests."""
     unittest.main()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -1,6 +1,11 @@
-from pepper_connection import PepperConnection
+import sys
+import os
 import time
 
+# Add the parent directory to the Python path so we can import the choreography and utils packages
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from choreography.pepper_connection import PepperConnection
+
 def test_connection():
     """Test the connection to Pepper and basic movement functionality."""
     print("Testing connection to Pepper...")
@@ -0,0 +1,69 @@
+import os
+import re
+import sys
+import timeit
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.tts_sanitizer import sanitize_for_tts, is_speakable
+from utils.sentence_splitter import split_into_sentences
+
+# Typical LLM replies: plain, emoji-heavy, markdown with links and symbols
+SAMPLES = [
+    "My circuits are buzzing with joy today! I'm functioning perfectly and excited to chat with you!",
+    "Hello there! 😊🤖 It's lovely to meet you 🎉. How can I help? 👋",
+    "**Canberra** is about 25°C today with a 10% chance of rain. See [the BoM](https://www.bom.gov.au) for more. ☀️",
+    "- It is 280 km to Sydney\n- The lab is at `UC` & open 9–5\n### Enjoy your visit! 🚀",
+]
+
+def old_contains_only_emoji(text):
+    """The previous check: recompiles the emoji regex for every sentence."""
+    cleaned_text = re.sub(r'\s+', '', text)
+    if not cleaned_text:
+        return False
+    emoji_pattern = re.compile(
+        r'[\U0001F600-\U0001F64F]'
+        r'|[\U0001F300-\U0001F5FF]'
+        r'|[\U0001F680-\U0001F6FF]'
+        r'|[\U0001F1E0-\U0001F1FF]'
+        r'|[\U00002600-\U000027BF]'
+        r'|[\U0001F900-\U0001F9FF]'
+        r'|[\U0001F018-\U0001F270]'
+        r'|[\U0001F004]'
+        r'|[\U0001F0CF]'
+        r'|[\U0001F170-\U0001F251]'
+    )
+    return len(re.sub(emoji_pattern, '', cleaned_text)) == 0
+
+def old_rewrite_symbols(text):
+    """The previous SummaryAgent.rewrite_symbols_phonetically: five separate passes."""
+    text = re.sub(r"°C", " degrees Celsius", text)
+    text = re.sub(r"\bkm\b", "kilometres", text)
+    text = re.sub(r"\bkg\b", "kilograms", text)
+    text = re.sub(r"\bcm\b", "centimetres", text)
+    text = re.sub(r"%", " percent", text)
+    return text
+
+def old_pipeline(text):
+    text = old_rewrite_symbols(text)
+    return [s for s in split_into_sentences(text) if not old_contains_only_emoji(s)]
+
+def new_pipeline(text):
+    return [s for s in split_into_sentences(sanitize_for_tts(text)) if is_speakable(s)]
+
+def main():
+    number = 2000
+    print(f"{'sample':<8}{'old (us)':>12}{'new (us)':>12}")
+    for i, sample in enumerate(SAMPLES):
+        # The regex cache hides recompilation cost, so purge it as a cold turn would see it
+        old = timeit.timeit(lambda: (re.purge(), old_pipeline(sample)), number=number) / number * 1e6
+        new = timeit.timeit(lambda: new_pipeline(sample), number=number) / number * 1e6
+        print(f"{i:<8}{old:>12.1f}{new:>12.1f}")
+
+    print("\nWhat reaches /say:")
+    for sample in SAMPLES:
+        print(f"  old: {old_pipeline(sample)}")
+        print(f"  new: {new_pipeline(sample)}")
+
+if __name__ == "__main__":
+    main()
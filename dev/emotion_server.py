@@ -1,26 +1,64 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, render_template_string
+import collections
+import itertools
+import json
+import threading
 
 app = Flask(__name__)
 
-# Store received data in memory
-received_emotions = []
+# Keep only the most recent events in memory
+MAX_EVENTS = 500
+received_emotions = collections.deque(maxlen=MAX_EVENTS)
+event_ids = itertools.count(1)
+events_changed = threading.Condition()
 
 @app.route('/emotion', methods=['POST'])
 def emotion_endpoint():
-    data = request.json
-    print(f"Received: {data}")
-    received_emotions.append(data)
-    return jsonify({"status": "ok"}), 200
+    data = request.get_json(silent=True)
+    # Accept a single event or a batch of events
+    events = data if isinstance(data, list) else [data]
+    if not all(isinstance(event, dict) for event in events):
+        return jsonify({"error": "expected a JSON event or a list of events"}), 400
+    with events_changed:
+        for event in events:
+            event = dict(event, id=next(event_ids))
+            received_emotions.append(event)
+        events_changed.notify_all()
+    print(f"Received {len(events)} emotion event(s)")
+    return jsonify({"status": "ok", "received": len(events)}), 200
+
+@app.route('/stream', methods=['GET'])
+def stream():
+    """Push new emotion events to the browser as Server-Sent Events."""
+    last_id = int(request.args.get("after", 0))
+
+    def generate():
+        nonlocal last_id
+        while True:
+            with events_changed:
+                events_changed.wait_for(
+                    lambda: received_emotions and received_emotions[-1]["id"] > last_id,
+                    timeout=15
+                )
+                new_events = [e for e in received_emotions if e["id"] > last_id]
+            if not new_events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in new_events:
+                last_id = event["id"]
+                yield f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
 
 @app.route('/', methods=['GET'])
 def index():
-    # Simple HTML template to display the received emotions
+    # Render the current buffer once; new events arrive over /stream
     html = """
     <!DOCTYPE html>
     <html>
     <head>
         <title>Emotion Posts</title>
-        <meta http-equiv="refresh" content="2">
         <style>
             body { font-family: Arial, sans-serif; margin: 2em; }
             h1 { color: #333; }
@@ -29,19 +67,46 @@ def index():
     </head>
     <body>
         <h1>Received Emotion Posts</h1>
+        <div id="emotions">
         {% for item in emotions %}
             <div class="emotion">
                 <strong>Sentence:</strong> {{ item['sentence'] }}<br>
                 <strong>Emotion:</strong> {{ item['emotion'] }}
             </div>
         {% else %}
-            <p>No emotion posts received yet.</p>
+            <p id="empty">No emotion posts received yet.</p>
         {% endfor %}
+        </div>
+        <script>
+            const container = document.getElementById("emotions");
+            const maxEvents = {{ max_events }};
+            const source = new EventSource("/stream?after={{ last_id }}");
+            source.onmessage = (msg) => {
+                const item = JSON.parse(msg.data);
+                const empty = document.getElementById("empty");
+                if (empty) empty.remove();
+                const div = document.createElement("div");
+                div.className = "emotion";
+                const sentence = document.createElement("strong");
+                sentence.textContent = "Sentence:";
+                const emotion = document.createElement("strong");
+                emotion.textContent = "Emotion:";
+                div.append(sentence, " " + item.sentence, document.createElement("br"),
+                           emotion, " " + item.emotion);
+                container.appendChild(div);
+                while (container.children.length > maxEvents) {
+                    container.removeChild(container.firstChild);
+                }
+            };
+        </script>
     </body>
     </html>
     """
-    return render_template_string(html, emotions=received_emotions)
+    with events_changed:
+        emotions = list(received_emotions)
+    last_id = emotions[-1]["id"] if emotions else 0
+    return render_template_string(html, emotions=emotions, last_id=last_id, max_events=MAX_EVENTS)
 
 if __name__ == "__main__":
     print("Starting emotion tag server on http://localhost:5000 ...")
-    app.run(port=5000)
\ No newline at end of file
+    app.run(port=5000, threaded=True)
@@ -3,6 +3,8 @@ from choreography.choreography_engine import ChoreographyEngine
 class ChoreographyOrchestrator:
     def __init__(self):
         self.engine = ChoreographyEngine()
+        # Routines added or edited in choreography/routines/ apply without a restart
+        self.engine.start_watching()
     
     def handle_emotion(self, emotion_tag: str) -> bool:
         """
@@ -25,6 +27,7 @@ def main():
     for emotion in test_emotions:
         success = orchestrator.handle_emotion(emotion)
         print(f"Handled {emotion}: {'Success' if success else 'Failed'}")
+    orchestrator.engine.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
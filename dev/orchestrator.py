@@ -5,6 +5,7 @@ from agents.pepper_agent import PepperAgent
 from agents.search_agent import SearchAgent
 from agents.tts_agent import TTSAgent
 from utils.sentence_splitter import split_into_sentences
+from utils.warmup import CacheWarmer, load_frequent_questions
 from stt_function import stt_function
 import time
 
@@ -17,6 +18,19 @@ class Orchestrator:
         self.pepper_agent = PepperAgent()
         self.search_agent = SearchAgent()
         self.tts_agent = TTSAgent()
+        self.tts_agent.prerender_threaded()  # Stock phrases then play without an API call
+
+        # Answer the frequent questions ahead of time and synthesize their sentences too
+        _, frequent_questions = load_frequent_questions()
+        self.warmer = CacheWarmer(
+            self.warm_answer,
+            questions=frequent_questions,
+            prerender=[lambda response: self.tts_agent.prerender(self.tts_sentences(response))]
+        )
+
+    def warm_answer(self, question):
+        """Answer a question for the cache warmer without touching the conversation memory."""
+        return self.get_response(question, memory=self.pepper_agent.new_memory())
 
     def remove_emojis(self, text):
         """Remove emojis and other problematic characters from text."""
@@ -63,6 +77,11 @@ class Orchestrator:
         ]
         return any(word in prompt.lower() for word in conversational_keywords)
 
+    def tts_sentences(self, response):
+        """The cleaned sentences of a response that process_response would speak."""
+        return [self.remove_emojis(sentence).strip() for sentence in split_into_sentences(response)
+                if not self.should_skip_tts(sentence)]
+
     def process_response(self, response):
         """Process the response by splitting into sentences and handling TTS."""
         sentences = split_into_sentences(response)
@@ -88,10 +107,8 @@ class Orchestrator:
 
         return sentences, tts_timings, total_tts_time
 
-    def handle_input(self, user_input):
-        """Handle user input by routing to appropriate agent and processing response."""
-        start_time = time.time()
-        
+    def get_response(self, user_input, memory=None):
+        """Route user input to the appropriate agent and return its response."""
         # Check if it's a conversational/creative query
         conversational_keywords = [
             "how are you", "hello", "hi", "hey", "greetings", "good morning", "good afternoon", "good evening",
@@ -101,44 +118,52 @@ class Orchestrator:
             "make me laugh", "something interesting", "something exciting"
         ]
         
+        # If it's a conversational query, use Pepper's personality directly
+        if any(keyword in user_input.lower() for keyword in conversational_keywords):
+            response = self.pepper_agent.get_response(user_input, memory=memory)
+        # For factual queries, try to use search agent but fall back to Pepper's personality if no internet
+        elif any(keyword in user_input.lower() for keyword in ["weather", "news", "current", "latest", "who", "what", "when", "where", "why", "how"]):
+            try:
+                search_response = self.search_agent.get_response(user_input)
+                # Remove "Based on search results:" prefix if present
+                response = search_response.replace("Based on search results:", "").strip()
+                
+                # Format the response based on the query type
+                if "weather" in user_input.lower():
+                    # Extract just the temperature and conditions
+                    parts = response.split(".")
+                    response = parts[0] if parts else response
+                elif "time" in user_input.lower():
+                    # Extract just the current time
+                    parts = response.split(".")
+                    response = parts[0] if parts else response
+                elif "population" in user_input.lower():
+                    # Format population response
+                    original_response = response
+                    location = user_input.split('of')[-1].strip() if 'of' in user_input else "the requested location"
+                    response = f"The population of {location} is {original_response}"
+                
+                if not response:
+                    raise Exception("Empty search response")
+            except Exception as e:
+                # Fall back to Pepper's personality if search fails
+                print(f"Search failed: {str(e)}. Falling back to conversational response.")
+                response = self.pepper_agent.get_response(
+                    f"I notice you're asking about {user_input}. While I can't access current information right now, "
+                    f"I'd be happy to chat about this topic from my perspective. What would you like to know?",
+                    memory=memory
+                )
+        # Default to Pepper's personality for everything else
+        else:
+            response = self.pepper_agent.get_response(user_input, memory=memory)
+        return response
+
+    def handle_input(self, user_input):
+        """Handle user input by routing to appropriate agent and processing response."""
+        start_time = time.time()
+        
         try:
-            # If it's a conversational query, use Pepper's personality directly
-            if any(keyword in user_input.lower() for keyword in conversational_keywords):
-                response = self.pepper_agent.get_response(user_input)
-            # For factual queries, try to use search agent but fall back to Pepper's personality if no internet
-            elif any(keyword in user_input.lower() for keyword in ["weather", "news", "current", "latest", "who", "what", "when", "where", "why", "how"]):
-                try:
-                    search_response = self.search_agent.get_response(user_input)
-                    # Remove "Based on search results:" prefix if present
-                    response = search_response.replace("Based on search results:", "").strip()
-                    
-                    # Format the response based on the query type
-                    if "weather" in user_input.lower():
-                        # Extract just the temperature and conditions
-                        parts = response.split(".")
-                        response = parts[0] if parts else response
-                    elif "time" in user_input.lower():
-                        # Extract just the current time
-                        parts = response.split(".")
-                        response = parts[0] if parts else response
-                    elif "population" in user_input.lower():
-                        # Format population response
-                        original_response = response
-                        location = user_input.split('of')[-1].strip() if 'of' in user_input else "the requested location"
-                        response = f"The population of {location} is {original_response}"
-                    
-                    if not response:
-                        raise Exception("Empty search response")
-                except Exception as e:
-                    # Fall back to Pepper's personality if search fails
-                    print(f"Search failed: {str(e)}. Falling back to conversational response.")
-                    response = self.pepper_agent.get_response(
-                        f"I notice you're asking about {user_input}. While I can't access current information right now, "
-                        f"I'd be happy to chat about this topic from my perspective. What would you like to know?"
-                    )
-            # Default to Pepper's personality for everything else
-            else:
-                response = self.pepper_agent.get_response(user_input)
+            response = self.get_response(user_input)
             
             llm_time = (time.time() - start_time) * 1000
             
@@ -166,6 +191,7 @@ def main():
     print("Type 'quit' to exit.")
     
     orchestrator = Orchestrator()
+    orchestrator.warmer.start()
     
     while True:
         input("\nPress Enter to start speaking...")
@@ -0,0 +1,106 @@
+from flask import Flask, request, jsonify
+import argparse
+import copy
+import glob
+import json
+import os
+import random
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "searxng_fixtures")
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """
+    Load recorded SearXNG responses.
+
+    Each fixture file holds {"match": [keywords], "response": {...}}; a query
+    gets the first fixture with a keyword it contains, or default.json.
+    """
+    fixtures, default = [], None
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.json"))):
+        with open(path) as f:
+            fixture = json.load(f)
+        if os.path.basename(path) == "default.json":
+            default = fixture
+        else:
+            fixtures.append(fixture)
+    return fixtures, default
+
+def create_app(fixtures_dir=FIXTURES_DIR, latency_ms=0, jitter_ms=0, error_rate=0.0, num_results=None,
+               content_repeat=1, seed=None):
+    """
+    Build a SearXNG-compatible stub answering /search?q=...&format=json from fixtures.
+
+    Args:
+        latency_ms, jitter_ms: delay added to every request (uniform +/- jitter)
+        error_rate (float): fraction of requests answered with an error (500, 502 or 429)
+        num_results (int): pad or trim each response to this many results
+        content_repeat (int): repeat each result's content to simulate large pages
+        seed: random seed, for repeatable latency and error sequences
+    """
+    app = Flask(__name__)
+    fixtures, default = load_fixtures(fixtures_dir)
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0}
+    app.config["stub_stats"] = stats
+
+    def find_fixture(query):
+        query = query.lower()
+        for fixture in fixtures:
+            if any(keyword in query for keyword in fixture.get("match", [])):
+                return fixture
+        return default
+
+    @app.route('/search', methods=['GET', 'POST'])
+    def search():
+        stats["requests"] += 1
+        delay = latency_ms + rng.uniform(-jitter_ms, jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            status = rng.choice([500, 502, 429])
+            return jsonify({"error": "simulated failure"}), status
+
+        query = request.values.get("q", "")
+        fixture = find_fixture(query)
+        if fixture is None:
+            return jsonify({"query": query, "number_of_results": 0, "results": []})
+
+        response = copy.deepcopy(fixture["response"])
+        response["query"] = query
+        results = response.get("results", [])
+        if num_results is not None and results:
+            results = (results * (num_results // len(results) + 1))[:num_results]
+        results = [dict(result, content=" ".join([result.get("content", "")] * content_repeat))
+                   for result in results]
+        response["results"] = results
+        response["number_of_results"] = len(results)
+        return jsonify(response)
+
+    @app.route('/stats', methods=['GET'])
+    def stub_stats():
+        return jsonify(stats)
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SearXNG stand-in serving recorded results")
+    parser.add_argument("--port", type=int, default=8060)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of recorded response fixtures")
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("SEARXNG_STUB_LATENCY_MS", "0")))
+    parser.add_argument("--jitter-ms", type=float, default=float(os.getenv("SEARXNG_STUB_JITTER_MS", "0")))
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("SEARXNG_STUB_ERROR_RATE", "0")))
+    parser.add_argument("--results", type=int, default=None, help="number of results per response")
+    parser.add_argument("--content-repeat", type=int, default=1, help="repeat result content to enlarge responses")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_app(args.fixtures, args.latency_ms, args.jitter_ms, args.error_rate, args.results,
+                     args.content_repeat, args.seed)
+    print(f"Starting SearXNG stub on http://localhost:{args.port} ... (set SEARXNG_URL=http://localhost:{args.port})")
+    app.run(port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
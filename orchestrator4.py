@@ -1,85 +1,157 @@
 from dotenv import load_dotenv
-import os
-import requests
 import threading
+import argparse
 from agents.pepper_agent import PepperAgent
 from agents.search_agent import SearchAgent
-from agents.search_agent3 import SearchAgent3
+from agents.search_agent3 import SearchAgent3, classify_query
 from agents.summary_agent import SummaryAgent
-from utils.sentence_splitter import split_into_sentences
-from stt_function import stt_function
+from agents.tts_backends import PepperSayBackend, LocalTTSBackend, FailoverTTS
+from utils.config import config
+from utils.answer_cache import configured_policy
+from utils.tts_sanitizer import speakable_sentences
+from utils.single_flight import normalize_prompt
+from utils.task_runner import TaskRunner, CancelEvent, CallAbandoned
+from utils.filler_scheduler import FillerScheduler
+from utils.warmup import CacheWarmer, QuestionLog, load_frequent_questions
+from stt_function import stt_function, DuplexListener
 import time
 import re
 
 # Load environment variables
 load_dotenv()
 
+class TurnCancelled(BaseException):
+    """
+    Raised inside a turn when the user barges in.
+
+    Like asyncio.CancelledError it derives from BaseException, so the
+    `except Exception` fallbacks between agents do not swallow it.
+    """
+
 class Orchestrator4:
+    # Routing keywords
+    CONVERSATIONAL_KEYWORDS = [
+        "how are you", "hello", "hi", "hey", "greetings", "good morning", "good afternoon", "good evening",
+        "how's it going", "what's up", "how do you feel", "tell me about yourself", "who are you",
+        "what are you", "what can you do", "what do you like", "what's your favorite",
+        "joke", "funny", "story", "riddle", "poem", "let's talk", "let's chat",
+        "make me laugh", "something interesting", "something exciting"
+    ]
+    SUMMARY_KEYWORDS = ["summarize", "summary", "brief", "overview", "sum up"]
+    ADVANCED_SEARCH_KEYWORDS = [
+        "detailed", "comprehensive", "in-depth", "research", "advanced", "extensive",
+        "tell me more about", "what is", "who is", "when is", "where is", "why is", "how is",
+        "current", "latest", "recent", "today", "now", "weather", "time", "population",
+        "news", "information", "facts", "data", "statistics"
+    ]
+
+    # Topics visitors ask about, plus the glue words needed to phrase questions
+    DOMAIN_PHRASES = [
+        "canberra", "australia", "university of canberra", "uc", "the lab", "robotics lab",
+        "collaborative robotics lab", "pepper", "robot", "weather in canberra",
+        "what's the weather like", "what time is it", "what is the time in canberra",
+        "what is the temperature", "will it rain", "quit"
+    ]
+    GLUE_WORDS = [
+        "a", "about", "and", "are", "can", "could", "do", "does", "for", "give", "how", "i", "in",
+        "is", "it", "me", "more", "my", "of", "on", "please", "tell", "the", "there", "this",
+        "to", "tomorrow", "we", "what", "when", "where", "which", "who", "why", "will", "you", "your"
+    ]
+
     def __init__(self):
         print("Initializing Orchestrator4...")
         self.pepper_agent = PepperAgent()
         self.search_agent = SearchAgent()
         self.search_agent3 = SearchAgent3()
         self.summary_agent = SummaryAgent()
-        self.pepper_ip = "10.0.0.244"
-        self.pepper_port = 5000
+        self.pepper_ip = config.get("pepper.ip")
+        self.pepper_port = config.get("pepper.port")
+
+        # Pepper speaks through its own /say endpoint, with a local engine if it is unreachable
+        self.tts = FailoverTTS([PepperSayBackend(self.pepper_ip, self.pepper_port), LocalTTSBackend()])
+
+        # Exact-match questions answered from static facts, and the frequent
+        # questions answered ahead of time, both from config/frequent_questions.json
+        self.static_answers, frequent_questions = load_frequent_questions()
+        self.question_log = QuestionLog()
+        self.warmer = CacheWarmer(
+            self.warm_answer,
+            questions=frequent_questions,
+            question_log=self.question_log,
+            ttl=self.warm_ttl
+        )
+
+        # Agent calls run here so a barge-in can abandon them without waiting;
+        # abandoned calls finish on their own headroom instead of the live workers
+        self.agent_executor = TaskRunner(max_workers=config.get("orchestrator.agent_workers"), name="agent",
+                                         abandon_headroom=config.get("orchestrator.abandoned_calls"))
+        # Background speech and filler timers share a small fixed pool
+        self.tasks = TaskRunner(max_workers=2, name="speech")
+        # Masks slow agent calls with a filler timed from each agent's recent latency
+        self.fillers = FillerScheduler(self.tasks, self.speak)
+        self._turn_cancel = CancelEvent()
 
     def speak(self, text):
-        """Send text to Pepper's TTS endpoint."""
+        """Speak text on Pepper, or the local fallback engine. Returns the backend used."""
         try:
-            url = f"http://{self.pepper_ip}:{self.pepper_port}/say"
-            params = {"text": text}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.text
+            return self.tts.say(text)
         except Exception as e:
             print(f"Error in TTS: {str(e)}")
             return None
 
     def speak_threaded(self, text):
-        """Send text to Pepper's TTS endpoint in a separate thread."""
-        def speak_in_thread():
-            try:
-                url = f"http://{self.pepper_ip}:{self.pepper_port}/say"
-                params = {"text": text}
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-            except Exception as e:
-                print(f"Error in threaded TTS: {str(e)}")
-        
-        thread = threading.Thread(target=speak_in_thread)
-        thread.daemon = True
-        thread.start()
-        return thread
-
-    def contains_only_emoji(self, text):
-        """Check if text contains only emojis and whitespace."""
-        # Remove whitespace and check if remaining characters are emojis
-        cleaned_text = re.sub(r'\s+', '', text)
-        if not cleaned_text:
-            return False
-        
-        # Unicode emoji ranges
-        emoji_pattern = re.compile(
-            r'[\U0001F600-\U0001F64F]'  # emoticons
-            r'|[\U0001F300-\U0001F5FF]'  # symbols & pictographs
-            r'|[\U0001F680-\U0001F6FF]'  # transport & map symbols
-            r'|[\U0001F1E0-\U0001F1FF]'  # flags (iOS)
-            r'|[\U00002600-\U000027BF]'  # miscellaneous symbols
-            r'|[\U0001F900-\U0001F9FF]'  # supplemental symbols and pictographs
-            r'|[\U0001F018-\U0001F270]'  # various symbols
-            r'|[\U0001F004]'              # mahjong tile red dragon
-            r'|[\U0001F0CF]'              # playing card black joker
-            r'|[\U0001F170-\U0001F251]'   # enclosed alphanumeric supplement
-        )
-        
-        # Check if all non-whitespace characters are emojis
-        non_emoji_chars = re.sub(emoji_pattern, '', cleaned_text)
-        return len(non_emoji_chars) == 0
+        """Speak text in the background. Returns a Future."""
+        return self.tasks.submit(self.speak, text)
+
+    def warm_ttl(self, question):
+        """Seconds a warmed answer stays cached, or None for static answers, which need no warming."""
+        if normalize_prompt(question) in self.static_answers:
+            return None
+        if any(keyword in question.lower() for keyword in self.CONVERSATIONAL_KEYWORDS):
+            return self.pepper_agent._cache_ttl()
+        return configured_policy(classify_query(question))[1]
 
-    def filter_emoji_sentences(self, sentences):
-        """Filter out sentences that contain only emojis."""
-        return [sentence for sentence in sentences if not self.contains_only_emoji(sentence)]
+    def warm_answer(self, question):
+        """Answer a question for the cache warmer, with a throwaway memory and no filler speech."""
+        return self._route_input(question, CancelEvent(), memory=self.pepper_agent.new_memory(), filler=False)
+
+    def interrupt(self):
+        """Cancel the current turn: drop queued sentences and abandon outstanding agent calls."""
+        if not self._turn_cancel.is_set():
+            print("Voice activity detected, interrupting current turn")
+            self._turn_cancel.set()
+
+    def _call_agent(self, cancel_event, func, *args, **kwargs):
+        """Run an agent call, raising TurnCancelled as soon as the turn is interrupted."""
+        try:
+            return self.agent_executor.call(cancel_event, func, *args, **kwargs)
+        except CallAbandoned:
+            # The HTTP call cannot be killed; its result is simply discarded
+            raise TurnCancelled()
+
+    def _call_agent_with_filler(self, cancel_event, filler, agent, func, *args, **kwargs):
+        """
+        Run an agent call, masking it with a filler if it runs longer than that agent usually does.
+
+        The call's latency feeds the agent's rolling history whether or not a
+        filler was allowed (filler=False), so warm-up calls train it too.
+        Failed calls count as well, since a slow timeout is exactly what a
+        filler should cover. Interrupted calls do not; they never finished.
+        """
+        filler_task = self.fillers.schedule(agent, cancel_event) if filler else None
+        start_time = time.time()
+        cancelled = False
+        try:
+            return self._call_agent(cancel_event, func, *args, **kwargs)
+        except TurnCancelled:
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                self.fillers.record(agent, time.time() - start_time)
+            # A call that finishes (or fails, or is interrupted) in time says nothing
+            if filler_task is not None:
+                filler_task.cancel()
 
     def classify_request_type(self, prompt):
         """Classify if the request is creative/conversational or factual."""
@@ -92,17 +164,33 @@ class Orchestrator4:
         ]
         return any(word in prompt.lower() for word in conversational_keywords)
 
-    def process_response(self, response):
+    def recognizer_phrases(self):
+        """
+        Phrase list for domain-biased speech recognition.
+
+        Built from the static-answer queries, routing keywords and lab topics so
+        that the words which decide routing are the ones the recognizer prefers.
+        """
+        phrases = (list(self.static_answers) + self.CONVERSATIONAL_KEYWORDS +
+                   self.SUMMARY_KEYWORDS + self.ADVANCED_SEARCH_KEYWORDS + self.DOMAIN_PHRASES +
+                   self.GLUE_WORDS)
+        # Vosk vocabularies are lower case words without hyphens
+        return sorted({" ".join(re.sub(r"[^a-z' ]", " ", phrase.lower()).split()) for phrase in phrases} - {""})
+
+    def process_response(self, response, cancel_event=None):
         """Process the response by splitting into sentences and handling TTS."""
-        sentences = split_into_sentences(response)
-        
-        # Filter out emoji-only sentences
-        filtered_sentences = self.filter_emoji_sentences(sentences)
+        # Strip emoji, markdown and URLs and expand symbols before splitting, so
+        # mixed sentences reach /say clean and URLs do not confuse the splitter,
+        # then filter out sentences with nothing left to say
+        filtered_sentences = speakable_sentences(response)
         
         tts_timings = []
         total_tts_time = 0
 
         for sentence in filtered_sentences:
+            if cancel_event is not None and cancel_event.is_set():
+                print("Speech interrupted, dropping remaining sentences")
+                break
             start_time = time.time()
             self.speak(sentence)
             tts_time = (time.time() - start_time) * 1000
@@ -114,147 +202,178 @@ class Orchestrator4:
     def handle_input(self, user_input):
         """Handle user input by routing to appropriate agent and processing response."""
         start_time = time.time()
+        self._turn_cancel = cancel_event = CancelEvent()
+        self.question_log.record(user_input)
+
+        try:
+            response = self._route_input(user_input, cancel_event)
+            if response is None:
+                return "I apologize, but I encountered an error. Could you please try rephrasing your question?"
+
+            llm_time = (time.time() - start_time) * 1000
+
+            # Process the response
+            sentences, tts_timings, total_tts_time = self.process_response(response, cancel_event)
+        except TurnCancelled:
+            print("Turn interrupted by the user")
+            return None
+
+        # Print profiling summary
+        print("\n--- Profiling Summary ---")
+        print(f"LLM/Agent response: {llm_time:.2f} ms")
+        print(f"TTS (total): {total_tts_time:.2f} ms")
+        for sentence, tts_time in tts_timings:
+            print(f"  TTS for: '{sentence[:30]}...' -> {tts_time:.2f} ms")
+        print(f"TOTAL time: {llm_time + total_tts_time:.2f} ms")
+        print("-------------------------\n")
         
-        # Handle specific exception queries first
-        user_input_lower = user_input.lower().strip()
-        
-        # Exception for location query
-        if user_input_lower in ["where am i", "where are we", "what is my location", "where are you"]:
-            response = "You are at the UC Collaborative Robotics Lab in Canberra, Australia."
-        
-        # Exception for VC query
-        elif user_input_lower in ["who is the vc of uc", "who is the vice chancellor of uc", "who is the vice chancellor of university of canberra", "who is the vc of university of canberra"]:
-            response = "The Vice Chancellor of the University of Canberra is Bill Shorten."
+        return response
+
+    def generate_response(self, user_input, memory=None, cancel_event=None):
+        """
+        Produce a response without speaking it, for callers that handle speech themselves.
+
+        Args:
+            memory: conversation memory for PepperAgent (defaults to the shared one)
+            cancel_event (CancelEvent): set it to abandon the turn
+        """
+        if cancel_event is None:
+            cancel_event = CancelEvent()
+        self.question_log.record(user_input)
+        response = self._route_input(user_input, cancel_event, memory=memory, filler=False)
+        if response is None:
+            return "I apologize, but I encountered an error. Could you please try rephrasing your question?"
+        return response
+
+    def _route_input(self, user_input, cancel_event, memory=None, filler=True):
+        """
+        Route user input to the appropriate agent and return its response, or None on error.
+
+        With filler=False no filler phrase is spoken on Pepper while agents work, for
+        turns that do not come from the robot this orchestrator drives.
+        """
+        # Questions with static answers (location, VC, ...) come first
+        static_answer = self.static_answers.get(normalize_prompt(user_input))
+        if static_answer:
+            response = static_answer
         
         else:
-            # Check if it's a conversational query first
-            conversational_keywords = [
-                "how are you", "hello", "hi", "hey", "greetings", "good morning", "good afternoon", "good evening",
-                "how's it going", "what's up", "how do you feel", "tell me about yourself", "who are you",
-                "what are you", "what can you do", "what do you like", "what's your favorite",
-                "joke", "funny", "story", "riddle", "poem", "let's talk", "let's chat",
-                "make me laugh", "something interesting", "something exciting"
-            ]
-            
             # Check for summary requests
-            summary_keywords = ["summarize", "summary", "brief", "overview", "sum up"]
-            if any(keyword in user_input.lower() for keyword in summary_keywords):
-                response = self.summary_agent.get_response(user_input)
-            
-            # Check for advanced search requests (search_agent3) - expanded keywords
-            advanced_search_keywords = [
-                "detailed", "comprehensive", "in-depth", "research", "advanced", "extensive",
-                "tell me more about", "what is", "who is", "when is", "where is", "why is", "how is",
-                "current", "latest", "recent", "today", "now", "weather", "time", "population",
-                "news", "information", "facts", "data", "statistics"
-            ]
+            if any(keyword in user_input.lower() for keyword in self.SUMMARY_KEYWORDS):
+                response = self._call_agent_with_filler(cancel_event, filler, "summary", self.summary_agent.get_response, user_input)
             
             # Check if it's a conversational query first
-            if any(keyword in user_input.lower() for keyword in conversational_keywords):
+            if any(keyword in user_input.lower() for keyword in self.CONVERSATIONAL_KEYWORDS):
                 try:
-                    response = self.pepper_agent.get_response(user_input)
+                    response = self._call_agent_with_filler(cancel_event, filler, "pepper", self.pepper_agent.get_response, user_input, memory=memory)
                 except Exception as e:
                     print(f"Pepper agent failed: {str(e)}")
                     response = "I'm having trouble processing that right now. Could you try rephrasing?"
             
             # Check for advanced search requests (search_agent3)
-            elif any(keyword in user_input.lower() for keyword in advanced_search_keywords):
+            elif any(keyword in user_input.lower() for keyword in self.ADVANCED_SEARCH_KEYWORDS):
                 try:
                     print("Using advanced search agent (search_agent3)...")
-                    search_start_time = time.time()
-                    search_tts_thread = None
-                    
-                    # Start a timer to check if we need to play the TTS message
-                    def check_and_play_tts():
-                        time.sleep(1.5)  # Wait 1.5 seconds
-                        if not hasattr(self, '_search_completed') or not self._search_completed:
-                            print("Search taking longer than 1.5s, playing TTS message")
-                            self.speak_threaded("Allow me to search the web for you")
-                    
-                    tts_timer_thread = threading.Thread(target=check_and_play_tts)
-                    tts_timer_thread.daemon = True
-                    tts_timer_thread.start()
-                    
-                    self._search_completed = False
-                    raw_response = self.search_agent3.get_response(user_input)
-                    self._search_completed = True
+                    raw_response = self._call_agent_with_filler(cancel_event, filler, "search3", self.search_agent3.get_response, user_input)
                     
                     if not raw_response or raw_response.strip() == "":
                         raise Exception("Empty search response from search_agent3")
                     
                     # Filter the response through the summary agent for Australian context
-                    response = self.summary_agent.get_response(raw_response, user_input)
+                    response = self._call_agent_with_filler(cancel_event, filler, "summary", self.summary_agent.get_response, raw_response, user_input)
                     
                 except Exception as e:
                     print(f"Advanced search failed: {str(e)}. Falling back to regular search.")
                     # Fall back to regular search agent
                     try:
-                        search_start_time = time.time()
-                        search_tts_thread = None
-                        
-                        # Start a timer to check if we need to play the TTS message
-                        def check_and_play_tts():
-                            time.sleep(1.5)  # Wait 1.5 seconds
-                            if not hasattr(self, '_search_completed') or not self._search_completed:
-                                print("Search taking longer than 1.5s, playing TTS message")
-                                self.speak_threaded("Allow me to search the web for you")
-                        
-                        tts_timer_thread = threading.Thread(target=check_and_play_tts)
-                        tts_timer_thread.daemon = True
-                        tts_timer_thread.start()
-                        
-                        self._search_completed = False
-                        raw_search_response = self.search_agent.get_response(user_input)
-                        self._search_completed = True
+                        raw_search_response = self._call_agent_with_filler(cancel_event, filler, "search", self.search_agent.get_response, user_input)
                         
                         raw_response = raw_search_response.replace("Based on search results:", "").strip()
                         if not raw_response:
                             raise Exception("Empty search response from regular search")
                         
                         # Filter the response through the summary agent for Australian context
-                        response = self.summary_agent.get_response(raw_response, user_input)
+                        response = self._call_agent_with_filler(cancel_event, filler, "summary", self.summary_agent.get_response, raw_response, user_input)
                         
                     except Exception as e2:
                         print(f"Regular search also failed: {str(e2)}. Falling back to conversational response.")
-                        response = self.pepper_agent.get_response(
+                        response = self._call_agent_with_filler(
+                            cancel_event, filler, "pepper", self.pepper_agent.get_response,
                             f"I notice you're asking about {user_input}. While I can't access current information right now, "
-                            f"I'd be happy to chat about this topic from my perspective. What would you like to know?"
+                            f"I'd be happy to chat about this topic from my perspective. What would you like to know?",
+                            memory=memory
                         )
             
             # Default to Pepper's personality for everything else
             else:
                 try:
-                    response = self.pepper_agent.get_response(user_input)
+                    response = self._call_agent_with_filler(cancel_event, filler, "pepper", self.pepper_agent.get_response, user_input, memory=memory)
                 except Exception as e:
                     print(f"Error in handle_input: {str(e)}")
-                    return "I apologize, but I encountered an error. Could you please try rephrasing your question?"
-        
-        llm_time = (time.time() - start_time) * 1000
-        
-        # Process the response
-        sentences, tts_timings, total_tts_time = self.process_response(response)
-        
-        # Print profiling summary
-        print("\n--- Profiling Summary ---")
-        print(f"LLM/Agent response: {llm_time:.2f} ms")
-        print(f"TTS (total): {total_tts_time:.2f} ms")
-        for sentence, tts_time in tts_timings:
-            print(f"  TTS for: '{sentence[:30]}...' -> {tts_time:.2f} ms")
-        print(f"TOTAL time: {llm_time + total_tts_time:.2f} ms")
-        print("-------------------------\n")
-        
+                    return None
+
         return response
 
+def run_duplex(orchestrator):
+    """Full-duplex loop: keep listening during playback and let new speech interrupt the current turn."""
+    print("Full-duplex mode: just start talking. Say 'quit' to exit.")
+    listener = DuplexListener(on_voice_activity=orchestrator.interrupt)
+    listener.start()
+    turn_thread = None
+
+    try:
+        while True:
+            user_input, stt_latency = listener.get_utterance()
+            if not user_input:
+                continue
+
+            print(f"\nYou said: {user_input}")
+            print(f"Speech recognition took {stt_latency:.2f} ms")
+
+            # Abandon whatever Pepper is still doing and answer the new utterance at once
+            orchestrator.interrupt()
+            if turn_thread is not None:
+                turn_thread.join()
+
+            if user_input.lower() == 'quit':
+                break
+
+            def run_turn(text=user_input):
+                response = orchestrator.handle_input(text)
+                if response:
+                    print(f"\nPepper: {response}")
+
+            turn_thread = threading.Thread(target=run_turn, daemon=True)
+            turn_thread.start()
+    finally:
+        listener.stop()
+
 def main():
+    parser = argparse.ArgumentParser(description="Pepper conversational assistant")
+    parser.add_argument("--duplex", action="store_true",
+                        help="keep the microphone open during playback and allow barge-in")
+    parser.add_argument("--grammar", action="store_true",
+                        help="bias speech recognition towards lab topics, falling back to open vocabulary")
+    args = parser.parse_args()
+
     print("Welcome to Pepper, your AI Assistant with Speech Recognition and HTTP-based TTS!")
+
+    orchestrator = Orchestrator4()
+    orchestrator.warmer.start()
+    # Tuning values in config/*.yaml apply on save, without a restart
+    config.start_watching()
+    phrases = orchestrator.recognizer_phrases() if args.grammar else None
+
+    if args.duplex:
+        run_duplex(orchestrator)
+        return
+
     print("Press Enter to start speaking, then press Enter again to stop.")
     print("Type 'quit' to exit.")
     
-    orchestrator = Orchestrator4()
-    
     while True:
         input("\nPress Enter to start speaking...")
-        user_input, stt_latency = stt_function()
+        user_input, stt_latency = stt_function(phrases)
         
         if user_input:
             print(f"\nYou said: {user_input}")
@@ -0,0 +1,156 @@
+from flask import Flask, request, jsonify
+import argparse
+import io
+import threading
+import time
+import uuid
+from utils.tts_sanitizer import speakable_sentences
+from utils.metrics import metrics
+from utils.config import config
+from stt_function import transcribe_wav
+
+class Session:
+    """One robot or kiosk conversation with its own memory and turn limit."""
+
+    def __init__(self, session_id, memory, client_id=None):
+        self.session_id = session_id
+        self.client_id = client_id
+        self.memory = memory
+        self.turn_slots = threading.BoundedSemaphore(config.get("session.max_concurrent_turns"))
+        self.last_active = time.time()
+        self.turns = 0
+
+class SessionManager:
+    """
+    Creates, looks up and expires sessions.
+
+    Every session gets its own PepperAgent memory, while the single shared
+    Orchestrator4 provides the agents, their caches and connection pools.
+    Shared caches are safe across sessions because PepperAgent keys replies
+    by conversation history as well as the prompt.
+    """
+
+    def __init__(self, orchestrator, idle_timeout=None):
+        self.orchestrator = orchestrator
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def create(self, client_id=None):
+        session = Session(uuid.uuid4().hex, self.orchestrator.pepper_agent.new_memory(), client_id)
+        with self.lock:
+            self._expire_idle()
+            self.sessions[session.session_id] = session
+        metrics.increment("server.sessions_created")
+        return session
+
+    def get(self, session_id):
+        with self.lock:
+            self._expire_idle()
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.last_active = time.time()
+            return session
+
+    def close(self, session_id):
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def _expire_idle(self):
+        now = time.time()
+        idle_timeout = config.get("session.idle_timeout") if self.idle_timeout is None else self.idle_timeout
+        for session_id in [sid for sid, s in self.sessions.items() if now - s.last_active > idle_timeout]:
+            del self.sessions[session_id]
+            metrics.increment("server.sessions_expired")
+
+def create_app(orchestrator=None):
+    """Build the Flask app around one shared orchestrator (a new Orchestrator4 unless one is given)."""
+    if orchestrator is None:
+        # Imported here so the app can be built around another orchestrator without loading every agent
+        from orchestrator4 import Orchestrator4
+        orchestrator = Orchestrator4()
+    app = Flask(__name__)
+    manager = SessionManager(orchestrator)
+    app.config["session_manager"] = manager
+
+    def run_turn(session, user_input):
+        if not session.turn_slots.acquire(blocking=False):
+            metrics.increment("server.turns_rejected")
+            return jsonify({"error": "session is busy with another turn"}), 429
+        try:
+            start_time = time.time()
+            response = manager.orchestrator.generate_response(user_input, memory=session.memory)
+            latency_ms = (time.time() - start_time) * 1000
+            session.turns += 1
+            metrics.record("server.turn", latency_ms)
+            return jsonify({
+                "session_id": session.session_id,
+                "input": user_input,
+                "response": response,
+                "sentences": speakable_sentences(response),
+                "latency_ms": round(latency_ms, 2)
+            })
+        finally:
+            session.turn_slots.release()
+
+    @app.route('/sessions', methods=['POST'])
+    def create_session():
+        data = request.get_json(silent=True) or {}
+        session = manager.create(data.get("client_id"))
+        return jsonify({"session_id": session.session_id}), 201
+
+    @app.route('/sessions/<session_id>', methods=['DELETE'])
+    def close_session(session_id):
+        if not manager.close(session_id):
+            return jsonify({"error": "unknown session"}), 404
+        return jsonify({"status": "closed"})
+
+    @app.route('/sessions/<session_id>/turn', methods=['POST'])
+    def text_turn(session_id):
+        session = manager.get(session_id)
+        if session is None:
+            return jsonify({"error": "unknown session"}), 404
+        data = request.get_json(silent=True) or {}
+        user_input = (data.get("text") or "").strip()
+        if not user_input:
+            return jsonify({"error": "text is required"}), 400
+        return run_turn(session, user_input)
+
+    @app.route('/sessions/<session_id>/audio', methods=['POST'])
+    def audio_turn(session_id):
+        """Take a 16-bit PCM WAV body, transcribe it and answer it."""
+        session = manager.get(session_id)
+        if session is None:
+            return jsonify({"error": "unknown session"}), 404
+        try:
+            user_input, stt_latency = transcribe_wav(io.BytesIO(request.get_data()))
+        except Exception as e:
+            return jsonify({"error": f"could not decode audio: {e}"}), 400
+        metrics.record("server.stt", stt_latency)
+        if not user_input:
+            return jsonify({"session_id": session_id, "input": "", "response": None, "sentences": []})
+        return run_turn(session, user_input)
+
+    @app.route('/metrics', methods=['GET'])
+    def pipeline_metrics():
+        snapshot = metrics.snapshot()
+        with manager.lock:
+            snapshot["gauges"]["server.active_sessions"] = len(manager.sessions)
+        return jsonify(snapshot)
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-session Pepper orchestrator server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config["session_manager"].orchestrator.warmer.start()
+    config.start_watching()
+    print(f"Starting orchestrator server on http://{args.host}:{args.port} ...")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
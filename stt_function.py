@@ -1,63 +1,367 @@
 import os
 import sys
 import json
-import sounddevice as sd
 import vosk
 import numpy as np
 import time
 import select
+import queue
+import threading
+import wave
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from vosk import _ffi
+from utils.audio_buffer import AudioRingBuffer
+from utils.metrics import metrics
+from utils.capture_monitor import CaptureMonitor
+from utils.config import config
 
 # Audio parameters
 SAMPLE_RATE = 16000
 CHANNELS = 1
 CHUNK_SIZE = 8000
+RING_BUFFER_SECONDS = 30  # Capture headroom if decoding falls behind
 
-# Initialize Vosk model
-if not os.path.exists("model"):
-    print("Please download the model from https://alphacephei.com/vosk/models and unpack as 'model' in the current folder.")
-    sys.exit(1)
+# Full-duplex listening parameters
+DUPLEX_BLOCK_SIZE = 1600  # 100 ms blocks so voice activity is noticed quickly
+VOICE_MIN_ACTIVE_BLOCKS = 2  # Consecutive loud blocks before voice activity fires
 
-model = vosk.Model("model")
+# PortAudio is only needed for live capture; file and batch transcription work without it
+try:
+    import sounddevice as sd
+except OSError:
+    sd = None
 
-def stt_function():
+MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "model")
+_model = None
+
+def get_model():
+    """Load the Vosk model on first use (once per process)."""
+    global _model
+    if _model is None:
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError(
+                f"Please download the model from https://alphacephei.com/vosk/models and unpack as '{MODEL_PATH}'."
+            )
+        _model = vosk.Model(MODEL_PATH)
+    return _model
+
+def _require_microphone():
+    if sd is None:
+        raise RuntimeError("Live capture needs sounddevice with the PortAudio library installed")
+
+def create_recognizer(sample_rate=SAMPLE_RATE, phrases=None):
+    """
+    Create a recognizer, optionally constrained to a phrase list.
+
+    With phrases, Vosk decodes against a small grammar built from them plus
+    [unk] for anything else, which is faster and avoids near-miss words. This
+    needs a model with a dynamic graph (the small Vosk models); big static-graph
+    models ignore the grammar.
+    """
+    if phrases:
+        return vosk.KaldiRecognizer(get_model(), sample_rate, json.dumps(list(phrases) + ["[unk]"]))
+    return vosk.KaldiRecognizer(get_model(), sample_rate)
+
+def needs_open_vocabulary(text):
+    """True when a grammar-constrained result missed, so the audio should be re-decoded."""
+    return not text or "[unk]" in text.split()
+
+def _result_text(result_json):
+    return json.loads(result_json).get("text", "").strip()
+
+def _decode_chunks(chunks, sample_rate=SAMPLE_RATE):
+    """
+    Decode an iterable of 16-bit mono PCM byte chunks.
+
+    Returns:
+        tuple: (recognized_text, latency_ms) where latency_ms is the decode time
+    """
+    start_time = time.time()
+    recognizer = vosk.KaldiRecognizer(get_model(), sample_rate)
+    segments = []
+    for chunk in chunks:
+        if recognizer.AcceptWaveform(chunk):
+            text = _result_text(recognizer.Result())
+            if text:
+                segments.append(text)
+    final_text = _result_text(recognizer.FinalResult())
+    if final_text:
+        segments.append(final_text)
+    return " ".join(segments), (time.time() - start_time) * 1000
+
+def transcribe_pcm(stream, sample_rate=SAMPLE_RATE, chunk_bytes=CHUNK_SIZE * 2):
+    """
+    Transcribe raw 16-bit mono PCM read from a binary file-like object.
+
+    Returns:
+        tuple: (recognized_text, latency_ms)
+    """
+    def chunks():
+        while True:
+            data = stream.read(chunk_bytes)
+            if not data:
+                return
+            yield data
+    return _decode_chunks(chunks(), sample_rate)
+
+def transcribe_array(samples, sample_rate=SAMPLE_RATE, chunk_samples=CHUNK_SIZE):
+    """
+    Transcribe a NumPy array of audio.
+
+    int16 arrays are used as-is; float arrays are taken to be in [-1, 1].
+    Multi-channel arrays shaped (frames, channels) are mixed down to mono.
+
+    Returns:
+        tuple: (recognized_text, latency_ms)
+    """
+    samples = np.asarray(samples)
+    if np.issubdtype(samples.dtype, np.floating):
+        samples = np.clip(samples, -1.0, 1.0) * 32767
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    if samples.dtype != np.int16:
+        samples = samples.astype(np.int16)
+    samples = np.ascontiguousarray(samples)
+    view = memoryview(samples).cast('B')
+    step = chunk_samples * 2
+    chunks = (_ffi.from_buffer(view[i:i + step]) for i in range(0, len(view), step))
+    return _decode_chunks(chunks, sample_rate)
+
+def transcribe_wav(path):
+    """
+    Transcribe a 16-bit PCM WAV file at its own sample rate.
+
+    Returns:
+        tuple: (recognized_text, latency_ms)
+    """
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        sample_rate = wf.getframerate()
+        if wf.getnchannels() == 1:
+            def chunks():
+                while True:
+                    data = wf.readframes(CHUNK_SIZE)
+                    if not data:
+                        return
+                    yield data
+            return _decode_chunks(chunks(), sample_rate)
+        frames = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        frames = frames.reshape(-1, wf.getnchannels())
+    return transcribe_array(frames, sample_rate)
+
+def _transcribe_file(path):
+    """Batch worker: transcribe one WAV file and report its duration."""
+    with wave.open(path, "rb") as wf:
+        audio_seconds = wf.getnframes() / wf.getframerate()
+    text, latency_ms = transcribe_wav(path)
+    return {"path": path, "text": text, "latency_ms": latency_ms, "audio_seconds": audio_seconds}
+
+def transcribe_batch(paths, workers=None):
+    """
+    Transcribe many WAV files across a process pool.
+
+    Each worker loads its own Vosk model once at start-up and reuses it for
+    every file it is given.
+
+    Returns:
+        list: one dict per path, in input order, with text, latency_ms and audio_seconds
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=get_model) as pool:
+        return list(pool.map(_transcribe_file, paths))
+
+def feed_recognizer(recognizer, ring, timeout=None, monitor=None):
+    """
+    Hand any unread audio in the ring to the recognizer without copying it.
+
+    Returns:
+        list: texts of utterance segments Vosk finalised while consuming the audio
+    """
+    views, _ = ring.read_views(timeout)
+    segments = []
+    for view in views:
+        # cffi only accepts bytes or cdata for char*, so wrap the view in place
+        if recognizer.AcceptWaveform(_ffi.from_buffer(view)):
+            text = _result_text(recognizer.Result())
+            if text:
+                segments.append(text)
+    ring.release()
+    if monitor is not None and views:
+        monitor.on_consumed(ring.released)
+    return segments
+
+def stt_function(phrases=None):
     """
     Record audio and convert it to text using Vosk.
     
+    Audio is captured by a sounddevice callback into a preallocated ring buffer
+    and decoded while the user is still speaking, so memory use stays constant
+    and only the tail of the utterance is left to decode after Enter.
+    
+    Args:
+        phrases (list): optional phrase list to bias decoding towards; if the
+            constrained result contains [unk] the captured audio is decoded
+            again with the open vocabulary
+    
     Returns:
         tuple: (recognized_text, latency_ms)
             - recognized_text (str): The recognized text from speech
             - latency_ms (float): The time taken for STT processing in milliseconds
     """
+    _require_microphone()
     print("Listening... Press Enter to stop.")
-    audio_chunks = []
+    ring = AudioRingBuffer(SAMPLE_RATE * RING_BUFFER_SECONDS)
+    recognizer = create_recognizer(SAMPLE_RATE, phrases)
+    monitor = CaptureMonitor(SAMPLE_RATE)
+    segments = []
+
+    def callback(indata, frames, time_info, status):
+        if status.input_overflow:
+            ring.device_overflows += 1
+        monitor.on_block(indata[:, 0], status)
+        ring.write(indata[:, 0])
     
     with sd.InputStream(samplerate=SAMPLE_RATE, blocksize=CHUNK_SIZE,
-                      channels=CHANNELS, dtype='int16') as stream:
-        start_time = time.time()
+                      channels=CHANNELS, dtype='int16', callback=callback):
         while True:
-            data, overflowed = stream.read(CHUNK_SIZE)
-            if overflowed:
-                print("Audio buffer overflow")
-                continue
-            audio_chunks.append(data)
+            segments.extend(feed_recognizer(recognizer, ring, timeout=0.1, monitor=monitor))
             # Check for Enter key (non-blocking)
             if select.select([sys.stdin], [], [], 0)[0]:
                 sys.stdin.readline()
                 break
     
     stop_time = time.time()
-    audio_data = np.concatenate(audio_chunks, axis=0).tobytes()
-    recognizer = vosk.KaldiRecognizer(model, SAMPLE_RATE)
-    recognizer.AcceptWaveform(audio_data)
-    result = json.loads(recognizer.Result())
-    recognized_text = result.get("text", "").strip()
+    segments.extend(feed_recognizer(recognizer, ring, timeout=0, monitor=monitor))
+    monitor.on_overrun(ring.overrun_samples)
+    final_text = _result_text(recognizer.FinalResult())
+    if final_text:
+        segments.append(final_text)
+    recognized_text = " ".join(segments)
+
+    if phrases:
+        if needs_open_vocabulary(recognized_text):
+            metrics.increment("stt.grammar_fallbacks")
+            views = ring.recent_views(ring.written)
+            recognized_text, _ = _decode_chunks(_ffi.from_buffer(view) for view in views)
+        else:
+            metrics.increment("stt.grammar_hits")
     end_time = time.time()
     latency_ms = (end_time - stop_time) * 1000
+
+    if ring.device_overflows or ring.overrun_samples:
+        print(f"Audio overflow: {ring.device_overflows} device overflow(s), "
+              f"{ring.overrun_samples} sample(s) overwritten before decoding")
     
     return recognized_text, latency_ms
 
+class DuplexListener:
+    """
+    Keeps the microphone open while Pepper is speaking.
+
+    Audio blocks are fed to a streaming Vosk recognizer, which uses its own
+    endpointing to split utterances. A simple energy detector calls
+    on_voice_activity as soon as the user starts talking, so the caller can
+    interrupt playback before the utterance is complete.
+    """
+
+    def __init__(self, on_voice_activity=None, energy_threshold=None):
+        self.on_voice_activity = on_voice_activity
+        self.energy_threshold = energy_threshold
+        self.recognizer = vosk.KaldiRecognizer(get_model(), SAMPLE_RATE)
+        self.monitor = CaptureMonitor(SAMPLE_RATE, prefix="stt_duplex")
+        self._position = 0
+        self.utterances = queue.Queue()
+        self._blocks = queue.Queue()
+        self._running = False
+        self._stream = None
+        self._worker = None
+
+    def _callback(self, indata, frames, time_info, status):
+        self.monitor.on_block(indata[:, 0], status)
+        self._position += frames
+        self._blocks.put((bytes(indata), time.time(), self._position))
+
+    def _process(self):
+        active_blocks = 0
+        while self._running:
+            try:
+                block, captured_at, position = self._blocks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            samples = np.frombuffer(block, dtype=np.int16).astype(np.float32)
+            rms = np.sqrt(np.mean(samples * samples)) if samples.size else 0.0
+            threshold = config.get("stt.voice_energy_threshold") if self.energy_threshold is None else self.energy_threshold
+            if rms >= threshold:
+                active_blocks += 1
+                if active_blocks == VOICE_MIN_ACTIVE_BLOCKS and self.on_voice_activity:
+                    self.on_voice_activity()
+            else:
+                active_blocks = 0
+
+            accepted = self.recognizer.AcceptWaveform(block)
+            self.monitor.on_consumed(position)
+            if accepted:
+                text = json.loads(self.recognizer.Result()).get("text", "").strip()
+                if text:
+                    latency_ms = (time.time() - captured_at) * 1000
+                    self.utterances.put((text, latency_ms))
+
+    def start(self):
+        """Open the microphone and start recognizing in the background."""
+        _require_microphone()
+        self._running = True
+        self._stream = sd.InputStream(samplerate=SAMPLE_RATE, blocksize=DUPLEX_BLOCK_SIZE,
+                                      channels=CHANNELS, dtype='int16', callback=self._callback)
+        self._stream.start()
+        self._worker = threading.Thread(target=self._process, daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """Close the microphone and stop the recognizer thread."""
+        self._running = False
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+        if self._worker is not None:
+            self._worker.join(timeout=1)
+
+    def get_utterance(self, timeout=None):
+        """
+        Wait for the next complete utterance.
+
+        Returns:
+            tuple: (recognized_text, latency_ms), or (None, 0) on timeout
+        """
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None, 0
+
+def run_batch(paths, workers=None):
+    """Transcribe files in bulk and print per-file results and recognizer throughput."""
+    start_time = time.time()
+    results = transcribe_batch(paths, workers)
+    wall_seconds = time.time() - start_time
+    audio_seconds = sum(r["audio_seconds"] for r in results)
+
+    for r in results:
+        print(f"{r['path']}: {r['text']} ({r['latency_ms']:.2f} ms)")
+    print(f"\nTranscribed {len(results)} file(s), {audio_seconds:.1f} s of audio in {wall_seconds:.1f} s "
+          f"({audio_seconds / wall_seconds if wall_seconds else 0:.1f}x real time)")
+
 # Example usage:
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vosk speech-to-text")
+    parser.add_argument("wav_files", nargs="*", help="WAV files to transcribe in batch instead of live capture")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for batch mode")
+    args = parser.parse_args()
+
+    if args.wav_files:
+        run_batch(args.wav_files, args.workers)
+        sys.exit(0)
+
     print("Speech-to-Text Test")
     print("Press Enter to start speaking, then press Enter again to stop.")
     print("Type 'quit' to exit.")
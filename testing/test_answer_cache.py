@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.answer_cache import AnswerCache
+from utils.metrics import metrics
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class CountingSource:
+    """Returns a new numbered answer on each call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        return f"{prompt} #{self.calls}"
+
+class TestAnswerCache(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.clock = FakeClock()
+        self.cache = AnswerCache(policies={"weather": (10, 100)}, clock=self.clock, name="test")
+        self.source = CountingSource()
+
+    def get(self):
+        return self.cache.get("weather in sydney", "weather", self.source, "sunny")
+
+    def test_fresh_answer_is_served_from_memory(self):
+        """Test that an answer within the soft TTL is not recomputed."""
+        self.assertEqual(self.get(), "sunny #1")
+        self.clock.now += 5
+        self.assertEqual(self.get(), "sunny #1")
+        self.assertEqual(self.source.calls, 1)
+        self.assertEqual(metrics.counter("test.hits"), 1)
+
+    def test_stale_answer_is_served_then_refreshed(self):
+        """Test that past the soft TTL the old answer comes back at once and is refreshed behind it."""
+        self.get()
+        self.clock.now += 50
+        self.assertEqual(self.get(), "sunny #1")
+        self.cache.refresher.shutdown(wait=True)
+        self.assertEqual(self.source.calls, 2)
+        self.assertEqual(metrics.counter("test.refreshes"), 1)
+        self.assertEqual(self.cache.lookup("weather in sydney"), ("sunny #2", "fresh"))
+
+    def test_hard_expired_answer_is_refetched(self):
+        """Test that past the hard TTL the answer is recomputed before returning."""
+        self.get()
+        self.clock.now += 500
+        self.assertEqual(self.get(), "sunny #2")
+        self.assertEqual(metrics.counter("test.misses"), 2)
+
+    def test_failed_refresh_keeps_old_answer(self):
+        """Test that a None result from the source does not replace the cached answer."""
+        self.get()
+        self.clock.now += 50
+        self.cache.get("weather in sydney", "weather", lambda: None)
+        self.cache.refresher.shutdown(wait=True)
+        self.assertEqual(self.cache.lookup("weather in sydney"), ("sunny #1", "stale"))
+        self.assertEqual(metrics.counter("test.refresh_failures"), 1)
+
+    def test_unknown_class_uses_default_policy(self):
+        """Test that unlisted query classes fall back to the default TTLs."""
+        self.assertEqual(self.cache.policy("sports"), self.cache.policy("default"))
+
+if __name__ == '__main__':
+    unittest.main()
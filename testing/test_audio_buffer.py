@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.audio_buffer import AudioRingBuffer
+
+def _join(views):
+    return np.frombuffer(b"".join(bytes(v) for v in views), dtype=np.int16)
+
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_read_after_write(self):
+        """Test that written samples come back in order as views over the ring."""
+        ring = AudioRingBuffer(8)
+        ring.write(np.arange(5, dtype=np.int16))
+        views, n = ring.read_views(timeout=0)
+        self.assertEqual(n, 5)
+        np.testing.assert_array_equal(_join(views), np.arange(5))
+        ring.release()
+        self.assertEqual(ring.unread(), 0)
+
+    def test_wraparound_returns_two_views(self):
+        """Test that a region crossing the end of the ring is split into two views."""
+        ring = AudioRingBuffer(8)
+        ring.write(np.arange(6, dtype=np.int16))
+        ring.read_views(timeout=0)
+        ring.release()
+        ring.write(np.arange(6, 11, dtype=np.int16))
+        views, n = ring.read_views(timeout=0)
+        self.assertEqual(len(views), 2)
+        np.testing.assert_array_equal(_join(views), np.arange(6, 11))
+
+    def test_views_are_zero_copy(self):
+        """Test that views alias the preallocated buffer rather than copying it."""
+        ring = AudioRingBuffer(8)
+        ring.write(np.ones(4, dtype=np.int16))
+        views, _ = ring.read_views(timeout=0)
+        ring.buffer[0] = 42
+        self.assertEqual(np.frombuffer(views[0], dtype=np.int16)[0], 42)
+
+    def test_overrun_is_counted(self):
+        """Test that overwriting unread samples is counted instead of silently lost."""
+        ring = AudioRingBuffer(8)
+        ring.write(np.arange(6, dtype=np.int16))
+        ring.write(np.arange(6, 12, dtype=np.int16))
+        self.assertEqual(ring.overrun_samples, 4)
+        views, n = ring.read_views(timeout=0)
+        np.testing.assert_array_equal(_join(views), np.arange(4, 12))
+
+    def test_recent_views_keep_released_audio(self):
+        """Test that already-decoded audio can be read again while it is still in the ring."""
+        ring = AudioRingBuffer(8)
+        ring.write(np.arange(6, dtype=np.int16))
+        ring.read_views(timeout=0)
+        ring.release()
+        ring.write(np.arange(6, 10, dtype=np.int16))
+        np.testing.assert_array_equal(_join(ring.recent_views(5)), np.arange(5, 10))
+        np.testing.assert_array_equal(_join(ring.recent_views(100)), np.arange(2, 10))
+
+    def test_empty_read_times_out(self):
+        """Test that reading with nothing buffered returns no views."""
+        ring = AudioRingBuffer(8)
+        self.assertEqual(ring.read_views(timeout=0.01), ([], 0))
+
+if __name__ == '__main__':
+    unittest.main()
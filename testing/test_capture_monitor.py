@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+from types import SimpleNamespace
+import numpy as np
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.capture_monitor import CaptureMonitor
+from utils.metrics import metrics
+
+class TestCaptureMonitor(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_levels_and_overflows(self):
+        """Test RMS/peak gauges, clipping, silence and device overflow counting."""
+        monitor = CaptureMonitor(16000, prefix="test")
+        monitor.on_block(np.full(1600, 3277, dtype=np.int16))
+        self.assertAlmostEqual(metrics.gauge("test.rms_dbfs"), -20.0, places=0)
+        self.assertAlmostEqual(metrics.gauge("test.peak_dbfs"), -20.0, places=0)
+
+        monitor.on_block(np.full(1600, -32768, dtype=np.int16), SimpleNamespace(input_overflow=True))
+        monitor.on_block(np.zeros(1600, dtype=np.int16))
+        self.assertEqual(metrics.counter("test.clipped_blocks"), 1)
+        self.assertEqual(metrics.counter("test.silent_blocks"), 1)
+        self.assertEqual(metrics.counter("test.device_overflows"), 1)
+        self.assertEqual(metrics.counter("test.blocks"), 3)
+
+    def test_capture_to_recognizer_latency(self):
+        """Test that consuming audio records the wait of the oldest block."""
+        monitor = CaptureMonitor(16000, prefix="test")
+        with patch("utils.capture_monitor.time.monotonic", side_effect=[10.0, 10.1, 10.25]):
+            monitor.on_block(np.zeros(800, dtype=np.int16))
+            monitor.on_block(np.zeros(800, dtype=np.int16))
+            monitor.on_consumed(1600)
+        self.assertEqual([round(v) for v in metrics.samples("test.capture_to_recognizer")], [250])
+
+    def test_sample_rate_drift(self):
+        """Test that a device delivering too few samples reports negative drift."""
+        monitor = CaptureMonitor(16000, prefix="test")
+        times = [100.0 + i * 0.1 for i in range(12)]
+        with patch("utils.capture_monitor.time.monotonic", side_effect=times):
+            for _ in times:
+                monitor.on_block(np.zeros(1584, dtype=np.int16))  # 15840 Hz instead of 16000
+        self.assertAlmostEqual(metrics.gauge("test.sample_rate_drift_ppm"), -10000, delta=1)
+
+if __name__ == '__main__':
+    unittest.main()
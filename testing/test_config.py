@@ -0,0 +1,182 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.config import Config, ConfigError, Setting, CONFIG_DIR, SETTINGS as ALL_SETTINGS, config
+from utils.answer_cache import AnswerCache
+from utils.filler_scheduler import FillerScheduler, LONG_FILLERS
+from utils.task_runner import TaskRunner
+from agents.llm_dispatcher import LLMDispatcher
+
+SETTINGS = [
+    Setting("pepper.ip", str, "10.0.0.244", env="PEPPER_IP"),
+    Setting("pepper.port", int, 5000, env="PEPPER_PORT", minimum=1),
+    Setting("cache.weather.soft_ttl", float, 600, reloadable=True, minimum=0),
+    Setting("cache.weather.hard_ttl", float, 3600, reloadable=True, minimum=0),
+    Setting("debug", bool, False, env="DEBUG", reloadable=True),
+]
+
+class TestConfig(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.base = os.path.join(self.directory, "base.yaml")
+        self.local = os.path.join(self.directory, "local.yaml")
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def make(self, environ=None):
+        return Config([self.base, self.local], SETTINGS, environ or {})
+
+    def test_defaults_without_files(self):
+        cfg = self.make()
+        self.assertEqual(cfg.get("pepper.ip"), "10.0.0.244")
+        self.assertEqual(cfg.get("cache.weather.soft_ttl"), 600.0)
+        self.assertIsNone(cfg.get("missing.key"))
+
+    def test_later_files_and_env_override(self):
+        self.write(self.base, "pepper:\n  ip: 10.0.0.1\n  port: 6000\n")
+        self.write(self.local, "pepper:\n  port: '7000'\ndebug: 'yes'\n")
+        cfg = self.make({"PEPPER_IP": "192.168.1.5"})
+        self.assertEqual(cfg.get("pepper.ip"), "192.168.1.5")
+        self.assertEqual(cfg.get("pepper.port"), 7000)
+        self.assertIs(cfg.get("debug"), True)
+
+    def test_invalid_values_fail_at_startup(self):
+        self.write(self.base, "pepper:\n  port: http\n")
+        with self.assertRaises(ConfigError):
+            self.make()
+        self.write(self.base, "pepper:\n  port: 0\n")
+        with self.assertRaises(ConfigError):
+            self.make()
+
+    def test_reload_applies_only_reloadable_settings(self):
+        self.write(self.base, "pepper:\n  ip: 10.0.0.1\ncache:\n  weather:\n    soft_ttl: 600\n")
+        cfg = self.make()
+        seen = []
+        cfg.subscribe(lambda c, changed: seen.append(changed))
+        self.write(self.base, "pepper:\n  ip: 10.0.0.2\ncache:\n  weather:\n    soft_ttl: 30\n")
+        self.assertEqual(cfg.reload(), {"cache.weather.soft_ttl"})
+        self.assertEqual(cfg.get("cache.weather.soft_ttl"), 30.0)
+        self.assertEqual(cfg.get("pepper.ip"), "10.0.0.1")
+        self.assertEqual(seen, [{"cache.weather.soft_ttl"}])
+
+    def test_restart_only_change_is_reported_once(self):
+        self.write(self.base, "pepper:\n  ip: 10.0.0.1\n")
+        cfg = self.make()
+        self.write(self.base, "pepper:\n  ip: 10.0.0.2\n")
+        with patch("builtins.print") as mock_print:
+            cfg.reload()
+            cfg.reload()
+        self.assertEqual(mock_print.call_count, 1)
+        self.assertEqual(cfg.pending, {"pepper.ip": "10.0.0.2"})
+        self.write(self.base, "pepper:\n  ip: 10.0.0.1\n")
+        cfg.reload()
+        self.assertEqual(cfg.pending, {})
+
+    def test_soft_ttl_may_not_exceed_hard_ttl(self):
+        self.write(self.base, "cache:\n  weather:\n    soft_ttl: 7200\n")
+        with self.assertRaises(ConfigError):
+            self.make()
+        self.write(self.base, "cache:\n  weather:\n    soft_ttl: 60\n")
+        cfg = self.make()
+        self.write(self.base, "cache:\n  weather:\n    soft_ttl: 60\n    hard_ttl: 30\n")
+        self.assertEqual(cfg.reload(), set())
+        self.assertEqual(cfg.get("cache.weather.hard_ttl"), 3600.0)
+
+    def test_reload_retunes_cache_and_fillers(self):
+        self.write(self.base, "cache:\n  weather:\n    soft_ttl: 600\nfiller:\n  long_threshold: 2.5\n  early_delay: 0.6\n")
+        cfg = Config([self.base], ALL_SETTINGS, {})
+        runner = TaskRunner(max_workers=1, name="test")
+        self.addCleanup(runner.shutdown)
+        cache = AnswerCache()
+        fillers = FillerScheduler(runner, lambda text: None, min_samples=1)
+        fillers.record("summary", 2.0)
+        with patch("utils.answer_cache.config", cfg), patch("utils.filler_scheduler.config", cfg):
+            self.assertEqual(cache.policy("weather")[0], 600.0)
+            self.assertNotEqual(fillers.plan("summary")[1], LONG_FILLERS)
+
+            self.write(self.base, "cache:\n  weather:\n    soft_ttl: 30\nfiller:\n  long_threshold: 1.0\n  early_delay: 0.2\n")
+            cfg.reload()
+            self.assertEqual(cache.policy("weather"), (30.0, cfg.get("cache.weather.hard_ttl")))
+            self.assertEqual(fillers.plan("summary"), (0.2, LONG_FILLERS))
+
+    def test_bad_reload_keeps_current_values(self):
+        self.write(self.base, "cache:\n  weather:\n    soft_ttl: 600\n")
+        cfg = self.make()
+        self.write(self.base, "cache:\n  weather:\n    soft_ttl: [\n")
+        self.assertEqual(cfg.reload(), set())
+        self.assertEqual(cfg.get("cache.weather.soft_ttl"), 600.0)
+
+    def test_check_reloads_edited_file(self):
+        cfg = self.make()
+        self.write(self.local, "cache:\n  weather:\n    soft_ttl: 5\n")
+        self.assertEqual(cfg.check(), {"cache.weather.soft_ttl"})
+        self.assertEqual(cfg.check(), set())
+
+    def test_shipped_config_files_are_valid(self):
+        cfg = Config([os.path.join(CONFIG_DIR, "searxng_config.yaml"), os.path.join(CONFIG_DIR, "pepper_config.yaml")],
+                     environ={})
+        self.assertEqual(cfg.get("searxng.base_url"), "http://192.168.194.33:8060")
+        self.assertEqual(cfg.get("pepper.port"), 5000)
+        self.assertLessEqual(cfg.get("cache.time.soft_ttl"), cfg.get("cache.time.hard_ttl"))
+        self.assertEqual(set(cfg.values), set(config.values))
+
+    def test_tuning_environment_variables_still_override(self):
+        shipped = [os.path.join(CONFIG_DIR, "searxng_config.yaml"), os.path.join(CONFIG_DIR, "pepper_config.yaml")]
+        cfg = Config(shipped, environ={"TTS_STREAMING": "0", "SESSION_IDLE_TIMEOUT": "60",
+                                       "LOCAL_LLM_TASKS": "emotion,summary", "WARMUP_TOP_N": "5"})
+        self.assertIs(cfg.get("tts.streaming"), False)
+        self.assertEqual(cfg.get("session.idle_timeout"), 60.0)
+        self.assertEqual(cfg.get("llm.local.tasks"), "emotion,summary")
+        self.assertEqual(cfg.get("warmup.top_n"), 5)
+        self.assertEqual(cfg.get("pepper_agent.cache_ttl"), 3600.0)
+
+class TestDispatcherLimits(unittest.TestCase):
+    def test_resizing_worker_pool(self):
+        dispatcher = LLMDispatcher(max_workers=3, base_delay=0)
+        self.assertEqual(dispatcher.call(lambda: "ok"), "ok")
+        self.assertEqual(len(dispatcher._workers), 3)
+
+        dispatcher.set_limits(max_workers=1)
+        deadline = time.monotonic() + 2
+        while len(dispatcher._workers) > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(dispatcher._workers), 1)
+
+        running = []
+        release = threading.Event()
+
+        def slow():
+            running.append(1)
+            release.wait(2)
+
+        dispatcher.set_limits(max_workers=2)
+        futures = [dispatcher.submit(slow) for _ in range(2)]
+        deadline = time.monotonic() + 2
+        while len(running) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        self.assertEqual(len(running), 2)
+        for future in futures:
+            future.result(timeout=2)
+
+    def test_token_budget_can_be_enabled_and_disabled(self):
+        dispatcher = LLMDispatcher(max_workers=1, tokens_per_minute=0)
+        dispatcher.set_limits(tokens_per_minute=600, max_retries=0)
+        self.assertEqual(dispatcher.budget.rate, 10.0)
+        self.assertEqual(dispatcher.max_retries, 0)
+        dispatcher.set_limits(tokens_per_minute=0)
+        self.assertIsNone(dispatcher.budget)
+
+if __name__ == '__main__':
+    unittest.main()
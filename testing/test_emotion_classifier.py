@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.emotion_classifier import EmotionClassifier, EMOTIONS
+
+class TestEmotionClassifier(unittest.TestCase):
+    def setUp(self):
+        """Set up test cases."""
+        self.classifier = EmotionClassifier()
+
+    def test_clear_emotions(self):
+        """Test that sentences with a strong cue get that label confidently."""
+        cases = {
+            "I'm so happy to see you!": "happy",
+            "That is really sad news.": "sad",
+            "I am furious about the delay.": "angry",
+            "Canberra is the capital of Australia.": "neutral",
+        }
+        for sentence, expected in cases.items():
+            tag, confidence = self.classifier.predict(sentence)
+            self.assertEqual(tag, expected, sentence)
+            self.assertGreaterEqual(confidence, 0.6, sentence)
+
+    def test_mixed_sentence_is_low_confidence(self):
+        """Test that conflicting cues give a low confidence so the LLM is consulted."""
+        _, confidence = self.classifier.predict("I'm happy but also a bit sad and angry.")
+        self.assertLess(confidence, 0.6)
+
+    def test_negation(self):
+        """Test that a negated cue does not produce that emotion."""
+        tag, _ = self.classifier.predict("I am not happy.")
+        self.assertNotEqual(tag, "happy")
+
+    def test_save_and_load(self):
+        """Test that weights round-trip through a NumPy weight file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "emotion.npz")
+            self.classifier.save(path)
+            loaded = EmotionClassifier(path)
+            self.assertEqual(loaded.vocab, self.classifier.vocab)
+            self.assertEqual(loaded.predict("What a wonderful day!"),
+                             self.classifier.predict("What a wonderful day!"))
+
+    def test_latency(self):
+        """Test that classification stays well under 5 ms per sentence."""
+        sentence = "My circuits are buzzing with joy today! I'm functioning perfectly."
+        start = time.perf_counter()
+        for _ in range(200):
+            self.classifier.predict(sentence)
+        per_call_ms = (time.perf_counter() - start) * 1000 / 200
+        self.assertLess(per_call_ms, 5)
+        self.assertIn(self.classifier.predict(sentence)[0], EMOTIONS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.filler_scheduler import FillerScheduler, SHORT_FILLERS, LONG_FILLERS, SEARCH_FILLERS
+from utils.config import config
+from utils.task_runner import TaskRunner
+from utils.metrics import metrics
+
+class TestFillerScheduler(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.runner = TaskRunner(max_workers=1, name="test")
+        self.spoken = []
+        self.scheduler = FillerScheduler(self.runner, self.spoken.append, min_samples=3, min_gap=0)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_slow_agent_gets_early_long_filler(self):
+        """Test that an agent whose median latency is high is masked early with a long phrase."""
+        for seconds in [3.0, 4.0, 3.5]:
+            self.scheduler.record("search3", seconds)
+        delay, phrases = self.scheduler.plan("search3")
+        self.assertEqual(delay, config.get("filler.early_delay"))
+        self.assertIs(phrases, SEARCH_FILLERS)
+
+    def test_only_search_agents_say_they_are_searching(self):
+        """Test that a slow non-search agent gets a generic long filler."""
+        for seconds in [3.0, 4.0, 3.5]:
+            self.scheduler.record("summary", seconds)
+            self.scheduler.record("search", seconds)
+        self.assertIs(self.scheduler.plan("summary")[1], LONG_FILLERS)
+        self.assertIs(self.scheduler.plan("search")[1], SEARCH_FILLERS)
+        self.assertFalse(any("search" in phrase.lower() for phrase in LONG_FILLERS + SHORT_FILLERS))
+
+    def test_fast_agent_waits_for_its_p90(self):
+        """Test that a quick agent only gets a short filler once it overruns its usual latency."""
+        for seconds in [0.4, 0.5, 1.2, 0.6, 0.5]:
+            self.scheduler.record("pepper", seconds)
+        delay, phrases = self.scheduler.plan("pepper")
+        self.assertEqual(delay, max(1.2, config.get("filler.min_delay")))
+        self.assertIs(phrases, SHORT_FILLERS)
+        self.assertEqual(len(metrics.samples("agent.pepper")), 5)
+
+    def test_filler_fires_only_if_call_still_running(self):
+        """Test that a cancelled filler is silent and an overrunning call gets one filler."""
+        self.scheduler.plan = lambda agent: (0.05, ["Just a moment."])
+        cancel_event = threading.Event()
+        self.scheduler.schedule("pepper", cancel_event).cancel()
+        self.scheduler.schedule("summary", cancel_event)
+        time.sleep(0.2)
+        self.assertEqual(self.spoken, ["Just a moment."])
+        self.assertEqual(metrics.counter("filler.fired"), 1)
+        self.assertEqual(metrics.counter("filler.fired.summary"), 1)
+
+    def test_min_gap_prevents_chatter(self):
+        """Test that back-to-back slow calls produce a single filler."""
+        self.scheduler.min_gap = 10
+        self.scheduler.plan = lambda agent: (0.01, ["Just a moment."])
+        for _ in range(3):
+            self.scheduler.schedule("search", threading.Event())
+            time.sleep(0.05)
+        self.assertEqual(len(self.spoken), 1)
+        self.assertEqual(metrics.counter("filler.suppressed"), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import the agents package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents import llm_backend
+from agents.llm_backend import LLMRouter, InProcessGGUFLLM
+
+class TestLLMRouter(unittest.TestCase):
+    def test_local_tasks_use_local_server(self):
+        """Test that tasks in the local list get a client pointed at the local server."""
+        router = LLMRouter(local_tasks=["summary", "emotion"])
+        llm = router.get_llm("summary", temperature=0.2)
+        self.assertEqual(llm.model_name, llm_backend.LOCAL_LLM_MODEL)
+        self.assertEqual(llm.openai_api_base, llm_backend.LOCAL_LLM_URL)
+        self.assertTrue(router.is_local("emotion"))
+        self.assertFalse(router.is_local("pepper"))
+
+    def test_backends_are_shared(self):
+        """Test that agents asking for the same backend share one client."""
+        router = LLMRouter(local_tasks=["summary", "emotion"])
+        self.assertIs(router.get_llm("summary", 0.2).llm, router.get_llm("emotion", 0.2).llm)
+        self.assertIsNot(router.get_llm("summary", 0.2).llm, router.get_llm("emotion", 0.7).llm)
+
+    def test_gguf_path_selects_in_process_model(self):
+        """Test that LOCAL_GGUF_PATH switches local tasks to the in-process backend."""
+        original = llm_backend.LOCAL_GGUF_PATH
+        llm_backend.LOCAL_GGUF_PATH = "/models/tiny.gguf"
+        try:
+            llm = LLMRouter(local_tasks=["emotion"]).get_llm("emotion")
+            self.assertIsInstance(llm.llm, InProcessGGUFLLM)
+            self.assertEqual(llm.model_path, "/models/tiny.gguf")
+        finally:
+            llm_backend.LOCAL_GGUF_PATH = original
+
+if __name__ == '__main__':
+    unittest.main()
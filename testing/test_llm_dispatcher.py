@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import threading
+from types import SimpleNamespace
+
+# Add the parent directory to the Python path so we can import the agents package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.llm_dispatcher import (LLMDispatcher, DispatchedLLM, TokenBucket, is_retryable,
+                                   PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+from utils.metrics import metrics
+
+class RateLimited(Exception):
+    status_code = 429
+
+class FakeLLM:
+    """Fails with a 429 a set number of times, then answers; streams word by word."""
+
+    def __init__(self, failures=0, text="one two three four five"):
+        self.failures = failures
+        self.text = text
+        self.calls = 0
+        self.chunks_read = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RateLimited("slow down")
+        return SimpleNamespace(content=f"answer to {prompt}")
+
+    def stream(self, prompt, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RateLimited("slow down")
+        for word in self.text.split():
+            self.chunks_read += 1
+            yield SimpleNamespace(content=word)
+
+class TestLLMDispatcher(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_interactive_jobs_run_before_background(self):
+        """Test that queued interactive calls jump ahead of background calls."""
+        dispatcher = LLMDispatcher(max_workers=1, base_delay=0)
+        gate = threading.Event()
+        order = []
+        blocker = dispatcher.submit(gate.wait)
+        futures = [dispatcher.submit(order.append, "background", priority=PRIORITY_BACKGROUND),
+                   dispatcher.submit(order.append, "interactive", priority=PRIORITY_INTERACTIVE)]
+        gate.set()
+        for future in [blocker] + futures:
+            future.result(timeout=2)
+        self.assertEqual(order, ["interactive", "background"])
+
+    def test_rate_limit_is_retried(self):
+        """Test that 429s are retried with backoff until the call succeeds."""
+        llm = DispatchedLLM(FakeLLM(failures=2), "pepper", LLMDispatcher(max_workers=1, base_delay=0))
+        self.assertEqual(llm.invoke("hi").content, "answer to hi")
+        self.assertEqual(metrics.counter("llm.retries"), 2)
+        self.assertEqual(metrics.counter("llm.rate_limited"), 2)
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the last error is raised once retries are exhausted."""
+        llm = DispatchedLLM(FakeLLM(failures=5), "pepper", LLMDispatcher(max_workers=1, max_retries=1, base_delay=0))
+        with self.assertRaises(RateLimited):
+            llm.invoke("hi")
+        self.assertEqual(metrics.counter("llm.failures"), 1)
+
+    def test_stream_can_be_closed_early(self):
+        """Test that a dispatched stream yields chunks and stops reading when closed."""
+        fake = FakeLLM(failures=1, text=" ".join(str(i) for i in range(100)))
+        llm = DispatchedLLM(fake, "search", LLMDispatcher(max_workers=1, base_delay=0))
+        words = []
+        for chunk in llm.stream("hi"):
+            words.append(chunk.content)
+            if len(words) == 2:
+                break
+        self.assertEqual(words, ["0", "1"])
+        self.assertEqual(metrics.counter("llm.retries"), 1)
+        self.assertLess(fake.chunks_read, 20)
+
+    def test_token_bucket_waits_when_empty(self):
+        """Test that the bucket only blocks once its budget is spent."""
+        bucket = TokenBucket(6000)  # 100 tokens a second
+        self.assertEqual(bucket.acquire(6000), 0)
+        self.assertGreater(bucket.acquire(5), 0)
+
+    def test_retryable_errors(self):
+        """Test which errors are treated as transient."""
+        self.assertTrue(is_retryable(RateLimited()))
+        self.assertTrue(is_retryable(SimpleNamespace(status_code=503)))
+        self.assertFalse(is_retryable(SimpleNamespace(status_code=400)))
+        self.assertFalse(is_retryable(ValueError("bad prompt")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.llm_streaming import stream_with_budget, truncate_to_budget, max_tokens_for, record_usage, estimate_tokens
+from utils.metrics import metrics
+
+class FakeStreamingLLM:
+    """Yields a fixed text a few characters at a time and records how much was read."""
+
+    def __init__(self, text, chunk_size=4, usage=None):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.usage = usage
+        self.chunks_read = 0
+        self.kwargs = None
+
+    def stream(self, messages, **kwargs):
+        self.kwargs = kwargs
+        for i in range(0, len(self.text), self.chunk_size):
+            self.chunks_read += 1
+            yield SimpleNamespace(content=self.text[i:i + self.chunk_size])
+        if self.usage:
+            # Like OpenAI, usage arrives in a final chunk without content
+            yield SimpleNamespace(content="", usage_metadata=self.usage)
+
+class TestLLMStreaming(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_short_response_is_read_fully(self):
+        """Test that a response under budget is returned unchanged."""
+        llm = FakeStreamingLLM("Hello there! Lovely to meet you.")
+        self.assertEqual(stream_with_budget(llm, []), "Hello there! Lovely to meet you.")
+        self.assertEqual(llm.kwargs["max_tokens"], max_tokens_for(200))
+        self.assertEqual(metrics.counter("llm.early_stops"), 0)
+
+    def test_long_response_stops_early(self):
+        """Test that the stream is abandoned once past the budget and cut at a sentence."""
+        text = "This is a sentence. " * 50
+        llm = FakeStreamingLLM(text)
+        response = stream_with_budget(llm, [], metric_name="test")
+        self.assertEqual(response, truncate_to_budget(text))
+        self.assertTrue(response.endswith("."))
+        self.assertLessEqual(len(response), 200)
+        self.assertLess(llm.chunks_read, len(text) // 4)
+        self.assertEqual(metrics.counter("test.early_stops"), 1)
+        self.assertEqual(metrics.counter("test.chunks_streamed"), llm.chunks_read)
+        self.assertEqual(metrics.counter("test.tokens_saved"), max_tokens_for(200) - estimate_tokens(text[:llm.chunks_read * 4]))
+
+    def test_early_stop_estimates_missing_usage(self):
+        """Test that a stream closed before its usage chunk still has its tokens accounted for."""
+        usage = {"input_tokens": 50, "output_tokens": 300, "input_token_details": {"cache_read": 0}}
+        messages = [{"role": "system", "content": "s" * 400}, {"role": "user", "content": "Tell me a story"}]
+        stream_with_budget(FakeStreamingLLM("This is a sentence. " * 50, usage=usage), messages, metric_name="test")
+        self.assertEqual(metrics.counter("test.calls_with_usage"), 0)
+        self.assertEqual(metrics.counter("test.calls_without_usage"), 1)
+        self.assertEqual(metrics.counter("test.estimated_prompt_tokens"), estimate_tokens("s" * 400 + "Tell me a story"))
+        self.assertGreater(metrics.counter("test.estimated_completion_tokens"), 0)
+
+        stream_with_budget(FakeStreamingLLM("Short and sweet.", usage=usage), messages, metric_name="test")
+        self.assertEqual(metrics.counter("test.calls_with_usage"), 1)
+        self.assertEqual(metrics.counter("test.prompt_tokens"), 50)
+        self.assertEqual(metrics.counter("test.calls_without_usage"), 1)
+
+    def test_record_usage_counts_cached_tokens(self):
+        """Test that provider usage reports feed the prompt and cached token counters."""
+        message = SimpleNamespace(content="hi", usage_metadata={
+            "input_tokens": 1200, "output_tokens": 10,
+            "input_token_details": {"cache_read": 1024}
+        })
+        record_usage(message, "test")
+        record_usage(SimpleNamespace(content="no usage"), "test")
+        self.assertEqual(metrics.counter("test.calls_with_usage"), 1)
+        self.assertEqual(metrics.counter("test.prompt_tokens"), 1200)
+        self.assertEqual(metrics.counter("test.cached_tokens"), 1024)
+
+    def test_truncate_without_punctuation(self):
+        """Test that text without sentence punctuation is cut at the budget."""
+        self.assertEqual(len(truncate_to_budget("a" * 300)), 200)
+
+if __name__ == '__main__':
+    unittest.main()
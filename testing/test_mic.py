@@ -1,6 +1,12 @@
+import sys
+import os
 import sounddevice as sd
 import numpy as np
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.capture_monitor import CaptureMonitor
+from utils.metrics import metrics
+
 def test_microphone():
     print("Testing microphone...")
     print("Available devices:")
@@ -17,5 +23,15 @@ def test_microphone():
     else:
         print("No audio detected. Please check your microphone settings.")
 
+    # Report the same capture-path metrics the STT pipeline collects
+    monitor = CaptureMonitor(16000, prefix="mic_test")
+    for block in np.array_split(recording[:, 0], 10):
+        monitor.on_block(block)
+    snapshot = metrics.snapshot()
+    print(f"RMS: {snapshot['gauges']['mic_test.rms_dbfs']} dBFS, "
+          f"peak: {snapshot['gauges']['mic_test.peak_dbfs']} dBFS, "
+          f"clipped blocks: {snapshot['counters'].get('mic_test.clipped_blocks', 0)}, "
+          f"silent blocks: {snapshot['counters'].get('mic_test.silent_blocks', 0)}")
+
 if __name__ == "__main__":
-    test_microphone() 
\ No newline at end of file
+    test_microphone()
@@ -0,0 +1,133 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the Python path so we can import orchestrator_server
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from orchestrator_server import create_app
+from utils.metrics import metrics
+
+class StubPepperAgent:
+    """Hands out a plain list as each session's memory."""
+
+    def new_memory(self):
+        return []
+
+class StubOrchestrator:
+    """Answers each turn with the number of earlier turns in that session's memory."""
+
+    def __init__(self):
+        self.pepper_agent = StubPepperAgent()
+        self.release = threading.Event()
+        self.release.set()
+        self.entered = threading.Event()
+        self.reply = None
+
+    def generate_response(self, user_input, memory=None):
+        self.entered.set()
+        self.release.wait(5)
+        memory.append(user_input)
+        return self.reply or f"Turn {len(memory)}: {user_input}."
+
+class TestOrchestratorServer(unittest.TestCase):
+    def setUp(self):
+        self.orchestrator = StubOrchestrator()
+        self.app = create_app(self.orchestrator)
+        self.manager = self.app.config["session_manager"]
+        self.client = self.app.test_client()
+
+    def create_session(self):
+        response = self.client.post("/sessions", json={"client_id": "kiosk-1"})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()["session_id"]
+
+    def turn(self, session_id, text, client=None):
+        return (client or self.client).post(f"/sessions/{session_id}/turn", json={"text": text})
+
+    def test_session_lifecycle(self):
+        """Test that a session is created, answers turns and is gone once deleted."""
+        session_id = self.create_session()
+        self.assertEqual(self.manager.get(session_id).client_id, "kiosk-1")
+        response = self.turn(session_id, "Hello")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["response"], "Turn 1: Hello.")
+        self.assertEqual(data["sentences"], ["Turn 1: Hello."])
+
+        self.assertEqual(self.client.delete(f"/sessions/{session_id}").status_code, 200)
+        self.assertEqual(self.client.delete(f"/sessions/{session_id}").status_code, 404)
+        self.assertEqual(self.turn(session_id, "Hello").status_code, 404)
+
+    def test_sessions_have_separate_memories(self):
+        """Test that each session keeps its own conversation memory."""
+        first, second = self.create_session(), self.create_session()
+        self.turn(first, "One")
+        self.turn(first, "Two")
+        self.assertEqual(self.turn(second, "One").get_json()["response"], "Turn 1: One.")
+        self.assertEqual(self.manager.get(first).memory, ["One", "Two"])
+
+    def test_empty_turn_is_rejected(self):
+        """Test that a blank turn gets a 400."""
+        session_id = self.create_session()
+        self.assertEqual(self.turn(session_id, "  ").status_code, 400)
+
+    def test_concurrent_turn_in_same_session_gets_429(self):
+        """Test that a second turn while one is running gets a 429 without holding up other sessions."""
+        session_id = self.create_session()
+        other = self.create_session()
+        self.orchestrator.release.clear()
+        self.orchestrator.entered.clear()
+        results = {}
+        thread = threading.Thread(target=lambda: results.update(first=self.turn(session_id, "Slow", self.app.test_client())))
+        thread.start()
+        self.assertTrue(self.orchestrator.entered.wait(2))
+        rejected_before = metrics.counter("server.turns_rejected")
+
+        self.assertEqual(self.turn(session_id, "Again").status_code, 429)
+        self.assertEqual(metrics.counter("server.turns_rejected"), rejected_before + 1)
+
+        # Other sessions are not held up by the busy one
+        self.orchestrator.release.set()
+        thread.join(timeout=5)
+        self.assertEqual(results["first"].status_code, 200)
+        self.assertEqual(self.turn(other, "Hi").status_code, 200)
+        self.assertEqual(self.turn(session_id, "Again").status_code, 200)
+
+    def test_idle_sessions_expire(self):
+        """Test that sessions idle past the timeout are dropped and active ones kept."""
+        idle, active = self.create_session(), self.create_session()
+        self.manager.idle_timeout = 60
+        self.manager.sessions[idle].last_active = time.time() - 120
+        self.assertIsNone(self.manager.get(idle))
+        self.assertIsNotNone(self.manager.get(active))
+        self.assertEqual(self.turn(idle, "Hello").status_code, 404)
+
+    def test_audio_turn(self):
+        """Test that a WAV body is transcribed and answered, and an undecodable one gets a 400."""
+        session_id = self.create_session()
+        with patch("orchestrator_server.transcribe_wav", return_value=("what time is it", 12.0)):
+            data = self.client.post(f"/sessions/{session_id}/audio", data=b"RIFF").get_json()
+        self.assertEqual(data["input"], "what time is it")
+        with patch("orchestrator_server.transcribe_wav", side_effect=ValueError("not a wav")):
+            self.assertEqual(self.client.post(f"/sessions/{session_id}/audio", data=b"").status_code, 400)
+
+    def test_sentences_are_sanitized_for_speech(self):
+        """Test that clients get sentences without emoji, markdown, URLs or emoji-only lines."""
+        session_id = self.create_session()
+        self.orchestrator.reply = "**Hi** there! 😊 🎉. See https://example.com for 5 * 3 facts."
+        data = self.turn(session_id, "Hello").get_json()
+        self.assertEqual(data["response"], self.orchestrator.reply)
+        self.assertEqual(data["sentences"], ["Hi there!", "See for 5 times 3 facts."])
+
+    def test_metrics_report_active_sessions(self):
+        """Test that /metrics reports the number of open sessions."""
+        self.create_session()
+        self.create_session()
+        data = self.client.get("/metrics").get_json()
+        self.assertEqual(data["gauges"]["server.active_sessions"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, HumanMessage
+
+# Add the parent directory to the Python path so we can import the agents package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from agents.pepper_agent import PepperAgent, conversation_key
+except ImportError:  # langchain releases without langchain.memory
+    PepperAgent = None
+
+class FakeChatMemory:
+    def __init__(self, messages=()):
+        self.messages = list(messages)
+
+    def add_user_message(self, text):
+        self.messages.append(HumanMessage(content=text))
+
+    def add_ai_message(self, text):
+        self.messages.append(AIMessage(content=text))
+
+class FakeMemory:
+    def __init__(self, *history):
+        self.chat_memory = FakeChatMemory(history)
+
+def reply_from_history(llm, messages, metric_name=None):
+    """Answer with the last thing the user said before the current prompt, like a model using context."""
+    earlier = [m["content"] for m in messages[1:-1] if m["role"] == "user"]
+    return f"You said: {earlier[-1]}" if earlier else "You haven't told me yet."
+
+@unittest.skipIf(PepperAgent is None, "agents.pepper_agent is not importable here")
+class TestPepperAgentConversationKeys(unittest.TestCase):
+    @patch("agents.pepper_agent.get_llm")
+    def setUp(self, mock_get_llm):
+        self.agent = PepperAgent()
+
+    def test_key_depends_on_history(self):
+        fresh = FakeMemory()
+        ann = FakeMemory(HumanMessage(content="My name is Ann"), AIMessage(content="Hi Ann!"))
+        bob = FakeMemory(HumanMessage(content="My name is Bob"), AIMessage(content="Hi Bob!"))
+        self.assertEqual(conversation_key("What's my name?", fresh), "what s my name")
+        self.assertNotEqual(conversation_key("What's my name?", ann), conversation_key("What's my name?", bob))
+        self.assertEqual(conversation_key("what's my name", ann), conversation_key("What's my name?", ann))
+
+    @patch("agents.pepper_agent.stream_with_budget", side_effect=reply_from_history)
+    def test_same_prompt_in_different_conversations(self, mock_stream):
+        ann = FakeMemory(HumanMessage(content="My name is Ann"), AIMessage(content="Hi Ann!"))
+        bob = FakeMemory(HumanMessage(content="My name is Bob"), AIMessage(content="Hi Bob!"))
+        self.assertEqual(self.agent.get_response("What's my name?", memory=ann), "You said: My name is Ann")
+        self.assertEqual(self.agent.get_response("What's my name?", memory=bob), "You said: My name is Bob")
+        self.assertEqual(self.agent.get_response("What's my name?", memory=FakeMemory()), "You haven't told me yet.")
+        self.assertEqual(mock_stream.call_count, 3)
+
+    @patch("agents.pepper_agent.stream_with_budget", side_effect=reply_from_history)
+    def test_concurrent_callers_with_different_histories_are_not_coalesced(self, mock_stream):
+        release = threading.Event()
+
+        def slow_reply(llm, messages, metric_name=None):
+            release.wait(2)
+            return reply_from_history(llm, messages)
+
+        mock_stream.side_effect = slow_reply
+        memories = [FakeMemory(HumanMessage(content=f"My name is {name}"), AIMessage(content="Hi!"))
+                    for name in ("Ann", "Bob")]
+        replies = [None, None]
+
+        def ask(i):
+            replies[i] = self.agent.get_response("Tell me more", memory=memories[i])
+
+        threads = [threading.Thread(target=ask, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(replies, ["You said: My name is Ann", "You said: My name is Bob"])
+
+    @patch("agents.pepper_agent.stream_with_budget", side_effect=reply_from_history)
+    def test_fresh_conversations_share_cached_answers(self, mock_stream):
+        self.agent.get_response("How are you?", memory=FakeMemory())
+        self.agent.get_response("how are you", memory=FakeMemory())
+        self.assertEqual(mock_stream.call_count, 1)
+
+    @patch("agents.pepper_agent.stream_with_budget", side_effect=reply_from_history)
+    def test_cached_reply_is_recorded_in_memory(self, mock_stream):
+        """Test that a reply served from the cache still becomes part of the conversation."""
+        self.agent.get_response("My name is Ann", memory=FakeMemory())
+        memory = FakeMemory()
+        self.agent.get_response("My name is Ann", memory=memory)
+        self.assertEqual(mock_stream.call_count, 1)
+        self.assertEqual([m.content for m in memory.chat_memory.messages],
+                         ["My name is Ann", "You haven't told me yet."])
+        self.assertEqual(self.agent.get_response("What's my name?", memory=memory), "You said: My name is Ann")
+
+    @patch("agents.pepper_agent.stream_with_budget", side_effect=reply_from_history)
+    def test_response_cache_is_bounded(self, mock_stream):
+        """Test that the cache keeps at most max_cache_entries and drops expired replies."""
+        self.agent.max_cache_entries = 3
+        memory = FakeMemory()
+        for i in range(10):
+            self.agent.get_response(f"Turn {i}", memory=memory)
+        self.assertEqual(len(self.agent.response_cache), 3)
+
+        self.agent.cache_ttl = 60
+        with patch("agents.pepper_agent.time.time", return_value=time.time() + 120):
+            self.agent.get_response("Later", memory=FakeMemory())
+        self.assertEqual(list(self.agent.response_cache), ["later"])
+
+if __name__ == '__main__':
+    unittest.main()
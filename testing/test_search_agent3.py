@@ -5,7 +5,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from agents.search_agent3 import SearchAgent3
+from agents.search_agent3 import SearchAgent3, SEARXNG_URL
 import time
 
 def test_search_agent3():
@@ -65,7 +65,7 @@ def test_api_connectivity():
     
     try:
         # Test the API directly
-        url = "http://192.168.194.33:8060/search"
+        url = f"{SEARXNG_URL}/search"
         params = {"q": "test query", "format": "json"}
         
         print(f"Testing API endpoint: {url}")
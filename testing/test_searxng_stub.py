@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+from werkzeug.serving import make_server
+
+# Add the parent directory to the Python path so we can import the dev and agents packages
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dev.searxng_stub import create_app
+from agents.search_agent3 import SearchAgent3
+
+class TestSearxngStub(unittest.TestCase):
+    def search(self, app, query):
+        return app.test_client().get("/search", query_string={"q": query, "format": "json"})
+
+    def test_query_matches_fixture_by_keyword(self):
+        response = self.search(create_app(), "weather in Sydney")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["query"], "weather in Sydney")
+        self.assertIn("degrees", data["results"][0]["content"])
+
+    def test_unmatched_query_uses_default_fixture(self):
+        data = self.search(create_app(), "tell me about robots").get_json()
+        self.assertGreater(len(data["results"]), 0)
+        self.assertEqual(data["number_of_results"], len(data["results"]))
+
+    def test_result_count_and_size(self):
+        base = self.search(create_app(), "weather in Sydney").get_json()["results"][0]["content"]
+        data = self.search(create_app(num_results=7, content_repeat=3), "weather in Sydney").get_json()
+        self.assertEqual(len(data["results"]), 7)
+        self.assertEqual(data["results"][0]["content"], " ".join([base] * 3))
+
+    def test_error_rate(self):
+        app = create_app(error_rate=1.0, seed=1)
+        for _ in range(5):
+            self.assertIn(self.search(app, "weather").status_code, (500, 502, 429))
+        ok = create_app(error_rate=0.0)
+        self.assertEqual(self.search(ok, "weather").status_code, 200)
+
+    def test_latency(self):
+        start = time.monotonic()
+        self.search(create_app(latency_ms=100), "weather")
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+class TestSearchAgent3AgainstStub(unittest.TestCase):
+    """SearchAgent3 end to end over HTTP, with the LLM patched out."""
+
+    def start_stub(self, **options):
+        server = make_server("127.0.0.1", 0, create_app(**options))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    @patch("agents.search_agent3.get_llm")
+    def make_agent(self, url, mock_get_llm):
+        agent = SearchAgent3()
+        agent.search_api_url = f"{url}/search"
+        agent.min_search_interval = 0
+        return agent
+
+    def test_answers_from_fixtures(self):
+        agent = self.make_agent(self.start_stub())
+        self.assertEqual(agent.get_response("weather in Sydney"), "It's about 18 celsius in Sydney right now.")
+        self.assertIn("10:42 AM", agent.get_response("what time is it in Sydney"))
+        self.assertIn("453,558 people", agent.get_response("population of Canberra"))
+
+    def test_search_service_failure(self):
+        agent = self.make_agent(self.start_stub(error_rate=1.0))
+        self.assertIn("couldn't access the search service", agent.get_response("weather in Sydney"))
+
+if __name__ == '__main__':
+    unittest.main()
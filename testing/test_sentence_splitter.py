@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.sentence_splitter import SentenceSegmenter, split_into_sentences
+
+class TestSentenceSplitter(unittest.TestCase):
+    def test_simple_sentences(self):
+        """Test that ordinary sentences split as before."""
+        self.assertEqual(split_into_sentences("Hello there! How are you? I'm fine."),
+                         ["Hello there!", "How are you?", "I'm fine."])
+
+    def test_abbreviations_and_initials(self):
+        """Test that titles, initials and e.g. do not end sentences."""
+        self.assertEqual(split_into_sentences("Dr. Smith met J. R. Tolkien at St. Mary's. Mr. Jones came too."),
+                         ["Dr. Smith met J. R. Tolkien at St. Mary's.", "Mr. Jones came too."])
+        self.assertEqual(split_into_sentences("Try a city, e.g. Canberra. It is lovely."),
+                         ["Try a city, e.g. Canberra.", "It is lovely."])
+
+    def test_numbers_and_units(self):
+        """Test that decimals, list numbers and units stay intact."""
+        self.assertEqual(split_into_sentences("It is 3.5 km away. Walk approx. 40 min. Then turn left."),
+                         ["It is 3.5 km away.", "Walk approx. 40 min.", "Then turn left."])
+        self.assertEqual(split_into_sentences("1. Pack a hat.\n2. Bring water."),
+                         ["1. Pack a hat.", "2. Bring water."])
+        self.assertEqual(split_into_sentences("See No. 5 on the map. No. I mean six."),
+                         ["See No. 5 on the map.", "No.", "I mean six."])
+
+    def test_single_letters_that_are_not_initials(self):
+        """Test that a one-letter unit after a number or a grade after a lower-case word ends the sentence."""
+        self.assertEqual(split_into_sentences("The tower is 843 m. It opened in 1889."),
+                         ["The tower is 843 m.", "It opened in 1889."])
+        self.assertEqual(split_into_sentences("I got an A. Then I celebrated."),
+                         ["I got an A.", "Then I celebrated."])
+        self.assertEqual(split_into_sentences("Turn at gate 5 B. Then walk on."),
+                         ["Turn at gate 5 B.", "Then walk on."])
+        self.assertEqual(split_into_sentences("A. Smith and George W. Bush met."),
+                         ["A. Smith and George W. Bush met."])
+
+        # Streaming waits for the whole next word before deciding
+        segmenter = SentenceSegmenter()
+        self.assertEqual(segmenter.push("I got an A. Th"), [])
+        self.assertEqual(segmenter.push("en"), [])
+        self.assertEqual(segmenter.push(" I left."), ["I got an A."])
+        self.assertEqual(segmenter.flush(), ["Then I left."])
+
+    def test_quotes_and_ellipses(self):
+        """Test that closing quotes stay with their sentence and ellipses before lower case do not split."""
+        self.assertEqual(split_into_sentences('She said "hi." Then left... and came back. Wow!'),
+                         ['She said "hi."', "Then left... and came back.", "Wow!"])
+
+    def test_push_emits_when_unambiguous(self):
+        """Test that streamed chunks yield each sentence as soon as the next character settles it."""
+        segmenter = SentenceSegmenter()
+        self.assertEqual(segmenter.push("The lab is 3"), [])
+        self.assertEqual(segmenter.push("."), [])
+        self.assertEqual(segmenter.push("5 km from Dr"), [])
+        self.assertEqual(segmenter.push(". Smith's office. "), [])
+        self.assertEqual(segmenter.push("Enjoy"), ["The lab is 3.5 km from Dr. Smith's office."])
+        self.assertEqual(segmenter.push(" it! See"), ["Enjoy it!"])
+        self.assertEqual(segmenter.flush(), ["See"])
+        self.assertEqual(segmenter.flush(), [])
+
+    def test_streaming_matches_batch(self):
+        """Test that any chunking gives the same sentences as splitting the whole text."""
+        text = "Hello! Dr. Who is 2.5 m. Tall, i.e. quite tall. Really? I got an A. Then J. Smith came.\nNext line here."
+        expected = split_into_sentences(text)
+        for size in (1, 2, 3, 7):
+            segmenter = SentenceSegmenter()
+            sentences = []
+            for i in range(0, len(text), size):
+                sentences += segmenter.push(text[i:i + size])
+            self.assertEqual(sentences + segmenter.flush(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
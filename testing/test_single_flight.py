@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.single_flight import SingleFlight, normalize_prompt
+from utils.metrics import metrics
+
+def run_concurrently(func, n):
+    results = [None] * n
+    def worker(i):
+        results[i] = func()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving while a key is in flight get the leader's result."""
+        flight = SingleFlight("test")
+        calls = []
+        def slow_answer():
+            calls.append(1)
+            time.sleep(0.2)
+            return "answer"
+        results = run_concurrently(lambda: flight.do("key", slow_answer), 5)
+        self.assertEqual(results, ["answer"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(metrics.counter("test.coalesced"), 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failing call raises in the leader and all waiters, then clears."""
+        flight = SingleFlight("test")
+        def failing():
+            time.sleep(0.1)
+            raise ValueError("search down")
+        def call():
+            try:
+                return flight.do("key", failing)
+            except ValueError as e:
+                return str(e)
+        self.assertEqual(run_concurrently(call, 3), ["search down"] * 3)
+        self.assertEqual(flight.do("key", lambda: "fresh"), "fresh")
+
+    def test_normalize_prompt(self):
+        """Test that case, punctuation and spacing do not change the key."""
+        self.assertEqual(normalize_prompt("What's the  weather in Sydney?"),
+                         normalize_prompt("what s the weather in sydney"))
+
+    @patch("agents.search_agent3.get_llm")
+    def test_search_agent_coalesces_identical_questions(self, mock_get_llm):
+        """Test that concurrent identical questions trigger one search."""
+        from agents.search_agent3 import SearchAgent3
+        agent = SearchAgent3()
+        agent.min_search_interval = 0
+        searches = []
+        def fake_search(query):
+            searches.append(query)
+            time.sleep(0.2)
+            return {"results": [{"content": "It is 21 degrees celsius today."}]}
+        agent._search_api_call = fake_search
+        results = run_concurrently(lambda: agent.get_response("What's the weather in Sydney?"), 4)
+        self.assertEqual(len(searches), 1)
+        self.assertEqual(results, ["It's about 21 celsius in Sydney right now."] * 4)
+        self.assertEqual(agent.get_response("what's the weather in sydney"), results[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import io
+import json
+import tempfile
+import wave
+import numpy as np
+
+# Add the parent directory to the Python path so we can import stt_function
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import stt_function
+
+class FakeRecognizer:
+    """Stands in for KaldiRecognizer and reports how many bytes it was fed."""
+
+    def __init__(self, model, sample_rate, grammar=None):
+        self.sample_rate = sample_rate
+        self.grammar = grammar
+        self.received = bytearray()
+
+    def AcceptWaveform(self, data):
+        self.received += bytes(stt_function._ffi.buffer(data)) if not isinstance(data, bytes) else data
+        return False
+
+    def Result(self):
+        return json.dumps({"text": ""})
+
+    def FinalResult(self):
+        samples = np.frombuffer(bytes(self.received), dtype=np.int16)
+        return json.dumps({"text": f"{self.sample_rate} {len(samples)} {int(samples.sum())}"})
+
+class TestSTTInputs(unittest.TestCase):
+    def setUp(self):
+        """Replace the Vosk model and recognizer with fakes."""
+        patches = [
+            patch.object(stt_function, "get_model", return_value=None),
+            patch.object(stt_function.vosk, "KaldiRecognizer", FakeRecognizer),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write_wav(self, name, frames, channels=1, rate=16000):
+        path = os.path.join(self.tmp.name, name)
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(channels)
+            wf.setsampwidth(2)
+            wf.setframerate(rate)
+            wf.writeframes(frames.astype(np.int16).tobytes())
+        return path
+
+    def test_transcribe_pcm_stream(self):
+        """Test that a raw PCM stream is fed to the recognizer in full."""
+        samples = np.arange(20000, dtype=np.int16) % 7
+        text, _ = stt_function.transcribe_pcm(io.BytesIO(samples.tobytes()))
+        self.assertEqual(text, f"16000 20000 {int(samples.sum())}")
+
+    def test_transcribe_array_float_and_int(self):
+        """Test that float arrays are scaled to int16 and int16 arrays pass through."""
+        text, _ = stt_function.transcribe_array(np.ones(100, dtype=np.int16) * 3)
+        self.assertEqual(text, "16000 100 300")
+        text, _ = stt_function.transcribe_array(np.full(10, 0.5, dtype=np.float32), sample_rate=8000)
+        self.assertEqual(text, f"8000 10 {int(0.5 * 32767) * 10}")
+
+    def test_transcribe_wav_mono_and_stereo(self):
+        """Test that WAV files are decoded at their own rate and stereo is mixed down."""
+        mono = self._write_wav("mono.wav", np.full(1000, 2), rate=8000)
+        self.assertEqual(stt_function.transcribe_wav(mono)[0], "8000 1000 2000")
+        stereo = self._write_wav("stereo.wav", np.tile([4, 2], 500), channels=2)
+        self.assertEqual(stt_function.transcribe_wav(stereo)[0], "16000 500 1500")
+
+    def test_batch_worker_reports_duration(self):
+        """Test that the batch worker returns text and the audio duration."""
+        path = self._write_wav("one_second.wav", np.zeros(16000))
+        result = stt_function._transcribe_file(path)
+        self.assertEqual(result["path"], path)
+        self.assertEqual(result["audio_seconds"], 1.0)
+        self.assertEqual(result["text"], "16000 16000 0")
+
+class TestGrammar(unittest.TestCase):
+    def test_create_recognizer_with_phrases(self):
+        """Test that a phrase list becomes a JSON grammar with an [unk] catch-all."""
+        with patch.object(stt_function, "get_model", return_value=None), \
+             patch.object(stt_function.vosk, "KaldiRecognizer", FakeRecognizer):
+            recognizer = stt_function.create_recognizer(16000, ["weather in canberra", "hello"])
+            self.assertEqual(json.loads(recognizer.grammar), ["weather in canberra", "hello", "[unk]"])
+            self.assertIsNone(stt_function.create_recognizer(16000).grammar)
+
+    def test_needs_open_vocabulary(self):
+        """Test that empty or partly unknown results trigger the open-vocabulary fallback."""
+        self.assertTrue(stt_function.needs_open_vocabulary(""))
+        self.assertTrue(stt_function.needs_open_vocabulary("what is the [unk] in canberra"))
+        self.assertFalse(stt_function.needs_open_vocabulary("what is the weather in canberra"))
+
+if __name__ == '__main__':
+    unittest.main()
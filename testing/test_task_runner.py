@@ -0,0 +1,108 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.task_runner import TaskRunner, CancelEvent, CallAbandoned
+from utils.metrics import metrics
+
+class TestTaskRunner(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.runner = TaskRunner(max_workers=2, name="test")
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_timer_fires_after_delay(self):
+        """Test that a scheduled task runs on the pool once its delay has passed."""
+        fired = threading.Event()
+        start = time.monotonic()
+        task = self.runner.schedule(0.1, fired.set)
+        self.assertTrue(fired.wait(2))
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+        self.assertTrue(task.fired)
+        self.assertFalse(task.cancel())
+
+    def test_cancelled_timer_never_runs(self):
+        """Test that cancelling before the delay, as a fast search does, suppresses the filler."""
+        spoken = []
+        task = self.runner.schedule(0.1, spoken.append, "Allow me to search the web for you")
+        self.assertTrue(task.cancel())
+        time.sleep(0.2)
+        self.assertEqual(spoken, [])
+        self.assertTrue(task.cancelled)
+        self.assertEqual(metrics.counter("test.timers_cancelled"), 1)
+
+    def test_timers_run_in_due_order(self):
+        """Test that timers scheduled out of order fire by due time."""
+        order = []
+        done = threading.Event()
+        self.runner.schedule(0.15, lambda: (order.append("late"), done.set()))
+        self.runner.schedule(0.05, order.append, "early")
+        self.assertTrue(done.wait(2))
+        self.assertEqual(order, ["early", "late"])
+
+    def test_no_thread_per_call(self):
+        """Test that many calls and timers reuse the fixed pool and a single timer thread."""
+        for i in range(50):
+            self.runner.submit(time.sleep, 0.001)
+            self.runner.schedule(0.01, lambda: None)
+        time.sleep(0.2)
+        self.assertLessEqual(metrics.counter("test.threads_started"), 3)
+        self.assertEqual(metrics.counter("test.timers_fired"), 50)
+
+class TestCancellableCalls(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.runner = TaskRunner(max_workers=1, name="agent", abandon_headroom=1)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.runner.shutdown()
+
+    def test_result_returns_without_polling_delay(self):
+        """Test that a finished call is seen straight away rather than at the next poll."""
+        durations = []
+        for _ in range(20):
+            start = time.perf_counter()
+            self.assertEqual(self.runner.call(CancelEvent(), lambda: "ok"), "ok")
+            durations.append(time.perf_counter() - start)
+        self.assertLess(sorted(durations)[10], 0.01)
+
+    def test_errors_propagate(self):
+        """Test that an exception from the call reaches the caller."""
+        with self.assertRaises(ValueError):
+            self.runner.call(CancelEvent(), int, "not a number")
+
+    def test_cancel_abandons_call(self):
+        """Test that setting the cancel event returns at once while the call keeps running."""
+        cancel_event = CancelEvent()
+        threading.Timer(0.05, cancel_event.set).start()
+        start = time.monotonic()
+        with self.assertRaises(CallAbandoned):
+            self.runner.call(cancel_event, self.release.wait, 5)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(metrics.counter("agent.abandoned"), 1)
+        # A turn that is already cancelled does not start new calls
+        ran = []
+        with self.assertRaises(CallAbandoned):
+            self.runner.call(cancel_event, ran.append, "too late")
+        self.assertEqual(ran, [])
+
+    def test_abandoned_call_does_not_block_the_next_one(self):
+        """Test that the next call runs on a free worker while an abandoned one is still stuck."""
+        cancel_event = CancelEvent()
+        threading.Timer(0.05, cancel_event.set).start()
+        with self.assertRaises(CallAbandoned):
+            self.runner.call(cancel_event, self.release.wait, 5)
+        start = time.monotonic()
+        self.assertEqual(self.runner.call(CancelEvent(), lambda: "next turn"), "next turn")
+        self.assertLess(time.monotonic() - start, 1)
+
+if __name__ == '__main__':
+    unittest.main()
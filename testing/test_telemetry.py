@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+# Add the parent directory to the Python path so we can import the utils and dev packages
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.telemetry import EmotionTelemetry
+from dev.emotion_server import app
+
+class _CollectingHandler(BaseHTTPRequestHandler):
+    batches = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.batches.append(json.loads(body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class TestEmotionTelemetry(unittest.TestCase):
+    def setUp(self):
+        """Start a local server that records posted batches."""
+        _CollectingHandler.batches = []
+        self.server = HTTPServer(("127.0.0.1", 0), _CollectingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.endpoint = f"http://127.0.0.1:{self.server.server_port}/emotion"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_events_are_batched(self):
+        """Test that emitted events arrive as list batches."""
+        telemetry = EmotionTelemetry(self.endpoint, batch_size=5, flush_interval=0.05)
+        for i in range(12):
+            telemetry.emit(f"sentence {i}", "happy")
+        telemetry.close()
+        received = [event for batch in _CollectingHandler.batches for event in batch]
+        self.assertEqual(len(received), 12)
+        self.assertTrue(all(isinstance(batch, list) for batch in _CollectingHandler.batches))
+        self.assertLessEqual(max(len(batch) for batch in _CollectingHandler.batches), 5)
+        self.assertEqual(telemetry.sent, 12)
+
+    def test_backpressure_drops_oldest(self):
+        """Test that a full queue drops the oldest events instead of blocking."""
+        with patch("utils.telemetry.atexit"):  # Nothing listens, so skip the flush at exit
+            telemetry = EmotionTelemetry("http://127.0.0.1:9/emotion", batch_size=1000,
+                                         flush_interval=60, max_pending=3)
+        for i in range(10):
+            telemetry.emit(f"sentence {i}", "sad")
+        self.assertEqual(telemetry.dropped, 7)
+        self.assertEqual([e["sentence"] for e in telemetry.pending],
+                         ["sentence 7", "sentence 8", "sentence 9"])
+
+    def test_exit_flushes_queued_events(self):
+        """Test that events still queued at interpreter exit are posted by the atexit hook."""
+        with patch("utils.telemetry.atexit") as mock_atexit:
+            telemetry = EmotionTelemetry(self.endpoint, batch_size=1000, flush_interval=60)
+            telemetry.emit("goodbye", "sad")
+            exit_hook = mock_atexit.register.call_args[0][0]
+            exit_hook()
+        self.assertEqual([batch[0]["sentence"] for batch in _CollectingHandler.batches], ["goodbye"])
+        mock_atexit.unregister.assert_called_once_with(exit_hook)
+
+class TestEmotionServer(unittest.TestCase):
+    def test_bad_body_is_rejected(self):
+        """Test that a body that is not an event or list of events gets a 400 rather than an error."""
+        client = app.test_client()
+        for body in ("not json", "[1, 2]", "null"):
+            response = client.post("/emotion", data=body, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+        response = client.post("/emotion", json=[{"sentence": "Hi!", "emotion": "happy"}])
+        self.assertEqual(response.get_json()["received"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
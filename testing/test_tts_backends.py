@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import time
+import requests
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add the parent directory to the Python path so we can import the agents package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.tts_backends import TTSBackend, SpeechStarted, PepperSayBackend, LocalTTSBackend, FailoverTTS
+from agents.tts_agent import TTSAgent
+from utils.tts_cache import PhraseAudioCache
+from utils.metrics import metrics
+
+class FakeBackend(TTSBackend):
+    def __init__(self, name, fail=False, error=None):
+        self.name = name
+        self.fail = fail
+        self.error = error or ConnectionError("network unreachable")
+        self.spoken = []
+
+    def say(self, text, emotion="neutral"):
+        if self.fail:
+            raise self.error
+        self.spoken.append(text)
+
+class TestTTSBackends(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_failover_skips_failed_backend_during_cooldown(self):
+        """Test that after one failure the remote backend is bypassed until the cooldown ends."""
+        remote, local = FakeBackend("remote", fail=True), FakeBackend("local")
+        tts = FailoverTTS([remote, local], cooldown=0.2)
+        self.assertEqual(tts.say("one"), "local")
+        remote.fail = False
+        self.assertEqual(tts.say("two"), "local")
+        self.assertEqual(metrics.counter("tts.remote.failures"), 1)
+        self.assertEqual(metrics.counter("tts.failovers"), 2)
+        time.sleep(0.25)
+        self.assertEqual(tts.say("three"), "remote")
+        self.assertEqual(local.spoken, ["one", "two"])
+        self.assertEqual(len(metrics.samples("tts.local")), 2)
+
+    def test_all_backends_failing_raises(self):
+        """Test that an error is raised when nothing could speak."""
+        with self.assertRaises(RuntimeError):
+            FailoverTTS([FakeBackend("a", fail=True), FakeBackend("b", fail=True)]).say("hello")
+
+    def test_started_speech_is_not_repeated_but_cools_down(self):
+        """Test that a backend failing mid-sentence is not retried elsewhere and is skipped afterwards."""
+        remote = FakeBackend("remote", fail=True, error=SpeechStarted("cut off"))
+        local = FakeBackend("local")
+        tts = FailoverTTS([remote, local], cooldown=30)
+        with self.assertRaises(SpeechStarted):
+            tts.say("hello")
+        self.assertEqual(local.spoken, [])
+        self.assertEqual(metrics.counter("tts.remote.interrupted"), 1)
+        self.assertEqual(metrics.counter("tts.remote.failures"), 0)
+        # The next sentence does not wait on the same backend again
+        self.assertEqual(tts.say("next"), "local")
+
+    def test_pepper_read_timeout_counts_as_started(self):
+        """Test that Pepper is treated as speaking once the request was delivered, but not before."""
+        backend = PepperSayBackend("127.0.0.1", 5000, connect_timeout=0.5, read_timeout=0.5)
+        with patch.object(backend.session, "get", side_effect=requests.exceptions.ReadTimeout("slow")):
+            with self.assertRaises(SpeechStarted):
+                backend.say("hello")
+        with patch.object(backend.session, "get", side_effect=requests.exceptions.ConnectTimeout("down")):
+            with self.assertRaises(requests.exceptions.ConnectTimeout):
+                backend.say("hello")
+
+    def test_local_engine_timeout_counts_as_started(self):
+        """Test that an engine killed by its timeout is treated as having spoken."""
+        with self.assertRaises(SpeechStarted):
+            LocalTTSBackend(command="sleep 5", text_on_stdin=True, timeout=0.2).say("hello")
+
+    def test_elevenlabs_stream_breaking_off_is_not_repeated(self):
+        """Test that a stream failing after its first chunk played is not spoken again by the fallback."""
+        local = FakeBackend("local")
+        agent = TTSAgent(audio_cache=PhraseAudioCache(directory=None), streaming=True, output_format="pcm_22050",
+                         player=lambda chunks, output_format: list(chunks), fallbacks=[local])
+        def broken_stream(**kwargs):
+            yield b"\x00" * 3200
+            raise ConnectionError("connection reset mid-stream")
+        agent.client = SimpleNamespace(text_to_speech=SimpleNamespace(stream=broken_stream))
+        agent.speak("Hello there")
+        self.assertEqual(local.spoken, [])
+        self.assertEqual(metrics.counter("tts.elevenlabs.interrupted"), 1)
+
+    def test_backend_must_implement_say(self):
+        """Test that the TTSBackend base class cannot be used on its own."""
+        with self.assertRaises(TypeError):
+            TTSBackend()
+
+    def test_unreachable_pepper_fails_fast(self):
+        """Test that an unreachable /say endpoint fails over within the connect timeout."""
+        local = FakeBackend("local")
+        tts = FailoverTTS([PepperSayBackend("127.0.0.1", 9, connect_timeout=0.5), local])
+        start = time.time()
+        self.assertEqual(tts.say("hello"), "local")
+        self.assertLess(time.time() - start, 2)
+
+    def test_local_command_backend(self):
+        """Test that the local engine runs its command and reports a missing engine."""
+        LocalTTSBackend(command="true").say("hello")
+        LocalTTSBackend(command="cat", text_on_stdin=True).say("hello")
+        with self.assertRaises(RuntimeError):
+            LocalTTSBackend(command="no-such-tts-engine").say("hello")
+
+    def test_tts_agent_falls_back_when_elevenlabs_fails(self):
+        """Test that TTSAgent.speak uses its fallback backend when ElevenLabs raises."""
+        local = FakeBackend("local")
+        agent = TTSAgent(audio_cache=PhraseAudioCache(directory=None), fallbacks=[local])
+        def unreachable(**kwargs):
+            raise ConnectionError("no route to host")
+        agent.client = SimpleNamespace(text_to_speech=SimpleNamespace(stream=unreachable, convert=unreachable))
+        agent.speak("Hello there")
+        self.assertEqual(local.spoken, ["Hello there"])
+        self.assertEqual(metrics.counter("tts.elevenlabs.failures"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
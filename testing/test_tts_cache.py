@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+from types import SimpleNamespace
+
+# Add the parent directory to the Python path so we can import the agents package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.tts_cache import PhraseAudioCache, phrase_key
+from utils.metrics import metrics
+from agents.tts_agent import TTSAgent
+
+class FakeTextToSpeech:
+    """Stands in for the ElevenLabs client and counts synthesis calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def convert(self, voice_id, text, **kwargs):
+        self.calls += 1
+        yield b"ID3"
+        yield text.encode("utf-8")
+
+class TestPhraseAudioCache(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_agent(self, cache):
+        agent = TTSAgent(audio_cache=cache, streaming=False)
+        agent.client = SimpleNamespace(text_to_speech=FakeTextToSpeech())
+        return agent
+
+    def test_key_changes_with_voice_settings(self):
+        """Test that text alone does not decide the key."""
+        base = phrase_key("Hello", voice_id="a", settings={"stability": 0.5})
+        self.assertEqual(base, phrase_key("Hello", voice_id="a", settings={"stability": 0.5}))
+        self.assertNotEqual(base, phrase_key("Hello", voice_id="a", settings={"stability": 0.3}))
+        self.assertNotEqual(base, phrase_key("Hello", voice_id="b", settings={"stability": 0.5}))
+
+    def test_memory_lru_falls_back_to_disk(self):
+        """Test that entries evicted from memory are still served from disk."""
+        cache = PhraseAudioCache(self.tmpdir.name, max_memory_items=1)
+        cache.put("a", b"audio a")
+        cache.put("b", b"audio b")
+        self.assertEqual(list(cache.memory), ["b"])
+        self.assertEqual(cache.get("a"), b"audio a")
+        self.assertEqual(metrics.counter("tts_cache.disk_hits"), 1)
+        self.assertEqual(PhraseAudioCache(self.tmpdir.name).get("b"), b"audio b")
+        self.assertIsNone(cache.get("c"))
+
+    def test_disk_store_evicts_least_recently_used(self):
+        """Test that the directory is kept under max_disk_bytes, oldest reads first."""
+        cache = PhraseAudioCache(self.tmpdir.name, max_memory_items=0, max_disk_bytes=20)
+        for i, key in enumerate(["a", "b"]):
+            cache.put(key, b"0123456789")
+            os.utime(cache._path(key), (1000 + i, 1000 + i))
+        self.assertEqual(cache.get("a"), b"0123456789")  # Now newer than "b"
+        cache.put("c", b"0123456789")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(metrics.counter("tts_cache.evictions"), 1)
+
+    def test_failed_write_leaves_no_temp_file(self):
+        """Test that a write error does not leak the temporary file."""
+        cache = PhraseAudioCache(self.tmpdir.name)
+        with patch("utils.tts_cache.os.replace", side_effect=OSError("disk full")):
+            cache.put("a", b"audio a")
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+        self.assertEqual(cache.get("a"), b"audio a")  # Still served from memory
+
+    @patch("agents.tts_agent.play")
+    def test_repeated_phrase_is_synthesized_once(self, mock_play):
+        """Test that speaking the same phrase twice calls the API once."""
+        agent = self.make_agent(PhraseAudioCache(self.tmpdir.name))
+        agent.speak("Allow me to search the web for you")
+        agent.speak("Allow me to search the web for you")
+        self.assertEqual(agent.client.text_to_speech.calls, 1)
+        mock_play.assert_called_with(b"ID3Allow me to search the web for you")
+        agent.speak("Allow me to search the web for you", emotion="happy")
+        self.assertEqual(agent.client.text_to_speech.calls, 2)
+
+    def test_prerender_skips_cached_phrases(self):
+        """Test that stock phrases are rendered once and reused across restarts."""
+        agent = self.make_agent(PhraseAudioCache(self.tmpdir.name))
+        self.assertEqual(agent.prerender(["One.", "Two."]), 2)
+        restarted = self.make_agent(PhraseAudioCache(self.tmpdir.name))
+        self.assertEqual(restarted.prerender(["One.", "Two.", "Three."]), 1)
+        self.assertEqual(restarted.client.text_to_speech.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.tts_sanitizer import sanitize_for_tts, expand_symbols, is_speakable, speakable_sentences
+
+class TestTTSSanitizer(unittest.TestCase):
+    def test_emoji_removed_within_sentences(self):
+        """Test that emoji are stripped from mixed sentences, not just emoji-only ones."""
+        self.assertEqual(sanitize_for_tts("Hello 👋🏽 there! 😊 Nice to meet you 🎉."),
+                         "Hello there! Nice to meet you.")
+        self.assertFalse(is_speakable("😊🤖 ☀️"))
+        self.assertTrue(is_speakable("Hi 😊"))
+
+    def test_markdown_and_urls(self):
+        """Test that markdown markers and URLs go while link labels stay."""
+        text = "### Tips\n- **Bring** a `hat`\n> See [the BoM](https://www.bom.gov.au) or www.bom.gov.au today."
+        self.assertEqual(sanitize_for_tts(text), "Tips\nBring a hat\nSee the BoM or today.")
+
+    def test_multiplication_is_read_out(self):
+        """Test that an asterisk between operands becomes "times" while emphasis is still dropped."""
+        self.assertEqual(sanitize_for_tts("5 * 3 is 15."), "5 times 3 is 15.")
+        self.assertEqual(sanitize_for_tts("(2+3)*4"), "(2+3) times 4")
+        self.assertEqual(sanitize_for_tts("It is **2** degrees * cooler."), "It is 2 degrees cooler.")
+        self.assertEqual(sanitize_for_tts("* 5 apples"), "5 apples")
+
+    def test_speakable_sentences(self):
+        """Test that responses are sanitized, split and stripped of emoji-only sentences."""
+        self.assertEqual(speakable_sentences("Hello 👋! 😊🎉. It is **25°C** today."),
+                         ["Hello!", "It is 25 degrees Celsius today."])
+
+    def test_symbols_expanded_once(self):
+        """Test the single-pass symbol expansion that SummaryAgent uses."""
+        self.assertEqual(expand_symbols("25°C, 10% rain, 5 km & 3 kg"),
+                         "25 degrees Celsius, 10 percent rain, 5 kilometres  and  3 kilograms")
+        self.assertEqual(expand_symbols("kmart"), "kmart")
+        self.assertEqual(sanitize_for_tts("5 km & 3 kg"), "5 kilometres and 3 kilograms")
+
+if __name__ == '__main__':
+    unittest.main()
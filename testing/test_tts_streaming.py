@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add the parent directory to the Python path so we can import the agents package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.tts_agent import TTSAgent
+from utils.tts_cache import PhraseAudioCache
+from utils.metrics import metrics
+
+class FakeTTSStream:
+    """
+    Local stand-in for the ElevenLabs streaming endpoint.
+
+    Produces 16-bit PCM silence for `text`, roughly one chunk per word, after
+    a first-byte delay and with a delay between chunks, like a real stream.
+    """
+
+    def __init__(self, first_chunk_delay=0.05, chunk_delay=0.05, chunk_bytes=3201):
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_bytes = chunk_bytes
+        self.calls = []
+
+    def stream(self, voice_id, text, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.first_chunk_delay)
+        for i, _ in enumerate(text.split()):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield b"\x00" * self.chunk_bytes
+
+class RecordingPlayer:
+    """Consumes chunks like a sound card would and notes when each one arrived."""
+
+    def __init__(self):
+        self.arrivals = []
+        self.formats = []
+
+    def __call__(self, chunks, output_format):
+        self.formats.append(output_format)
+        start = time.time()
+        for chunk in chunks:
+            self.arrivals.append((time.time() - start, len(chunk)))
+
+class TestTTSStreaming(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.player = RecordingPlayer()
+        self.fake = FakeTTSStream()
+        self.agent = TTSAgent(audio_cache=PhraseAudioCache(directory=None), streaming=True,
+                              output_format="pcm_22050", player=self.player)
+        self.agent.client = SimpleNamespace(text_to_speech=self.fake)
+
+    def test_playback_starts_before_synthesis_finishes(self):
+        """Test that time-to-first-audio is a fraction of the whole sentence's synthesis time."""
+        sentence = "This is a fairly long sentence that would otherwise be synthesized in full before playing."
+        total_ms = self.agent.speak(sentence)
+        ttfa = self.agent.last_time_to_first_audio
+        self.assertLess(ttfa, total_ms / 4)
+        self.assertEqual(metrics.samples("tts.time_to_first_audio"), [ttfa])
+        self.assertEqual(len(self.player.arrivals), len(sentence.split()))
+        self.assertEqual(self.player.formats, ["pcm_22050"])
+        self.assertEqual(self.fake.calls[0]["output_format"], "pcm_22050")
+
+    def test_streamed_phrase_is_cached(self):
+        """Test that a phrase streamed once is replayed from the cache without the API."""
+        self.agent.speak("Allow me to search the web for you")
+        self.agent.speak("Allow me to search the web for you")
+        self.assertEqual(len(self.fake.calls), 1)
+        self.assertEqual(self.player.arrivals[-1][1], 8 * self.fake.chunk_bytes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the parent directory to the Python path so we can import the utils package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.warmup import CacheWarmer, QuestionLog, load_frequent_questions, FREQUENT_QUESTIONS_PATH, QUESTION_LOG_PATH
+from utils.metrics import metrics
+
+class TestWarmup(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log = QuestionLog(os.path.join(self.tmpdir.name, "logs", "questions.jsonl"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_shipped_config_has_static_answers(self):
+        """Test that the repo config provides the location and VC answers."""
+        static_answers, questions = load_frequent_questions(FREQUENT_QUESTIONS_PATH)
+        self.assertIn("Canberra", static_answers["where am i"])
+        self.assertIn("Vice Chancellor", static_answers["who is the vc of uc"])
+        self.assertTrue(questions)
+
+    def test_missing_config_gives_nothing(self):
+        """Test that a missing config file leaves no static answers or questions."""
+        self.assertEqual(load_frequent_questions(os.path.join(self.tmpdir.name, "none.json")), ({}, []))
+
+    def test_question_log_top_n(self):
+        """Test that the log ranks questions by how often they were asked."""
+        for question in ["What's the weather?", "what's the weather", "hello", "Hello!", "what's the weather?", "bye"]:
+            self.log.record(question)
+        self.assertEqual(self.log.top(2), ["what s the weather", "hello"])
+
+    def test_run_warms_configured_and_logged_questions(self):
+        """Test that a run answers config and top logged questions once each and prerenders the answers."""
+        self.log.record("what time is it")
+        self.log.record("Hello")
+        asked, rendered = [], []
+        def answer(question):
+            asked.append(question)
+            return None if question == "what time is it" else f"answer to {question}"
+        warmer = CacheWarmer(answer, questions=["hello", "who are you"], question_log=self.log,
+                             prerender=[rendered.append])
+        self.assertEqual(warmer.run_once(), 2)
+        self.assertEqual(asked, ["hello", "who are you", "what time is it"])
+        self.assertEqual(rendered, ["answer to hello", "answer to who are you"])
+        self.assertEqual(metrics.counter("warmup.questions"), 2)
+        self.assertEqual(metrics.counter("warmup.failures"), 1)
+
+    def test_question_log_is_trimmed(self):
+        """Test that the log is cut to its newest half once it passes max_bytes and the counts follow."""
+        log = QuestionLog(self.log.path, max_bytes=400)
+        for _ in range(5):
+            log.record("hello")
+        self.assertEqual(log.top(1), ["hello"])
+        for _ in range(5):
+            log.record("bye")
+        self.assertLessEqual(os.path.getsize(log.path), 400)
+        self.assertEqual(metrics.counter("warmup.question_log_trims"), 1)
+        self.assertEqual(log.top(2), ["bye"])  # The older questions went with the trim
+        self.assertEqual(QuestionLog(log.path).top(2), log.top(2))
+
+    def test_question_log_path_is_relative_to_repo(self):
+        """Test that the default log path does not depend on the working directory."""
+        self.assertTrue(os.path.isabs(QUESTION_LOG_PATH))
+
+    def test_skips_questions_that_expire_before_next_run(self):
+        """Test that short-lived and static answers are not warmed."""
+        ttls = {"what time is it": 60, "hello": 3600, "where am i": None}
+        asked = []
+        warmer = CacheWarmer(lambda q: asked.append(q) or "ok", questions=list(ttls), interval=3600,
+                             ttl=ttls.get)
+        warmer.run_once()
+        self.assertEqual(asked, ["hello"])
+        self.assertEqual(metrics.counter("warmup.skipped"), 2)
+
+    def test_start_runs_immediately(self):
+        """Test that start() warms once in the background straight away."""
+        asked = []
+        warmer = CacheWarmer(lambda q: asked.append(q) or "ok", questions=["hello"], interval=0)
+        warmer.start().join(timeout=2)
+        self.assertEqual(asked, ["hello"])
+
+if __name__ == '__main__':
+    unittest.main()
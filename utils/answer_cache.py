@@ -0,0 +1,112 @@
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import config
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight
+
+# Query classes with a configured (soft TTL, hard TTL) under cache.<class>. Past
+# the soft TTL a cached answer is still served but refreshed in the background;
+# past the hard TTL it is refetched before answering.
+QUERY_CLASSES = ("time", "weather", "population", "default")
+
+def configured_policy(query_class):
+    """Return the current (soft TTL, hard TTL) for a query class from the config."""
+    if query_class not in QUERY_CLASSES:
+        query_class = "default"
+    return config.get(f"cache.{query_class}.soft_ttl"), config.get(f"cache.{query_class}.hard_ttl")
+
+class AnswerCache:
+    """
+    Stale-while-revalidate cache for agent answers.
+
+    Each entry is stored with its query class, whose policy gives a soft and a
+    hard TTL. Fresh entries are returned directly; entries past the soft TTL
+    are returned immediately while a background worker recomputes them; entries
+    past the hard TTL (or missing) are computed synchronously. Computations for
+    the same key, foreground or background, are coalesced. A compute function
+    returning None (e.g. the search service is down) leaves the cache as it was.
+    TTLs are read from the config on each lookup, so retuning them applies to
+    entries already cached; policies passed in override the config.
+    """
+
+    def __init__(self, policies=None, max_entries=500, refresh_workers=2, name="answer_cache", clock=time.time):
+        self.policies = dict(policies or {})
+        self.max_entries = max_entries
+        self.name = name
+        self.clock = clock
+        self.entries = collections.OrderedDict()  # key -> (stored_at, query_class, value)
+        self.lock = threading.Lock()
+        self.in_flight = SingleFlight(name)
+        self.refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix=f"{name}-refresh")
+        self._refreshing = set()
+
+    def policy(self, query_class):
+        if query_class not in self.policies and query_class not in QUERY_CLASSES:
+            query_class = "default"
+        if query_class in self.policies:
+            return self.policies[query_class]
+        return configured_policy(query_class)
+
+    def lookup(self, key):
+        """Return (value, state) where state is "fresh", "stale" or "miss"."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None, "miss"
+            stored_at, query_class, value = entry
+            self.entries.move_to_end(key)
+        soft_ttl, hard_ttl = self.policy(query_class)
+        age = self.clock() - stored_at
+        if age < soft_ttl:
+            return value, "fresh"
+        if age < hard_ttl:
+            return value, "stale"
+        return None, "miss"
+
+    def put(self, key, query_class, value):
+        with self.lock:
+            self.entries[key] = (self.clock(), query_class, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get(self, key, query_class, compute, *args, **kwargs):
+        """Return the answer for key, computing it with compute(*args, **kwargs) when needed."""
+        value, state = self.lookup(key)
+        if state == "fresh":
+            metrics.increment(f"{self.name}.hits")
+            return value
+        if state == "stale":
+            metrics.increment(f"{self.name}.stale_hits")
+            self._schedule_refresh(key, query_class, compute, args, kwargs)
+            return value
+        metrics.increment(f"{self.name}.misses")
+        return self.in_flight.do(key, self._compute_and_store, key, query_class, compute, args, kwargs)
+
+    def _compute_and_store(self, key, query_class, compute, args, kwargs):
+        value = compute(*args, **kwargs)
+        if value is not None:
+            self.put(key, query_class, value)
+        return value
+
+    def _schedule_refresh(self, key, query_class, compute, args, kwargs):
+        with self.lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self.refresher.submit(self._refresh, key, query_class, compute, args, kwargs)
+
+    def _refresh(self, key, query_class, compute, args, kwargs):
+        try:
+            if self.in_flight.do(key, self._compute_and_store, key, query_class, compute, args, kwargs) is None:
+                metrics.increment(f"{self.name}.refresh_failures")
+            else:
+                metrics.increment(f"{self.name}.refreshes")
+        except Exception as e:
+            print(f"Background refresh failed for '{key}': {str(e)}")
+            metrics.increment(f"{self.name}.refresh_failures")
+        finally:
+            with self.lock:
+                self._refreshing.discard(key)
@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+
+class AudioRingBuffer:
+    """
+    Preallocated ring buffer of int16 samples for one producer and one consumer.
+
+    The producer (a sounddevice callback) copies each block in with write(); the
+    consumer gets memoryviews of the unread region with read_views() and hands
+    them to the recognizer without further copies, then calls release(). Memory
+    use is fixed at `capacity` samples. If the consumer falls so far behind that
+    unread samples are overwritten, they are counted in `overrun_samples`.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.written = 0  # Total samples ever written
+        self.released = 0  # Total samples the consumer has finished with
+        self.overrun_samples = 0
+        self._read_end = 0  # End of the region handed out by the last read_views()
+        self.device_overflows = 0  # Overflows reported by the audio device itself
+        self._condition = threading.Condition()
+
+    def write(self, samples):
+        """Copy a block of samples into the ring."""
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        if len(samples) > self.capacity:
+            samples = samples[-self.capacity:]
+        n = len(samples)
+
+        with self._condition:
+            start = self.written % self.capacity
+            first = min(n, self.capacity - start)
+            self.buffer[start:start + first] = samples[:first]
+            self.buffer[:n - first] = samples[first:]
+            self.written += n
+
+            unread = self.written - self.released
+            if unread > self.capacity:
+                self.overrun_samples += unread - self.capacity
+                self.released = self.written - self.capacity
+            self._condition.notify()
+
+    def read_views(self, timeout=None):
+        """
+        Return memoryviews over the unread samples, waiting up to timeout for data.
+
+        Returns:
+            tuple: (views, n_samples) where views is a list of one or two byte
+            memoryviews (two when the region wraps around the end of the ring)
+        """
+        with self._condition:
+            if self.written == self.released and timeout != 0:
+                self._condition.wait(timeout)
+            start = self.released
+            end = self._read_end = self.written
+
+        n = end - start
+        if n == 0:
+            return [], 0
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        views = [memoryview(self.buffer[offset:offset + first]).cast('B')]
+        if first < n:
+            views.append(memoryview(self.buffer[:n - first]).cast('B'))
+        return views, n
+
+    def release(self):
+        """Mark the samples returned by the last read_views() as consumed."""
+        with self._condition:
+            self.released = max(self.released, self._read_end)
+
+    def recent_views(self, n_samples):
+        """Return memoryviews over the last n_samples written (at most the ring capacity)."""
+        with self._condition:
+            end = self.written
+        n = min(n_samples, end, self.capacity)
+        if n == 0:
+            return []
+        start = (end - n) % self.capacity
+        first = min(n, self.capacity - start)
+        views = [memoryview(self.buffer[start:start + first]).cast('B')]
+        if first < n:
+            views.append(memoryview(self.buffer[:n - first]).cast('B'))
+        return views
+
+    def unread(self):
+        """Number of samples written but not yet released."""
+        with self._condition:
+            return self.written - self.released
@@ -0,0 +1,88 @@
+import collections
+import threading
+import time
+import numpy as np
+from utils.metrics import metrics
+
+# Levels are reported in dBFS relative to int16 full scale
+FULL_SCALE = 32768.0
+SILENCE_DBFS = -60.0
+CLIP_LEVEL = 32767
+
+def _dbfs(value):
+    return 20 * np.log10(max(value, 1.0) / FULL_SCALE)
+
+class CaptureMonitor:
+    """
+    Capture-path metrics for one microphone stream.
+
+    on_block() is called from the audio callback for every block and computes
+    RMS and peak levels with vectorised NumPy, counts device overflows, clipped
+    and silent blocks, and tracks how far the device's real sample rate drifts
+    from the nominal one. on_consumed() is called once the recognizer has taken
+    audio up to a sample position, and records how long the oldest of those
+    blocks waited between capture and recognition. Everything is published to
+    the shared pipeline metrics under the given prefix.
+    """
+
+    def __init__(self, sample_rate, prefix="stt"):
+        self.sample_rate = sample_rate
+        self.prefix = prefix
+        self.samples_received = 0
+        self._first_block_time = None
+        self._first_block_samples = 0
+        self._pending = collections.deque()  # (end sample position, capture time)
+        self._lock = threading.Lock()
+
+    def on_block(self, block, status=None):
+        """Record levels, overflow and timing for one captured block of int16 samples."""
+        now = time.monotonic()
+        p = self.prefix
+        if status is not None and status.input_overflow:
+            metrics.increment(f"{p}.device_overflows")
+
+        samples = np.asarray(block).reshape(-1).astype(np.float32)
+        if samples.size:
+            magnitude = np.abs(samples)
+            peak = float(magnitude.max())
+            rms = float(np.sqrt(np.mean(samples * samples)))
+            rms_dbfs = _dbfs(rms)
+            metrics.set_gauge(f"{p}.rms_dbfs", round(rms_dbfs, 1))
+            metrics.set_gauge(f"{p}.peak_dbfs", round(_dbfs(peak), 1))
+            if peak >= CLIP_LEVEL:
+                metrics.increment(f"{p}.clipped_blocks")
+            if rms_dbfs < SILENCE_DBFS:
+                metrics.increment(f"{p}.silent_blocks")
+        metrics.increment(f"{p}.blocks")
+
+        with self._lock:
+            if self._first_block_time is None:
+                # Measure drift from the end of the first block, so its fill time is excluded
+                self._first_block_time = now
+                self._first_block_samples = samples.size
+            self.samples_received += samples.size
+            self._pending.append((self.samples_received, now))
+            elapsed = now - self._first_block_time
+            measured = self.samples_received - self._first_block_samples
+
+        if elapsed >= 1.0:
+            actual_rate = measured / elapsed
+            drift_ppm = (actual_rate - self.sample_rate) / self.sample_rate * 1e6
+            metrics.set_gauge(f"{p}.sample_rate_drift_ppm", round(drift_ppm, 1))
+
+    def on_consumed(self, sample_position):
+        """Record capture-to-recognizer latency for blocks consumed up to sample_position."""
+        now = time.monotonic()
+        oldest = None
+        with self._lock:
+            while self._pending and self._pending[0][0] <= sample_position:
+                _, captured_at = self._pending.popleft()
+                if oldest is None:
+                    oldest = captured_at
+        if oldest is not None:
+            metrics.record(f"{self.prefix}.capture_to_recognizer", (now - oldest) * 1000)
+
+    def on_overrun(self, n_samples):
+        """Count samples overwritten in the capture buffer before they were decoded."""
+        if n_samples:
+            metrics.increment(f"{self.prefix}.overrun_samples", n_samples)
@@ -0,0 +1,268 @@
+import os
+import threading
+import yaml
+from dotenv import load_dotenv
+from utils.metrics import metrics
+
+# Environment overrides include .env, which must be loaded before the config is
+load_dotenv()
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
+
+# Files are merged in order, later ones winning; PEPPER_CONFIG replaces the list (os.pathsep-separated)
+CONFIG_PATHS = os.getenv("PEPPER_CONFIG", os.pathsep.join([
+    os.path.join(CONFIG_DIR, "searxng_config.yaml"),
+    os.path.join(CONFIG_DIR, "pepper_config.yaml"),
+])).split(os.pathsep)
+CONFIG_WATCH_INTERVAL = 2.0  # seconds between checks for edited config files
+
+class ConfigError(ValueError):
+    """A configuration value is missing its file, has the wrong type or is out of range."""
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on"):
+        return True
+    if text in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+class Setting:
+    """
+    One typed configuration value.
+
+    key is its dotted path in the YAML files ("pepper.ip"), env the
+    environment variable that overrides it. Reloadable settings take effect
+    on a hot reload; the rest are read once at startup (endpoints, models,
+    pool sizes fixed at construction) and need a restart.
+    """
+
+    def __init__(self, key, type, default, env=None, reloadable=False, minimum=None):
+        self.key = key
+        self.type = type
+        self.default = default
+        self.env = env
+        self.reloadable = reloadable
+        self.minimum = minimum
+
+    def coerce(self, value):
+        try:
+            value = _parse_bool(value) if self.type is bool else self.type(value)
+        except (TypeError, ValueError) as e:
+            raise ConfigError(f"{self.key}: expected {self.type.__name__}, got {value!r}") from e
+        if self.minimum is not None and value < self.minimum:
+            raise ConfigError(f"{self.key}: must be at least {self.minimum}, got {value!r}")
+        return value
+
+SETTINGS = [
+    # Endpoints
+    Setting("pepper.ip", str, "10.0.0.244", env="PEPPER_IP"),
+    Setting("pepper.port", int, 5000, env="PEPPER_PORT", minimum=1),
+    Setting("searxng.base_url", str, "http://192.168.194.33:8060", env="SEARXNG_URL"),
+    Setting("searxng.timeout", float, 10.0, env="SEARXNG_TIMEOUT", reloadable=True, minimum=0.1),
+    # Models
+    Setting("llm.remote_model", str, "gpt-4o", env="REMOTE_MODEL"),
+    Setting("llm.temperature.pepper", float, 0.7, minimum=0),
+    Setting("llm.temperature.search", float, 0.3, minimum=0),
+    Setting("llm.temperature.summary", float, 0.2, minimum=0),
+    Setting("llm.temperature.emotion", float, 0.7, minimum=0),
+    # Local model backend; tasks is a comma-separated list of agents to run locally
+    Setting("llm.local.url", str, "http://localhost:8080/v1", env="LOCAL_LLM_URL"),
+    Setting("llm.local.model", str, "local", env="LOCAL_LLM_MODEL"),
+    Setting("llm.local.tasks", str, "", env="LOCAL_LLM_TASKS"),
+    Setting("llm.local.gguf_path", str, "", env="LOCAL_GGUF_PATH"),
+    # Concurrency and rate limits
+    Setting("orchestrator.agent_workers", int, 4, env="AGENT_WORKERS", minimum=1),
+    Setting("orchestrator.abandoned_calls", int, 4, env="AGENT_ABANDONED_CALLS", minimum=0),
+    Setting("llm.max_concurrency", int, 4, env="LLM_MAX_CONCURRENCY", reloadable=True, minimum=1),
+    Setting("llm.tokens_per_minute", int, 0, env="LLM_TOKENS_PER_MINUTE", reloadable=True, minimum=0),
+    Setting("llm.max_retries", int, 3, env="LLM_MAX_RETRIES", reloadable=True, minimum=0),
+    # Multi-session server
+    Setting("session.max_concurrent_turns", int, 1, env="SESSION_MAX_CONCURRENT_TURNS", reloadable=True, minimum=1),
+    Setting("session.idle_timeout", float, 1800, env="SESSION_IDLE_TIMEOUT", reloadable=True, minimum=0),
+    # PepperAgent reply cache
+    Setting("pepper_agent.cache_ttl", float, 3600, env="PEPPER_CACHE_TTL", reloadable=True, minimum=0),
+    Setting("pepper_agent.cache_max_entries", int, 500, env="PEPPER_CACHE_MAX_ENTRIES", reloadable=True, minimum=1),
+    # Cache warm-up; interval 0 only warms at startup
+    Setting("warmup.interval", float, 3600, env="WARMUP_INTERVAL", reloadable=True, minimum=0),
+    Setting("warmup.top_n", int, 20, env="WARMUP_TOP_N", reloadable=True, minimum=0),
+    # Question log the top-N come from, relative to the repo unless absolute; trimmed to the newest half past max_bytes
+    Setting("warmup.question_log", str, "logs/questions.jsonl", env="QUESTION_LOG_PATH"),
+    Setting("warmup.question_log_max_bytes", int, 1024 * 1024, env="QUESTION_LOG_MAX_BYTES", reloadable=True, minimum=0),
+    # Emotion and voice activity thresholds
+    Setting("emotion.confidence_threshold", float, 0.6, env="EMOTION_CONFIDENCE_THRESHOLD", reloadable=True, minimum=0),
+    Setting("stt.voice_energy_threshold", float, 600, env="VOICE_ENERGY_THRESHOLD", reloadable=True, minimum=0),
+    # Answer cache (soft, hard) TTLs in seconds per query class
+    Setting("cache.time.soft_ttl", float, 20, reloadable=True, minimum=0),
+    Setting("cache.time.hard_ttl", float, 60, reloadable=True, minimum=0),
+    Setting("cache.weather.soft_ttl", float, 600, reloadable=True, minimum=0),
+    Setting("cache.weather.hard_ttl", float, 3 * 3600, reloadable=True, minimum=0),
+    Setting("cache.population.soft_ttl", float, 7 * 86400, reloadable=True, minimum=0),
+    Setting("cache.population.hard_ttl", float, 30 * 86400, reloadable=True, minimum=0),
+    Setting("cache.default.soft_ttl", float, 3600, reloadable=True, minimum=0),
+    Setting("cache.default.hard_ttl", float, 24 * 3600, reloadable=True, minimum=0),
+    # Latency-masking fillers, in seconds
+    Setting("filler.long_threshold", float, 2.5, env="FILLER_LONG_THRESHOLD", reloadable=True, minimum=0),
+    Setting("filler.early_delay", float, 0.6, env="FILLER_EARLY_DELAY", reloadable=True, minimum=0),
+    Setting("filler.min_delay", float, 1.0, env="FILLER_MIN_DELAY", reloadable=True, minimum=0),
+    Setting("filler.max_delay", float, 3.0, env="FILLER_MAX_DELAY", reloadable=True, minimum=0),
+    Setting("filler.min_gap", float, 10, env="FILLER_MIN_GAP", reloadable=True, minimum=0),
+    # TTS timeouts, in seconds
+    Setting("tts.connect_timeout", float, 1.0, env="TTS_CONNECT_TIMEOUT", reloadable=True, minimum=0.1),
+    Setting("tts.read_timeout", float, 30, env="TTS_READ_TIMEOUT", reloadable=True, minimum=0.1),
+    Setting("tts.failover_cooldown", float, 30, env="TTS_FAILOVER_COOLDOWN", reloadable=True, minimum=0),
+    # TTS engines and phrase cache
+    Setting("tts.output_format", str, "mp3_44100_128", env="TTS_OUTPUT_FORMAT"),
+    Setting("tts.streaming", bool, True, env="TTS_STREAMING"),
+    Setting("tts.streaming_latency", int, 3, env="TTS_STREAMING_LATENCY", minimum=0),
+    Setting("tts.elevenlabs_timeout", float, 3.0, env="ELEVENLABS_TIMEOUT", minimum=0.1),
+    Setting("tts.local_command", str, "espeak-ng", env="LOCAL_TTS_COMMAND"),
+    Setting("tts.local_text_on_stdin", bool, False, env="LOCAL_TTS_TEXT_ON_STDIN"),
+    Setting("tts.cache.dir", str, "~/.cache/pepper_tts", env="TTS_CACHE_DIR"),
+    Setting("tts.cache.memory_items", int, 128, env="TTS_CACHE_MEMORY_ITEMS", minimum=0),
+    Setting("tts.cache.max_bytes", int, 256 * 1024 * 1024, env="TTS_CACHE_MAX_BYTES", minimum=0),
+]
+
+def _lookup(data, key):
+    """Return the value at a dotted key in nested dicts, or raise KeyError."""
+    for part in key.split("."):
+        if not isinstance(data, dict):
+            raise KeyError(key)
+        data = data[part]
+    return data
+
+def _validate(values):
+    """Check rules that span several settings, raising ConfigError."""
+    for key, soft_ttl in values.items():
+        if not key.endswith(".soft_ttl"):
+            continue
+        hard_key = key[:-len("soft_ttl")] + "hard_ttl"
+        if hard_key in values and soft_ttl > values[hard_key]:
+            raise ConfigError(f"{key}: must not exceed {hard_key} ({values[hard_key]!r}), got {soft_ttl!r}")
+
+class Config:
+    """
+    Typed settings loaded from YAML files with environment overrides.
+
+    Values come from the setting's default, then each file in order, then its
+    environment variable. get() is a dictionary lookup, so callers read tuning
+    values at the point of use and pick up reloads without holding on to
+    stale copies. reload() re-reads the files: reloadable settings change and
+    subscribers are told which keys did; changes to the others are reported
+    once as needing a restart and kept in `pending` until then. A file that
+    fails to parse or validate leaves the current values in place.
+    """
+
+    def __init__(self, paths=CONFIG_PATHS, settings=SETTINGS, environ=None):
+        self.paths = list(paths)
+        self.settings = {s.key: s for s in settings}
+        self.environ = os.environ if environ is None else environ
+        self.values = self._load()
+        self.pending = {}  # restart-only keys whose files now hold a different value
+        self._mtimes = self._file_mtimes()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def get(self, key, default=None):
+        """Return the current value of a setting, or default for a key that is not defined."""
+        return self.values.get(key, default)
+
+    def _read_files(self):
+        merged = []
+        for path in self.paths:
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path) as f:
+                    data = yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise ConfigError(f"{path}: {e}") from e
+            if not isinstance(data, dict):
+                raise ConfigError(f"{path}: expected a mapping at the top level")
+            merged.append(data)
+        return merged
+
+    def _load(self):
+        files = self._read_files()
+        values = {}
+        for key, setting in self.settings.items():
+            value = setting.default
+            for data in files:
+                try:
+                    value = _lookup(data, key)
+                except KeyError:
+                    pass
+            if setting.env and self.environ.get(setting.env) not in (None, ""):
+                value = self.environ[setting.env]
+            values[key] = setting.coerce(value)
+        _validate(values)
+        return values
+
+    def _file_mtimes(self):
+        return {path: os.path.getmtime(path) for path in self.paths if os.path.exists(path)}
+
+    def subscribe(self, callback):
+        """Call callback(config, changed_keys) after each reload that changes a value."""
+        self._subscribers.append(callback)
+
+    def reload(self):
+        """Re-read the files and apply reloadable changes. Returns the set of keys that changed."""
+        with self._lock:
+            self._mtimes = self._file_mtimes()
+            try:
+                new_values = self._load()
+            except ConfigError as e:
+                metrics.increment("config.reload_failures")
+                print(f"Config reload failed, keeping current values: {str(e)}")
+                return set()
+            changed = set()
+            values = dict(self.values)
+            for key, value in new_values.items():
+                if value == values[key]:
+                    self.pending.pop(key, None)
+                    continue
+                if self.settings[key].reloadable:
+                    values[key] = value
+                    changed.add(key)
+                elif self.pending.get(key, values[key]) != value:
+                    self.pending[key] = value
+                    print(f"Config: {key} changed to {value!r}; restart to apply")
+            self.values = values
+        if changed:
+            metrics.increment("config.reloads")
+            print(f"Config reloaded: {', '.join(sorted(changed))}")
+            for callback in self._subscribers:
+                try:
+                    callback(self, changed)
+                except Exception as e:
+                    print(f"Error applying config change: {str(e)}")
+        return changed
+
+    def check(self):
+        """Reload if any config file was created, edited or removed since the last load."""
+        if self._file_mtimes() != self._mtimes:
+            return self.reload()
+        return set()
+
+    def start_watching(self, interval=CONFIG_WATCH_INTERVAL):
+        """Poll the config files in a daemon thread and hot reload on change."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._watcher = threading.Thread(target=loop, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        self._watcher = None
+
+config = Config()
@@ -0,0 +1,106 @@
+import os
+import re
+import numpy as np
+
+# Label order used for every weight column
+EMOTIONS = ("happy", "sad", "angry", "neutral")
+
+# Default lexicon: word -> (happy, sad, angry, neutral) weights
+DEFAULT_LEXICON = {
+    # happy
+    "happy": (3.0, 0, 0, 0), "joy": (3.0, 0, 0, 0), "joyful": (3.0, 0, 0, 0),
+    "excited": (3.0, 0, 0, 0), "exciting": (2.5, 0, 0, 0), "great": (2.2, 0, 0, 0),
+    "wonderful": (3.0, 0, 0, 0), "fantastic": (3.0, 0, 0, 0), "amazing": (3.0, 0, 0, 0),
+    "awesome": (3.0, 0, 0, 0), "love": (2.5, 0, 0, 0), "lovely": (2.5, 0, 0, 0),
+    "glad": (2.5, 0, 0, 0), "delighted": (3.0, 0, 0, 0), "fun": (2.2, 0, 0, 0),
+    "buzzing": (2.5, 0, 0, 0), "yay": (3.0, 0, 0, 0), "congratulations": (3.0, 0, 0, 0),
+    "thrilled": (3.0, 0, 0, 0), "cheerful": (3.0, 0, 0, 0), "enjoy": (2.2, 0, 0, 0),
+    "fascinating": (2.2, 0, 0, 0), "beautiful": (2.2, 0, 0, 0), "sunny": (1.5, 0, 0, 0),
+    "laugh": (2.5, 0, 0, 0), "smile": (2.5, 0, 0, 0), "pleased": (2.5, 0, 0, 0),
+    # sad
+    "sad": (0, 3.0, 0, 0), "unhappy": (0, 3.0, 0, 0), "depressed": (0, 3.0, 0, 0),
+    "miserable": (0, 3.0, 0, 0), "sorry": (0, 2.2, 0, 0), "unfortunately": (0, 2.5, 0, 0),
+    "lonely": (0, 3.0, 0, 0), "cry": (0, 3.0, 0, 0), "crying": (0, 3.0, 0, 0),
+    "tears": (0, 2.5, 0, 0), "loss": (0, 2.5, 0, 0), "lost": (0, 1.5, 0, 0),
+    "died": (0, 3.0, 0, 0), "death": (0, 3.0, 0, 0), "grief": (0, 3.0, 0, 0),
+    "heartbroken": (0, 3.5, 0, 0), "disappointed": (0, 2.5, 0.5, 0), "miss": (0, 2.0, 0, 0),
+    "gloomy": (0, 2.5, 0, 0), "tragic": (0, 3.0, 0, 0), "apologize": (0, 1.5, 0, 0),
+    # angry
+    "angry": (0, 0, 3.0, 0), "mad": (0, 0, 3.0, 0), "furious": (0, 0, 3.5, 0),
+    "annoyed": (0, 0, 3.0, 0), "annoying": (0, 0, 2.5, 0), "hate": (0, 0, 3.0, 0),
+    "outraged": (0, 0, 3.5, 0), "irritated": (0, 0, 3.0, 0), "frustrated": (0, 0.5, 2.5, 0),
+    "frustrating": (0, 0.5, 2.5, 0), "rage": (0, 0, 3.5, 0), "unacceptable": (0, 0, 3.0, 0),
+    "ridiculous": (0, 0, 2.5, 0), "stupid": (0, 0, 2.5, 0), "terrible": (0, 1.0, 2.0, 0),
+    # neutral
+    "okay": (0, 0, 0, 1.5), "fine": (0, 0, 0, 1.5), "alright": (0, 0, 0, 1.5),
+    "information": (0, 0, 0, 1.0), "currently": (0, 0, 0, 1.0), "located": (0, 0, 0, 1.0),
+}
+
+# Without any lexicon hit a sentence is almost always neutral, so the bias
+# alone gives a confident neutral; a single strong cue flips the label.
+DEFAULT_BIAS = (0.0, 0.0, 0.0, 1.9)
+
+NEGATIONS = {"not", "no", "never", "isn't", "wasn't", "don't", "doesn't", "didn't", "can't", "won't"}
+
+TOKEN_PATTERN = re.compile(r"[a-z']+")
+
+
+class EmotionClassifier:
+    """
+    Lexicon-weighted linear emotion classifier that runs locally on CPU.
+
+    Each known word contributes a weight vector over EMOTIONS; the summed scores
+    plus a bias go through a softmax, and the top probability is the confidence.
+    Weights can be loaded from a NumPy .npz file holding `vocab`, `weights`
+    (len(vocab) x len(EMOTIONS)) and `bias` arrays, as written by save().
+    """
+
+    def __init__(self, weights_path=None):
+        weights_path = weights_path or os.getenv("EMOTION_CLASSIFIER_WEIGHTS")
+        if weights_path and os.path.exists(weights_path):
+            data = np.load(weights_path, allow_pickle=False)
+            vocab = [str(word) for word in data["vocab"]]
+            self.weights = data["weights"].astype(np.float32)
+            self.bias = data["bias"].astype(np.float32)
+        else:
+            vocab = list(DEFAULT_LEXICON)
+            self.weights = np.array([DEFAULT_LEXICON[word] for word in vocab], dtype=np.float32)
+            self.bias = np.array(DEFAULT_BIAS, dtype=np.float32)
+        self.vocab = vocab
+        self.index = {word: i for i, word in enumerate(vocab)}
+
+    def save(self, path):
+        """Write the current weights to a NumPy .npz file."""
+        np.savez(path, vocab=np.array(self.vocab), weights=self.weights, bias=self.bias)
+
+    def predict(self, sentence):
+        """
+        Classify a sentence.
+
+        Returns:
+            tuple: (emotion, confidence) where confidence is the softmax probability
+            of the chosen emotion.
+        """
+        tokens = TOKEN_PATTERN.findall(sentence.lower())
+        rows = []
+        signs = []
+        negated = False
+        for token in tokens:
+            if token in NEGATIONS:
+                negated = True
+                continue
+            i = self.index.get(token)
+            if i is not None:
+                rows.append(i)
+                signs.append(-1.0 if negated else 1.0)
+            negated = False
+
+        scores = self.bias.copy()
+        if rows:
+            contributions = self.weights[rows] * np.array(signs, dtype=np.float32)[:, None]
+            scores += contributions.sum(axis=0)
+
+        exp = np.exp(scores - scores.max())
+        probs = exp / exp.sum()
+        best = int(probs.argmax())
+        return EMOTIONS[best], float(probs[best])
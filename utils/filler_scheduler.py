@@ -0,0 +1,91 @@
+import collections
+import random
+import threading
+import time
+from utils.config import config
+from utils.metrics import metrics
+
+# Phrases that cover a wait; short ones for a small overrun, long ones for calls expected to be slow
+SHORT_FILLERS = ["Hmm, let me think.", "Just a moment.", "Good question."]
+LONG_FILLERS = ["Let me think about that for a moment.", "Give me a moment to put that together."]
+SEARCH_FILLERS = ["Allow me to search the web for you", "Let me look that up for you, it might take a moment."]
+
+# Long fillers per agent, so only agents that actually search say they are searching
+AGENT_LONG_FILLERS = {
+    "search": SEARCH_FILLERS,
+    "search3": SEARCH_FILLERS,
+}
+
+# Delays and thresholds are read from filler.* in the config on every call, so
+# they can be retuned while running
+FILLER_DEFAULT_LATENCY = 1.5  # seconds assumed for an agent with no history yet
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class FillerScheduler:
+    """
+    Predicts how long an agent call will take and masks the wait with a filler.
+
+    Each agent keeps a rolling window of its recent latencies. If its median is
+    above filler.long_threshold the call is expected to be slow, so a long
+    filler for that agent (AGENT_LONG_FILLERS) is spoken early
+    (filler.early_delay). Otherwise a short filler is held back until the call
+    outlasts that agent's 90th percentile, so quick agents only speak up when
+    something is unusually slow. At most one filler is spoken per min_gap
+    seconds (filler.min_gap unless given). Scheduled, fired and suppressed
+    fillers are counted under filler.* in the shared metrics.
+    """
+
+    def __init__(self, runner, speak, window=50, min_samples=5, min_gap=None):
+        self.runner = runner
+        self.speak = speak
+        self.min_gap = min_gap
+        self.window = window
+        self.min_samples = min_samples
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self.lock = threading.Lock()
+        self.last_filler_time = 0.0
+
+    def record(self, agent, seconds):
+        """Add one observed call latency for agent."""
+        with self.lock:
+            self.latencies[agent].append(seconds)
+        metrics.record(f"agent.{agent}", seconds * 1000)
+
+    def predict(self, agent):
+        """Return (median, p90) latency in seconds for agent, or defaults without enough history."""
+        with self.lock:
+            samples = list(self.latencies.get(agent, ()))
+        if len(samples) < self.min_samples:
+            return FILLER_DEFAULT_LATENCY, FILLER_DEFAULT_LATENCY
+        return _percentile(samples, 0.5), _percentile(samples, 0.9)
+
+    def plan(self, agent):
+        """Return (delay, phrases) for a call to agent."""
+        median, p90 = self.predict(agent)
+        if median >= config.get("filler.long_threshold"):
+            return config.get("filler.early_delay"), AGENT_LONG_FILLERS.get(agent, LONG_FILLERS)
+        return min(max(p90, config.get("filler.min_delay")), config.get("filler.max_delay")), SHORT_FILLERS
+
+    def schedule(self, agent, cancel_event):
+        """Schedule a filler for a call to agent. Cancel the returned task when the call returns."""
+        delay, phrases = self.plan(agent)
+        metrics.increment("filler.scheduled")
+        return self.runner.schedule(delay, self._fire, agent, random.choice(phrases), cancel_event)
+
+    def _fire(self, agent, phrase, cancel_event):
+        if cancel_event.is_set():
+            return
+        with self.lock:
+            now = time.monotonic()
+            min_gap = config.get("filler.min_gap") if self.min_gap is None else self.min_gap
+            if self.last_filler_time and now - self.last_filler_time < min_gap:
+                metrics.increment("filler.suppressed")
+                return
+            self.last_filler_time = now
+        metrics.increment("filler.fired")
+        metrics.increment(f"filler.fired.{agent}")
+        print(f"{agent} is taking a while, playing filler: {phrase}")
+        self.speak(phrase)
@@ -0,0 +1,89 @@
+import math
+from utils.metrics import metrics
+
+# Spoken responses are cut to this many characters
+RESPONSE_CHAR_BUDGET = 200
+
+# Rough English average for OpenAI tokenizers, used to size the token cap
+CHARS_PER_TOKEN = 4
+
+def max_tokens_for(char_budget=RESPONSE_CHAR_BUDGET):
+    """Token cap for a character budget, with headroom to reach the next sentence boundary."""
+    return math.ceil(char_budget / CHARS_PER_TOKEN * 1.5)
+
+def truncate_to_budget(text, char_budget=RESPONSE_CHAR_BUDGET):
+    """Truncate text to the budget, ending at the last full sentence if possible."""
+    if len(text) <= char_budget:
+        return text
+    truncated = text[:char_budget]
+    last_punct = max(truncated.rfind('.'), truncated.rfind('!'), truncated.rfind('?'))
+    if last_punct != -1:
+        return truncated[:last_punct+1]
+    return truncated
+
+def estimate_tokens(text):
+    """Rough token count for text, for when the provider's usage report is not available."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _prompt_text(messages):
+    """The text of a prompt given as a string, role/content dicts or message objects."""
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+        parts.append(content or "")
+    return "".join(parts)
+
+def record_usage(message, metric_name="llm"):
+    """Count prompt tokens and provider prefix-cache hits reported for one call. Returns whether usage was reported."""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return False
+    details = usage.get("input_token_details") or {}
+    metrics.increment(f"{metric_name}.calls_with_usage")
+    metrics.increment(f"{metric_name}.prompt_tokens", usage.get("input_tokens", 0))
+    metrics.increment(f"{metric_name}.cached_tokens", details.get("cache_read", 0))
+    return True
+
+def stream_with_budget(llm, messages, char_budget=RESPONSE_CHAR_BUDGET, metric_name="llm"):
+    """
+    Stream a completion and stop reading once it passes the character budget.
+
+    Anything after the budget would be cut by truncate_to_budget anyway, so the
+    stream is closed there instead of paying for the rest of the completion.
+    Providers report usage in the final chunk, which an early stop never
+    reads; those calls count under calls_without_usage with estimated prompt
+    and completion tokens, so prompt_tokens and cached_tokens stay exact and
+    their ratio is the prefix-cache hit rate of calls that reported it.
+    chunks_streamed counts stream chunks (about one token each with OpenAI);
+    tokens_saved is the cap minus the estimated tokens read.
+    """
+    max_tokens = max_tokens_for(char_budget)
+    parts = []
+    length = 0
+    chunks = 0
+    stopped_early = False
+    usage_reported = False
+
+    for chunk in llm.stream(messages, max_tokens=max_tokens):
+        usage_reported = record_usage(chunk, metric_name) or usage_reported
+        content = chunk.content or ""
+        parts.append(content)
+        length += len(content)
+        chunks += 1
+        if length > char_budget:
+            stopped_early = True
+            break
+
+    text = "".join(parts)
+    metrics.increment(f"{metric_name}.chunks_streamed", chunks)
+    if not usage_reported:
+        metrics.increment(f"{metric_name}.calls_without_usage")
+        metrics.increment(f"{metric_name}.estimated_prompt_tokens", estimate_tokens(_prompt_text(messages)))
+        metrics.increment(f"{metric_name}.estimated_completion_tokens", estimate_tokens(text))
+    if stopped_early:
+        metrics.increment(f"{metric_name}.early_stops")
+        metrics.increment(f"{metric_name}.tokens_saved", max(0, max_tokens - estimate_tokens(text)))
+
+    return truncate_to_budget(text.strip(), char_budget)
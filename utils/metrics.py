@@ -0,0 +1,79 @@
+import collections
+import threading
+
+class PipelineMetrics:
+    """
+    Thread-safe counters and latency samples for the conversation pipeline.
+
+    Counters are plain running totals (e.g. tokens saved); gauges hold the latest
+    value of a level (e.g. audio RMS); timings keep the most recent samples per
+    name so percentiles reflect current behaviour.
+    """
+
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters = collections.Counter()
+        self._gauges = {}
+        self._timings = {}
+
+    def increment(self, name, value=1):
+        """Add value to a named counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name, value):
+        """Set a named gauge to its latest value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def gauge(self, name, default=None):
+        """Return the latest value of a gauge."""
+        with self._lock:
+            return self._gauges.get(name, default)
+
+    def record(self, name, value_ms):
+        """Record a latency sample in milliseconds."""
+        with self._lock:
+            samples = self._timings.get(name)
+            if samples is None:
+                samples = self._timings[name] = collections.deque(maxlen=self.max_samples)
+            samples.append(value_ms)
+
+    def counter(self, name):
+        """Return the current value of a counter."""
+        with self._lock:
+            return self._counters[name]
+
+    def samples(self, name):
+        """Return a copy of the recorded samples for a timing."""
+        with self._lock:
+            return list(self._timings.get(name, ()))
+
+    def snapshot(self):
+        """Return counters, gauges and timing summaries as a JSON-serialisable dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            timings = {name: sorted(samples) for name, samples in self._timings.items() if samples}
+
+        summary = {}
+        for name, values in timings.items():
+            summary[name] = {
+                "count": len(values),
+                "mean_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(values[len(values) // 2], 2),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+                "max_ms": round(values[-1], 2),
+            }
+        return {"counters": counters, "gauges": gauges, "timings": summary}
+
+    def reset(self):
+        """Clear all counters, gauges and timings."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+# Shared instance used by agents, STT and the orchestrator
+metrics = PipelineMetrics()
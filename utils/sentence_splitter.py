@@ -1,7 +1,174 @@
 import re
 
+# Abbreviations that are never the end of a sentence (they lead into a name or example)
+NON_TERMINAL_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "st", "mt", "sgt", "capt", "col", "gen", "lt", "rev", "hon",
+    "sen", "rep", "gov", "pres", "fr", "e.g", "i.e", "cf", "viz", "vs",
+}
+# Abbreviations that lead into a number ("No. 5", "Fig. 2") but may also be a word ("No. I don't")
+NUMBER_PREFIXES = {"no", "nos", "vol", "pp", "fig", "ch", "sec", "approx"}
+# Abbreviations and units that end a sentence only when a capitalised word follows
+ABBREVIATIONS = {
+    "etc", "inc", "ltd", "co", "corp", "jr", "sr", "a.m", "p.m", "dept", "est", "min", "max",
+    "hr", "hrs", "km", "kg", "cm", "mm", "ft", "lb", "lbs", "oz", "sq", "u.s", "u.k",
+} | NUMBER_PREFIXES
+
+# Capitalised words that usually start a sentence rather than continue a name,
+# used to tell "an A. Then" (a grade) from "met J. Tolkien" (an initial)
+SENTENCE_STARTERS = {
+    "a", "an", "the", "this", "that", "these", "those", "there", "then", "it", "its", "i", "we", "you",
+    "he", "she", "they", "my", "our", "your", "his", "her", "their", "and", "but", "so", "or", "yet",
+    "in", "on", "at", "after", "before", "when", "while", "if", "what", "how", "why", "where", "who",
+    "yes", "no", "now", "also", "however", "still", "next", "finally", "let", "please",
+}
+
+_TERMINATORS = ".!?"
+_CLOSERS = "\"')]}’”"
+_LAST_WORD = re.compile(r"(\S+)$")
+_NEXT_WORD = re.compile(r"[^\W\d_]+")
+
+class SentenceSegmenter:
+    """
+    Incremental sentence segmenter for streamed text.
+
+    push() takes text as it arrives (e.g. LLM token chunks) and returns the
+    sentences that are complete and unambiguous so far; flush() returns what is
+    left at the end of the stream. A full stop only ends a sentence once the
+    next character is known, so "Dr. Smith", "3.5 km", "e.g. Canberra" and
+    numbered list items are not split, and ".", "!" or "?" followed by closing
+    quotes or brackets keeps them with the sentence. Line breaks always end a
+    sentence.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._scan = 0  # Where to resume looking for a boundary in buffer
+
+    def push(self, chunk):
+        """Add text and return any sentences it completes."""
+        self.buffer += chunk
+        sentences = []
+        while True:
+            end = self._find_end(final=False)
+            if end is None:
+                return sentences
+            self._emit(end, sentences)
+
+    def flush(self):
+        """Return the remaining sentences at the end of the stream and reset."""
+        sentences = []
+        while True:
+            end = self._find_end(final=True)
+            if end is None:
+                break
+            self._emit(end, sentences)
+        self._emit(len(self.buffer), sentences)
+        return sentences
+
+    def _emit(self, end, sentences):
+        sentence = self.buffer[:end].strip()
+        self.buffer = self.buffer[end:]
+        self._scan = 0
+        if sentence:
+            sentences.append(sentence)
+
+    def _find_end(self, final):
+        """Return the end index of the first complete sentence in buffer, or None if there is none yet."""
+        text = self.buffer
+        i = self._scan
+        while i < len(text):
+            c = text[i]
+            if c == "\n":
+                if text[:i].strip():
+                    return i + 1
+            elif c in _TERMINATORS:
+                j = i
+                while j < len(text) and text[j] in _TERMINATORS:
+                    j += 1
+                while j < len(text) and text[j] in _CLOSERS:
+                    j += 1
+                if j == len(text):
+                    if final:
+                        return j
+                    self._scan = i  # "3." could still become "3.5"
+                    return None
+                if text[j].isspace():
+                    k = j
+                    while k < len(text) and text[k] in " \t":
+                        k += 1
+                    if k == len(text) and not final:
+                        self._scan = i  # Need the next word to decide
+                        return None
+                    boundary = self._is_boundary(text, i, text[i:j], k, final)
+                    if boundary is None:
+                        self._scan = i  # Need the whole next word to decide
+                        return None
+                    if boundary:
+                        return j
+                i = j
+                continue
+            i += 1
+        self._scan = i
+        return None
+
+    def _is_boundary(self, text, i, punctuation, k, final):
+        """
+        Decide whether the terminator at text[i] ends a sentence, given the next non-space character at text[k].
+
+        Returns None when that depends on a next word that has not fully arrived.
+        """
+        next_char = text[k] if k < len(text) else ""
+        if "!" in punctuation or "?" in punctuation:
+            return True
+        if next_char.islower():
+            return False  # "approx. five", "Well... maybe"
+        if len(punctuation.rstrip(_CLOSERS)) > 1:
+            return True  # Ellipsis before a capital or the end
+        match = _LAST_WORD.search(text, 0, i)
+        word = match.group(1).lstrip(_CLOSERS + "(\"'[{‘“") if match else ""
+        lower = word.lower()
+        if lower in NON_TERMINAL_ABBREVIATIONS:
+            return False
+        if len(word) == 1 and word.isalpha():
+            initial = self._is_initial(text, match.start(), word, k, final)
+            if initial is None:
+                return None
+            if initial:
+                return False  # An initial, as in "J. Smith"
+        if lower in NUMBER_PREFIXES and next_char.isdigit():
+            return False
+        if lower in ABBREVIATIONS:
+            return next_char == "" or next_char == "\n" or next_char.isupper()
+        if word.isdigit() and not text[:match.start()].strip():
+            return False  # Numbered list item, "1. First"
+        return True
+
+    def _is_initial(self, text, start, letter, k, final):
+        """
+        Whether a single letter before a full stop is an initial, or None if the next word is still arriving.
+
+        Only capitals count, and never after a number ("843 m.", "gate 5 B.").
+        At the start or after a capitalised word or another initial it is one
+        ("J. R. Tolkien", "George W. Bush"); after a lower-case word it is one
+        only if a name follows, so "met J. Tolkien" holds but "an A. Then"
+        splits.
+        """
+        if not letter.isupper():
+            return False
+        before = text[:start].split()
+        previous = before[-1].lstrip(_CLOSERS + "(\"'[{‘“") if before else ""
+        if previous[:1].isdigit():
+            return False
+        if not previous or previous[:1].isupper():
+            return True
+        match = _NEXT_WORD.match(text, k)
+        if match is None:
+            return True
+        if match.end() == len(text) and not final:
+            return None
+        return match.group(0).lower() not in SENTENCE_STARTERS
+
 def split_into_sentences(text):
-    """Split text into sentences using regex pattern matching."""
-    # Simple sentence splitter using regex
-    sentence_endings = re.compile(r'(?<=[.!?]) +')
-    return [s.strip() for s in sentence_endings.split(text) if s.strip()] 
\ No newline at end of file
+    """Split complete text into sentences, respecting abbreviations, decimals and list numbers."""
+    segmenter = SentenceSegmenter()
+    return segmenter.push(text) + segmenter.flush()
@@ -0,0 +1,60 @@
+import re
+import threading
+from utils.metrics import metrics
+
+def normalize_prompt(prompt):
+    """Lower-case a prompt and drop punctuation and extra whitespace, so trivially different phrasings share a key."""
+    return " ".join(re.sub(r"[^\w\s]", " ", prompt.lower()).split())
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key runs the function; anyone asking for the same
+    key while it is in flight waits for that call and gets the same result
+    (or the same exception). Nothing is kept once the call finishes, so this
+    only deduplicates overlapping work and sits in front of a normal cache.
+    Coalesced callers are counted in `{name}.coalesced`.
+    """
+
+    def __init__(self, name="single_flight"):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """Run func(*args, **kwargs) for key, or wait for the call already running for it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            metrics.increment(f"{self.name}.coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import metrics
+
+class CallAbandoned(Exception):
+    """Raised by TaskRunner.call when the caller's cancel event is set before the call returns."""
+
+class CancelEvent(threading.Event):
+    """
+    A threading.Event that also runs callbacks when set.
+
+    Lets a waiter block on "this call finished or the turn was cancelled"
+    with one Event instead of polling the cancel flag.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    def add_callback(self, callback):
+        """Call callback() when the event is set, straight away if it already is."""
+        with self._callbacks_lock:
+            if not self.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._callbacks_lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def set(self):
+        with self._callbacks_lock:
+            super().set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+class ScheduledTask:
+    """Handle for a delayed call; cancel() stops it if it has not started yet."""
+
+    def __init__(self, due, func, args, kwargs):
+        self.due = due
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = None
+        self._state = "pending"
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Cancel the task. Returns True if it had not fired yet."""
+        with self._lock:
+            if self._state != "pending":
+                return False
+            self._state = "cancelled"
+            return True
+
+    def _claim(self):
+        with self._lock:
+            if self._state != "pending":
+                return False
+            self._state = "fired"
+            return True
+
+    @property
+    def cancelled(self):
+        return self._state == "cancelled"
+
+    @property
+    def fired(self):
+        return self._state == "fired"
+
+class TaskRunner:
+    """
+    Fixed pool of worker threads plus cancellable timers.
+
+    submit() runs a call on the pool; schedule() runs one after a delay unless
+    it is cancelled first. All timers share a single scheduler thread, so a
+    turn costs no new threads. Worker threads started, tasks run and timers
+    fired or cancelled are counted under `{name}.` in the shared metrics,
+    making any thread churn visible.
+
+    call() waits for a task or a CancelEvent, whichever comes first. An
+    abandoned call cannot be killed, so it gives its slot back and finishes
+    on `abandon_headroom` extra workers; repeated cancellations then do not
+    queue new calls behind discarded ones.
+    """
+
+    def __init__(self, max_workers=4, name="tasks", abandon_headroom=0):
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=max_workers + abandon_headroom, thread_name_prefix=name,
+                                           initializer=self._worker_started)
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._timers = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._scheduler = None
+
+    def _worker_started(self):
+        metrics.increment(f"{self.name}.threads_started")
+
+    def submit(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the pool and return its Future."""
+        metrics.increment(f"{self.name}.tasks")
+        return self.executor.submit(func, *args, **kwargs)
+
+    def call(self, cancel_event, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) on the pool and return its result.
+
+        Raises CallAbandoned as soon as cancel_event (a CancelEvent) is set;
+        the call's result is then discarded.
+        """
+        self._slots.acquire()
+        released = threading.Lock()
+
+        def release_slot():
+            # Reached on completion and on abandonment; only the first gives the slot back
+            if released.acquire(blocking=False):
+                self._slots.release()
+
+        wake = threading.Event()
+
+        def on_done(_future):
+            release_slot()
+            wake.set()
+
+        if cancel_event.is_set():
+            release_slot()
+            raise CallAbandoned()
+        try:
+            future = self.submit(func, *args, **kwargs)
+        except BaseException:
+            release_slot()
+            raise
+        future.add_done_callback(on_done)
+        cancel_event.add_callback(wake.set)
+        try:
+            wake.wait()
+        finally:
+            cancel_event.remove_callback(wake.set)
+        if future.done():
+            return future.result()
+        future.cancel()
+        release_slot()
+        metrics.increment(f"{self.name}.abandoned")
+        raise CallAbandoned()
+
+    def schedule(self, delay, func, *args, **kwargs):
+        """Run func on the pool after delay seconds. Returns a ScheduledTask that can be cancelled."""
+        task = ScheduledTask(time.monotonic() + delay, func, args, kwargs)
+        with self._condition:
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(target=self._run_timers, name=f"{self.name}-timers", daemon=True)
+                self._scheduler.start()
+                metrics.increment(f"{self.name}.threads_started")
+            heapq.heappush(self._timers, (task.due, next(self._sequence), task))
+            self._condition.notify()
+        metrics.increment(f"{self.name}.timers_scheduled")
+        return task
+
+    def _run_timers(self):
+        while True:
+            with self._condition:
+                while not self._timers or self._timers[0][0] > time.monotonic():
+                    timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                    self._condition.wait(timeout)
+                _, _, task = heapq.heappop(self._timers)
+            if task._claim():
+                metrics.increment(f"{self.name}.timers_fired")
+                task.future = self.submit(task.func, *task.args, **task.kwargs)
+            else:
+                metrics.increment(f"{self.name}.timers_cancelled")
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,85 @@
+import atexit
+import collections
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+class EmotionTelemetry:
+    """
+    Non-blocking emitter for emotion events.
+
+    emit() only appends to a bounded in-memory queue; a background thread posts
+    events in batches over a pooled HTTP session. When the queue is full the
+    oldest events are dropped (and counted) so callers never wait on the network.
+    Events still queued when the interpreter exits are flushed by close(),
+    which is registered with atexit.
+    """
+
+    def __init__(self, endpoint, batch_size=20, flush_interval=0.5, max_pending=200, timeout=2.0):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.pending = collections.deque(maxlen=max_pending)
+        self.condition = threading.Condition()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, name="emotion-telemetry", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def emit(self, sentence, emotion):
+        """Queue an emotion event without blocking."""
+        event = {"sentence": sentence, "emotion": emotion, "timestamp": time.time()}
+        with self.condition:
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+            self.pending.append(event)
+            if len(self.pending) >= self.batch_size:
+                self.condition.notify()
+
+    def _take_batch(self):
+        batch = []
+        while self.pending and len(batch) < self.batch_size:
+            batch.append(self.pending.popleft())
+        return batch
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.pending and not self._closed:
+                    self.condition.wait(self.flush_interval)
+                batch = self._take_batch()
+                closed = self._closed
+            if batch:
+                self._post(batch)
+            elif closed:
+                return
+
+    def _post(self, batch):
+        try:
+            resp = self.session.post(self.endpoint, json=batch, timeout=self.timeout)
+            resp.raise_for_status()
+            self.sent += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Failed to POST emotion batch ({len(batch)} events): {e}")
+
+    def close(self, timeout=2.0):
+        """Flush outstanding events and stop the background thread."""
+        atexit.unregister(self.close)
+        with self.condition:
+            self._closed = True
+            self.condition.notify()
+        self._worker.join(timeout)
+        self.session.close()
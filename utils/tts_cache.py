@@ -0,0 +1,146 @@
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from utils.config import config
+from utils.metrics import metrics
+
+TTS_CACHE_DIR = os.path.expanduser(config.get("tts.cache.dir"))
+TTS_CACHE_MEMORY_ITEMS = config.get("tts.cache.memory_items")
+TTS_CACHE_MAX_BYTES = config.get("tts.cache.max_bytes")  # 0 for no limit
+
+def phrase_key(text, **voice):
+    """
+    Content address for a synthesized phrase.
+
+    Hashes the text with everything else that changes the audio (voice id,
+    voice settings, model, output format), so a change to any of them misses.
+    """
+    payload = json.dumps({"text": text, "voice": voice}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class PhraseAudioCache:
+    """
+    Encoded audio for synthesized phrases: an in-memory LRU over an on-disk store.
+
+    Files are named by their content key and written atomically, so several
+    processes can share the directory. Reads refresh a file's mtime, and once
+    the directory holds more than max_disk_bytes the least recently used files
+    are removed. Set directory=None to keep the cache in memory only.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_memory_items=TTS_CACHE_MEMORY_ITEMS,
+                 max_disk_bytes=TTS_CACHE_MAX_BYTES, name="tts_cache"):
+        self.directory = directory
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.name = name
+        self.memory = collections.OrderedDict()
+        self.lock = threading.Lock()
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                print(f"TTS cache directory unavailable, caching in memory only: {str(e)}")
+                self.directory = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _remember(self, key, audio):
+        with self.lock:
+            self.memory[key] = audio
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_memory_items:
+                self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached audio bytes for key, or None."""
+        with self.lock:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.memory.move_to_end(key)
+        if audio is not None:
+            metrics.increment(f"{self.name}.memory_hits")
+            return audio
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    audio = f.read()
+                os.utime(path)  # Mark as recently used for eviction
+            except OSError:
+                audio = None
+            if audio:
+                metrics.increment(f"{self.name}.disk_hits")
+                self._remember(key, audio)
+                return audio
+
+        metrics.increment(f"{self.name}.misses")
+        return None
+
+    def put(self, key, audio):
+        """Store encoded audio under key in memory and on disk."""
+        if not audio:
+            return
+        self._remember(key, audio)
+        if not self.directory:
+            return
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, self._path(key))
+            tmp_path = None
+            metrics.increment(f"{self.name}.bytes_stored", len(audio))
+        except OSError as e:
+            print(f"Could not write TTS cache entry: {str(e)}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used files until the directory fits in max_disk_bytes."""
+        if not self.directory or not self.max_disk_bytes:
+            return
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".audio"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Removed by another process
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError as e:
+            print(f"Could not scan TTS cache directory: {str(e)}")
+            return
+        if total <= self.max_disk_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            metrics.increment(f"{self.name}.evictions")
+            if total <= self.max_disk_bytes:
+                break
+
+    def __contains__(self, key):
+        with self.lock:
+            if key in self.memory:
+                return True
+        return bool(self.directory) and os.path.exists(self._path(key))
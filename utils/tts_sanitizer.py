@@ -0,0 +1,77 @@
+import re
+from utils.sentence_splitter import split_into_sentences
+
+# Emoji and pictographs, plus the joiners and modifiers that glue them together.
+# Compiled once at import; the TTS path runs it on every response.
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs (includes skin tone modifiers)
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags
+    "\U00002600-\U000027BF"  # miscellaneous symbols and dingbats
+    "\U0001F900-\U0001F9FF"  # supplemental symbols and pictographs
+    "\U0001FA70-\U0001FAFF"  # symbols and pictographs extended-A
+    "\U0001F018-\U0001F270"  # enclosed characters and various symbols
+    "\U00002300-\U000023FF"  # miscellaneous technical (watch, hourglass)
+    "\U00002B50\U00002B55"   # star, circle
+    "\U0000FE0F\U0000200D"   # variation selector, zero width joiner
+    "]+"
+)
+
+URL_PATTERN = re.compile(r"\bhttps?://\S+|\bwww\.\S+")
+MARKDOWN_LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+# Heading hashes, quote markers and bullets at the start of a line
+MARKDOWN_LINE_PREFIX_PATTERN = re.compile(r"^[ \t]*(?:#{1,6}[ \t]+|>[ \t]*|[-*+][ \t]+)", re.MULTILINE)
+# An asterisk between numbers or brackets is multiplication, not emphasis
+MULTIPLY_PATTERN = re.compile(r"(?<=[\d)])[ \t]*\*[ \t]*(?=[\d(])")
+SPACES_PATTERN = re.compile(r"[ \t]+")
+SPACE_BEFORE_PUNCTUATION_PATTERN = re.compile(r" ([.,!?;:])")  # left behind by a removed emoji
+# Punctuation of an emoji-only sentence, orphaned after the previous sentence's end
+STRAY_PUNCTUATION_PATTERN = re.compile(r"(?<=[.!?]) [.,!?;:]+")
+
+# Symbols read out as words; one alternation so a response is scanned once
+SYMBOL_WORDS = {
+    "°C": " degrees Celsius",
+    "°F": " degrees Fahrenheit",
+    "°": " degrees",
+    "%": " percent",
+    "&": " and ",
+    "km": "kilometres",
+    "kg": "kilograms",
+    "cm": "centimetres",
+}
+SYMBOL_PATTERN = re.compile(r"°C|°F|°|%|&|\b(?:km|kg|cm)\b")
+
+# Markdown emphasis and code markers are dropped outright; underscores become spaces
+MARKUP_TABLE = str.maketrans({"*": None, "`": None, "_": " ", "|": " ", "~": None})
+
+def expand_symbols(text):
+    """Rewrite symbols like °C, km, kg, cm and % as words for TTS."""
+    return SYMBOL_PATTERN.sub(lambda m: SYMBOL_WORDS[m.group(0)], text)
+
+def sanitize_for_tts(text):
+    """
+    Make text safe to speak: strip emoji, URLs and markdown, and expand symbols.
+
+    Markdown links keep their label and an asterisk between numbers is read
+    as "times". Line breaks are kept so the sentence segmenter can still use
+    them; runs of spaces are collapsed.
+    """
+    text = MARKDOWN_LINK_PATTERN.sub(r"\1", text)
+    text = URL_PATTERN.sub("", text)
+    text = EMOJI_PATTERN.sub("", text)
+    text = MARKDOWN_LINE_PREFIX_PATTERN.sub("", text)
+    text = MULTIPLY_PATTERN.sub(" times ", text)
+    text = expand_symbols(text.translate(MARKUP_TABLE))
+    lines = (SPACE_BEFORE_PUNCTUATION_PATTERN.sub(r"\1", STRAY_PUNCTUATION_PATTERN.sub("", SPACES_PATTERN.sub(" ", line))).strip()
+             for line in text.split("\n"))
+    return "\n".join(lines).strip()
+
+def is_speakable(text):
+    """True if text has anything left to say once emoji and markup are gone."""
+    return any(c.isalnum() for c in sanitize_for_tts(text))
+
+def speakable_sentences(text):
+    """Sanitize text, split it into sentences and drop those with nothing left to say."""
+    return [sentence for sentence in split_into_sentences(sanitize_for_tts(text)) if is_speakable(sentence)]
@@ -0,0 +1,201 @@
+import collections
+import json
+import os
+import threading
+import time
+from utils.config import config
+from utils.metrics import metrics
+from utils.single_flight import normalize_prompt
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FREQUENT_QUESTIONS_PATH = os.getenv(
+    "FREQUENT_QUESTIONS_PATH",
+    os.path.join(REPO_DIR, "config", "frequent_questions.json")
+)
+# Relative paths are taken from the repo, not the working directory
+QUESTION_LOG_PATH = os.path.join(REPO_DIR, os.path.expanduser(config.get("warmup.question_log")))
+
+def load_frequent_questions(path=FREQUENT_QUESTIONS_PATH):
+    """
+    Load the frequent-questions config.
+
+    Returns:
+        tuple: (static_answers, questions) where static_answers maps each
+        normalized question to its fixed answer and questions is the list to
+        warm. A missing or unreadable file gives ({}, []).
+    """
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not load frequent questions from {path}: {str(e)}")
+        return {}, []
+
+    static_answers = {}
+    for entry in config.get("static_answers", []):
+        for question in entry["questions"]:
+            static_answers[normalize_prompt(question)] = entry["answer"]
+    return static_answers, list(config.get("questions", []))
+
+class QuestionLog:
+    """
+    Append-only JSON lines log of the questions visitors ask, used to find the top-N for warm-up.
+
+    Counts are read from the file once and then kept up to date in memory.
+    When the file grows past max_bytes (warmup.question_log_max_bytes by
+    default, 0 for no limit) it is cut down to its newest half.
+    """
+
+    def __init__(self, path=QUESTION_LOG_PATH, max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._counts = None  # Loaded on first use
+
+    def _read_lines(self):
+        try:
+            with open(self.path) as f:
+                return f.readlines()
+        except OSError:
+            return []
+
+    @staticmethod
+    def _count(lines):
+        counts = collections.Counter()
+        for line in lines:
+            try:
+                counts[normalize_prompt(json.loads(line)["question"])] += 1
+            except (ValueError, KeyError):
+                continue
+        return counts
+
+    def _trim(self, max_bytes):
+        """Keep the newest lines that fit in half of max_bytes."""
+        kept, size = [], 0
+        for line in reversed(self._read_lines()):
+            size += len(line.encode("utf-8"))
+            if size > max_bytes // 2:
+                break
+            kept.append(line)
+        kept.reverse()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.writelines(kept)
+        os.replace(temp_path, self.path)
+        self._counts = self._count(kept)
+        metrics.increment("warmup.question_log_trims")
+
+    def record(self, question):
+        try:
+            with self.lock:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.write(json.dumps({"time": time.time(), "question": question}) + "\n")
+                    size = f.tell()
+                if self._counts is not None:
+                    self._counts[normalize_prompt(question)] += 1
+                max_bytes = config.get("warmup.question_log_max_bytes") if self.max_bytes is None else self.max_bytes
+                if max_bytes and size > max_bytes:
+                    self._trim(max_bytes)
+        except OSError as e:
+            print(f"Could not log question: {str(e)}")
+
+    def top(self, n):
+        """Return the n most asked questions (normalized), most frequent first."""
+        with self.lock:
+            if self._counts is None:
+                self._counts = self._count(self._read_lines())
+            return [question for question, _ in self._counts.most_common(n)]
+
+class CacheWarmer:
+    """
+    Answers frequent questions ahead of time so their first real asking is a cache hit.
+
+    Each run takes the configured questions plus the top-N from the question
+    log, asks them through `answer` (which fills the agent caches on the way)
+    and hands every answer to the `prerender` callbacks, e.g. to synthesise its
+    audio. start() runs once straight away and then every `interval` seconds
+    on a background thread. top_n and interval default to warmup.* in the
+    config, read on each run.
+
+    `ttl` maps a question to how long its answer stays cached, in seconds,
+    or None when it is answered without the LLM (a static answer). When
+    given, those questions and ones whose answer would expire before the
+    next run are skipped, since warming them only spends LLM calls.
+    """
+
+    def __init__(self, answer, questions=(), question_log=None, top_n=None,
+                 interval=None, prerender=(), ttl=None):
+        self.answer = answer
+        self.questions = list(questions)
+        self.question_log = question_log
+        self.top_n = top_n
+        self.interval = interval
+        self.prerender = list(prerender)
+        self.ttl = ttl
+        self._stop = threading.Event()
+        self._thread = None
+
+    def warm_questions(self):
+        """Configured questions followed by the most asked logged ones, without duplicates."""
+        questions = list(self.questions)
+        top_n = config.get("warmup.top_n") if self.top_n is None else self.top_n
+        if self.question_log is not None and top_n:
+            questions += self.question_log.top(top_n)
+        interval = self._interval()
+        seen = set()
+        unique = []
+        for question in questions:
+            key = normalize_prompt(question)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if self.ttl is not None:
+                ttl = self.ttl(question)
+                if ttl is None or ttl < interval:
+                    metrics.increment("warmup.skipped")
+                    continue
+            unique.append(question)
+        return unique
+
+    def run_once(self):
+        """Warm every question once. Returns the number answered."""
+        start_time = time.time()
+        warmed = 0
+        for question in self.warm_questions():
+            if self._stop.is_set():
+                break
+            try:
+                response = self.answer(question)
+                if not response:
+                    raise ValueError("no answer")
+                for callback in self.prerender:
+                    callback(response)
+                warmed += 1
+            except Exception as e:
+                print(f"Warm-up failed for '{question}': {str(e)}")
+                metrics.increment("warmup.failures")
+        metrics.increment("warmup.questions", warmed)
+        metrics.record("warmup.run", (time.time() - start_time) * 1000)
+        return warmed
+
+    def _interval(self):
+        return config.get("warmup.interval") if self.interval is None else self.interval
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            interval = self._interval()
+            if not interval or self._stop.wait(interval):
+                break
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()